@@ -0,0 +1,108 @@
+"""Wall time of ``gen-tests --repo`` on the OpenAI backend against a fake, slow Responses API.
+
+Run from the ai-code-assistant directory (needs the ``openai`` extra):
+
+    PYTHONPATH=src python3 benchmarks/bench_llm_scheduler.py --files 40 --latency 0.25
+
+A local server stands in for OpenAI: each ``POST /v1/responses`` sleeps ``--latency``
+seconds and returns a small test module. Runs compare one request at a time with the
+default ``--llm-concurrency``, then repeat against the warm response cache, which needs no
+requests at all.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from ai_code_assistant.cli import main
+
+
+class SlowResponses(BaseHTTPRequestHandler):
+    latency = 0.25
+    requests = 0
+
+    def do_POST(self) -> None:
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        type(self).requests += 1
+        time.sleep(self.latency)
+        text = "import pytest\n\n\ndef test_generated():\n    assert 1 + 1 == 2\n"
+        content = [{"type": "output_text", "text": text, "annotations": []}]
+        payload = {
+            "id": "resp_bench",
+            "object": "response",
+            "created_at": 0,
+            "model": body["model"],
+            "status": "completed",
+            "output": [{"type": "message", "id": "msg", "role": "assistant", "status": "completed", "content": content}],
+        }
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args) -> None:
+        del format, args
+
+
+def write_repo(root: Path, files: int) -> None:
+    (root / "src").mkdir()
+    for index in range(files):
+        (root / "src" / f"module_{index}.py").write_text(
+            f"def func_{index}(a, b=1):\n    return a + b + {index}\n", encoding="utf-8"
+        )
+
+
+def timed_run(repo: Path, *extra: str) -> tuple[float, int]:
+    args = ["gen-tests", "--repo", str(repo), "--dry-run", "--output", "json"]
+    args += ["--audit-log", str(repo / ".ai-code-assistant" / "audit.log.jsonl"), *extra]
+    before = SlowResponses.requests
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert main(args) == 0
+    return time.perf_counter() - start, SlowResponses.requests - before
+
+
+def main_bench() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=40)
+    parser.add_argument("--latency", type=float, default=0.25)
+    args = parser.parse_args()
+    SlowResponses.latency = args.latency
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SlowResponses)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.environ["OPENAI_API_KEY"] = "bench"
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = Path(tmp)
+        write_repo(repo, args.files)
+        print(f"{args.files} modules, {args.latency * 1000:.0f} ms per request\n")
+        print(f"{'run':<34}{'seconds':>10}{'requests':>10}")
+        runs = [
+            ("--llm-concurrency 1, no cache", ("--no-cache", "--llm-concurrency", "1")),
+            ("--llm-concurrency 8, no cache", ("--no-cache",)),
+            ("--llm-concurrency 8, cold cache", ()),
+            ("warm response cache", ("--jobs", "1")),
+        ]
+        for label, extra in runs:
+            if label == "warm response cache":
+                # Drop the per-file cache so every file is regenerated from cached completions.
+                (repo / ".ai-code-assistant" / "generation-cache.json").unlink()
+            seconds, requests = timed_run(repo, *extra)
+            print(f"{label:<34}{seconds:>10.2f}{requests:>10}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main_bench()
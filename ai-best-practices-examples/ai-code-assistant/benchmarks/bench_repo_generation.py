@@ -0,0 +1,67 @@
+"""Wall time of ``gen-tests --repo`` on a synthetic repository: serial, ``--jobs N`` and cached.
+
+Run from the ai-code-assistant directory:
+
+    PYTHONPATH=src python3 benchmarks/bench_repo_generation.py --files 2000 --jobs 4
+
+Each module has ``--functions`` small functions and a class, so parsing and AST codegen
+dominate. Runs use the AST backend (no ``OPENAI_API_KEY``), ``--pyramid all`` and
+``--dry-run`` so nothing but the cache is written. The "unchanged" run repeats the last one
+against the warm cache; "one edit" changes a single file first.
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from ai_code_assistant.cli import main
+
+
+def write_repo(root: Path, files: int, functions: int) -> None:
+    for index in range(files):
+        package = root / "src" / f"pkg{index % 50}"
+        package.mkdir(parents=True, exist_ok=True)
+        lines = ["import os", "import json", ""]
+        for number in range(functions):
+            lines += [f"def func_{number}(a, b=1):", f"    return a + b + {number}", ""]
+        lines += ["class Service:", "    def run(self, value):", "        return value * 2", ""]
+        (package / f"module_{index}.py").write_text("\n".join(lines), encoding="utf-8")
+
+
+def timed_run(repo: Path, *extra: str) -> float:
+    args = ["gen-tests", "--repo", str(repo), "--dry-run", "--output", "json", "--pyramid", "all"]
+    args += ["--audit-log", str(repo / ".ai-code-assistant" / "audit.log.jsonl"), *extra]
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert main(args) == 0
+    return time.perf_counter() - start
+
+
+def main_bench() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--functions", type=int, default=20)
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 4)
+    args = parser.parse_args()
+    os.environ.pop("OPENAI_API_KEY", None)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = Path(tmp)
+        write_repo(repo, args.files, args.functions)
+        print(f"{args.files} modules x {args.functions} functions, --pyramid all\n")
+        print(f"{'run':<28}{'seconds':>10}")
+        print(f"{'serial, no cache':<28}{timed_run(repo, '--no-cache'):>10.2f}")
+        print(f"{f'--jobs {args.jobs}, no cache':<28}{timed_run(repo, '--no-cache', '--jobs', str(args.jobs)):>10.2f}")
+        print(f"{f'--jobs {args.jobs}, cold cache':<28}{timed_run(repo, '--jobs', str(args.jobs)):>10.2f}")
+        print(f"{f'--jobs {args.jobs}, unchanged':<28}{timed_run(repo, '--jobs', str(args.jobs)):>10.2f}")
+        edited = next((repo / "src" / "pkg0").glob("*.py"))
+        edited.write_text(edited.read_text(encoding="utf-8") + "\nEDITED = True\n", encoding="utf-8")
+        print(f"{f'--jobs {args.jobs}, one edit':<28}{timed_run(repo, '--jobs', str(args.jobs)):>10.2f}")
+
+
+if __name__ == "__main__":
+    main_bench()
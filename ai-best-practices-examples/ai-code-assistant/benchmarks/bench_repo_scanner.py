@@ -0,0 +1,79 @@
+"""Scan time of the legacy ``rglob`` scanner against the pruning walk and ``git ls-files``.
+
+Run from the ai-code-assistant directory:
+
+    PYTHONPATH=src python3 benchmarks/bench_repo_scanner.py --sources 2000 --vendored 50000
+
+The synthetic repo has ``--sources`` modules under ``src/`` and ``--vendored`` files split
+between ``node_modules/`` and ``.venv/``, like a checkout with installed dependencies. The
+git run uses a temporary checkout that tracks ``src/`` and ignores the rest.
+"""
+
+import argparse
+import shutil
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+from ai_code_assistant.services.repo_scanner import EXCLUDED_DIRS, iter_python_files
+
+
+def legacy_scan(repo_path: Path) -> list[Path]:
+    """The scanner as it was: walk everything, then filter each path."""
+    root = Path(repo_path).resolve()
+    files = []
+    for path in root.rglob("*.py"):
+        parts = path.resolve().relative_to(root).parts[:-1]
+        if any(part.startswith(".") or part in EXCLUDED_DIRS for part in parts):
+            continue
+        if path.name.startswith("test_") or path.name.endswith("_test.py"):
+            continue
+        files.append(path)
+    return sorted(files)
+
+
+def write_repo(root: Path, sources: int, vendored: int) -> None:
+    for index in range(sources):
+        package = root / "src" / f"pkg{index % 40}"
+        package.mkdir(parents=True, exist_ok=True)
+        (package / f"module_{index}.py").write_text("x = 1\n", encoding="utf-8")
+    for index in range(vendored):
+        base = "node_modules" if index % 2 else ".venv/lib/site-packages"
+        package = root / base / f"dep{index % 500}"
+        package.mkdir(parents=True, exist_ok=True)
+        (package / f"file_{index}.py").write_text("x = 1\n", encoding="utf-8")
+    (root / ".gitignore").write_text("node_modules/\n.venv/\n", encoding="utf-8")
+
+
+def timed(label: str, scan) -> None:
+    start = time.perf_counter()
+    paths = scan()
+    next(paths)
+    first_at = time.perf_counter() - start
+    count = 1 + sum(1 for _ in paths)
+    total = time.perf_counter() - start
+    print(f"{label:<26}{first_at * 1000:>12.1f}{total * 1000:>12.1f}{count:>8}")
+
+
+def main_bench() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sources", type=int, default=2000)
+    parser.add_argument("--vendored", type=int, default=50000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = Path(tmp)
+        write_repo(repo, args.sources, args.vendored)
+        print(f"{args.sources} sources, {args.vendored} vendored files\n")
+        print(f"{'scanner':<26}{'first (ms)':>12}{'total (ms)':>12}{'files':>8}")
+        timed("rglob + filter (legacy)", lambda: iter(legacy_scan(repo)))
+        timed("scandir walk", lambda: iter_python_files(repo, use_git=False))
+        if shutil.which("git"):
+            subprocess.run(["git", "init", "-q"], cwd=repo, check=True)
+            subprocess.run(["git", "add", "src", ".gitignore"], cwd=repo, check=True)
+            timed("git ls-files", lambda: iter_python_files(repo))
+
+
+if __name__ == "__main__":
+    main_bench()
@@ -1,15 +1,56 @@
+import ast
 import os
+import threading
 from pathlib import Path
 
+from ai_code_assistant.adapters.llm_scheduler import LLMScheduler, PromptCache, openai_responses_scheduler
 from ai_code_assistant.services.ast_analysis import AnalysisFacts
-from ai_code_assistant.services.test_codegen import generate_robust_tests
+from ai_code_assistant.services.test_codegen import derive_module_import, generate_robust_tests
+
+DEFAULT_MODEL = "gpt-4.1-mini"
 
 
 class LLMAdapter:
-    """Generates pytest tests with OpenAI when configured, otherwise AST-driven codegen."""
+    """Generates pytest tests with OpenAI when configured, otherwise AST-driven codegen.
+
+    OpenAI requests from every thread go through one shared :class:`LLMScheduler`, which
+    bounds concurrency and rate, retries transient failures and caches completions by prompt
+    hash (persistently when ``cache_path`` is set).
+    """
 
-    def __init__(self, api_key: str | None = None) -> None:
+    def __init__(
+        self,
+        api_key: str | None = None,
+        model: str = DEFAULT_MODEL,
+        base_url: str | None = None,
+        max_concurrency: int = 8,
+        requests_per_second: float | None = None,
+        cache_path: Path | None = None,
+    ) -> None:
         self._api_key = api_key if api_key is not None else os.getenv("OPENAI_API_KEY")
+        self.model = model
+        self.base_url = base_url
+        self.max_concurrency = max_concurrency
+        self.requests_per_second = requests_per_second
+        self.cache_path = cache_path
+        self._scheduler: LLMScheduler | None = None
+        self._scheduler_lock = threading.Lock()
+
+    def __getstate__(self) -> dict:
+        # Worker processes build their own scheduler; its loop and client cannot be pickled.
+        state = self.__dict__.copy()
+        state["_scheduler"] = None
+        del state["_scheduler_lock"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._scheduler_lock = threading.Lock()
+
+    @property
+    def backend(self) -> str:
+        """Which generator ``generate_tests`` tries first: ``"openai"`` or ``"ast"``."""
+        return "openai" if self._api_key else "ast"
 
     def generate_tests(
         self,
@@ -19,6 +60,7 @@ class LLMAdapter:
         test_level: str = "unit",
         source_path: Path | None = None,
         repo_root: Path | None = None,
+        tree: ast.Module | None = None,
     ) -> str:
         if self._api_key:
             response = self._generate_with_openai(
@@ -38,6 +80,7 @@ class LLMAdapter:
             test_level=test_level,
             source_path=source_path,
             repo_root=repo_root,
+            tree=tree,
         )
 
     def _generate_with_openai(
@@ -50,7 +93,7 @@ class LLMAdapter:
         repo_root: Path | None,
     ) -> str:
         try:
-            from openai import OpenAI  # type: ignore
+            import openai  # type: ignore  # noqa: F401
         except Exception:
             return generate_robust_tests(
                 source_code=source_code,
@@ -61,48 +104,8 @@ class LLMAdapter:
                 repo_root=repo_root,
             )
 
-        from ai_code_assistant.services.test_codegen import derive_module_import
-
-        module_import = derive_module_import(source_path, repo_root, module_name)
-        level_guidance = {
-            "unit": (
-                "Write fast isolated tests. Mock external I/O (os, requests, subprocess) with unittest.mock. "
-                "Import and call real functions from the module."
-            ),
-            "integration": (
-                "Write tests that exercise multiple functions or module wiring together. "
-                "Use tmp_path for filesystem interactions when needed."
-            ),
-            "e2e": (
-                "Write an end-to-end test that exercises the module's primary workflow or main() entrypoint. "
-                "Use subprocess only when the module is intended to run as a script."
-            ),
-        }.get(test_level, "Write focused pytest tests.")
-
-        prompt = (
-            f"Write pytest {test_level} tests for this Python module.\n"
-            "Requirements:\n"
-            "- Return only valid Python test code (no markdown fences).\n"
-            f"- Import from `{module_import}` using explicit imports.\n"
-            "- Every test must call real code from the module and assert on behavior.\n"
-            "- Do not use `assert True` or empty placeholder tests.\n"
-            f"- Tag the module with `pytestmark = pytest.mark.{test_level}`.\n"
-            f"- {level_guidance}\n\n"
-            f"Module name: {module_name}\n"
-            f"Import path: {module_import}\n"
-            f"Functions: {facts.function_names if facts else []}\n"
-            f"Classes: {facts.class_names if facts else []}\n"
-            f"Imports used: {facts.import_names if facts else []}\n"
-            f"Has async functions: {facts.has_async if facts else False}\n\n"
-            f"{source_code}"
-        )
-        client = OpenAI(api_key=self._api_key)
-        response = client.responses.create(
-            model="gpt-4.1-mini",
-            input=prompt,
-            temperature=0,
-        )
-        text = getattr(response, "output_text", "").strip()
+        prompt = build_test_prompt(source_code, module_name, facts, test_level, source_path, repo_root)
+        text = self.scheduler().complete(prompt).strip()
         if not text:
             return generate_robust_tests(
                 source_code=source_code,
@@ -113,3 +116,67 @@ class LLMAdapter:
                 repo_root=repo_root,
             )
         return text
+
+    def scheduler(self) -> LLMScheduler:
+        """The shared OpenAI request scheduler, created on first use."""
+        with self._scheduler_lock:
+            if self._scheduler is None:
+                self._scheduler = openai_responses_scheduler(
+                    api_key=self._api_key,
+                    model=self.model,
+                    base_url=self.base_url,
+                    cache=PromptCache(self.cache_path),
+                    max_concurrency=self.max_concurrency,
+                    requests_per_second=self.requests_per_second,
+                )
+            return self._scheduler
+
+    def close(self) -> None:
+        with self._scheduler_lock:
+            scheduler, self._scheduler = self._scheduler, None
+        if scheduler is not None:
+            scheduler.close()
+
+
+def build_test_prompt(
+    source_code: str,
+    module_name: str,
+    facts: AnalysisFacts | None,
+    test_level: str,
+    source_path: Path | None,
+    repo_root: Path | None,
+) -> str:
+    """The generation prompt; it covers source, level and facts, so it doubles as the cache key."""
+    module_import = derive_module_import(source_path, repo_root, module_name)
+    level_guidance = {
+        "unit": (
+            "Write fast isolated tests. Mock external I/O (os, requests, subprocess) with unittest.mock. "
+            "Import and call real functions from the module."
+        ),
+        "integration": (
+            "Write tests that exercise multiple functions or module wiring together. "
+            "Use tmp_path for filesystem interactions when needed."
+        ),
+        "e2e": (
+            "Write an end-to-end test that exercises the module's primary workflow or main() entrypoint. "
+            "Use subprocess only when the module is intended to run as a script."
+        ),
+    }.get(test_level, "Write focused pytest tests.")
+
+    return (
+        f"Write pytest {test_level} tests for this Python module.\n"
+        "Requirements:\n"
+        "- Return only valid Python test code (no markdown fences).\n"
+        f"- Import from `{module_import}` using explicit imports.\n"
+        "- Every test must call real code from the module and assert on behavior.\n"
+        "- Do not use `assert True` or empty placeholder tests.\n"
+        f"- Tag the module with `pytestmark = pytest.mark.{test_level}`.\n"
+        f"- {level_guidance}\n\n"
+        f"Module name: {module_name}\n"
+        f"Import path: {module_import}\n"
+        f"Functions: {facts.function_names if facts else []}\n"
+        f"Classes: {facts.class_names if facts else []}\n"
+        f"Imports used: {facts.import_names if facts else []}\n"
+        f"Has async functions: {facts.has_async if facts else False}\n\n"
+        f"{source_code}"
+    )
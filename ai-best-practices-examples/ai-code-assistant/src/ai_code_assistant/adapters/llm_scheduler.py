@@ -0,0 +1,297 @@
+import asyncio
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Awaitable, Callable, Iterable
+
+# Statuses worth retrying: timeouts, conflicts, rate limits and server-side failures.
+RETRYABLE_STATUS = frozenset({408, 409, 429, 500, 502, 503, 504})
+
+Send = Callable[[str], Awaitable[str]]
+
+
+class RetryableError(Exception):
+    """A transient request failure; ``retry_after`` is the server's hint in seconds, if any."""
+
+    def __init__(self, message: str, retry_after: float | None = None) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Async rate limiter: ``rate`` requests per second, in bursts of up to ``capacity``."""
+
+    def __init__(self, rate: float, capacity: float | None = None, clock: Callable[[], float] = time.monotonic) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = max(1.0, capacity if capacity is not None else rate)
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        # Waiters queue on the lock, so tokens are handed out first come, first served.
+        async with self._lock:
+            while True:
+                now = self._clock()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class PromptCache:
+    """Persistent prompt-hash → completion map, kept as an append-only JSONL file.
+
+    Without a ``path`` the cache lives only in memory. A torn last line (from an interrupted
+    run) is ignored on load. When more than half the lines read are dead (torn, or
+    superseded by a later completion for the same key), the file is compacted to one line
+    per entry, atomically.
+    """
+
+    def __init__(self, path: Path | None = None) -> None:
+        self.path = path
+        self._entries: dict[str, str] = {}
+        self._lock = threading.Lock()
+        # Set when the file ends in a torn line, so the next append starts on a line of its own.
+        self._needs_newline = False
+        if path is None:
+            return
+        try:
+            text = path.read_text(encoding="utf-8")
+        except OSError:
+            return
+        self._needs_newline = bool(text) and not text.endswith("\n")
+        lines = text.splitlines()
+        for line in lines:
+            try:
+                record = json.loads(line)
+                self._entries[record["key"]] = record["completion"]
+            except (ValueError, KeyError, TypeError):
+                continue
+        if len(lines) - len(self._entries) > len(self._entries):
+            self._compact()
+
+    def _compact(self) -> None:
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        try:
+            with tmp_path.open("w", encoding="utf-8") as f:
+                for key, completion in self._entries.items():
+                    f.write(json.dumps({"key": key, "completion": completion}))
+                    f.write("\n")
+            os.replace(tmp_path, self.path)
+            self._needs_newline = False
+        except OSError:
+            # A cache that cannot be rewritten still works; it just stays long.
+            tmp_path.unlink(missing_ok=True)
+
+    @staticmethod
+    def key(namespace: str, prompt: str) -> str:
+        return hashlib.sha256(f"{namespace}\0{prompt}".encode("utf-8")).hexdigest()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> str | None:
+        return self._entries.get(key)
+
+    def put(self, key: str, completion: str) -> None:
+        with self._lock:
+            if self._entries.get(key) == completion:
+                return
+            self._entries[key] = completion
+            if self.path is None:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a", encoding="utf-8") as f:
+                if self._needs_newline:
+                    f.write("\n")
+                    self._needs_newline = False
+                f.write(json.dumps({"key": key, "completion": completion}))
+                f.write("\n")
+
+
+class LLMScheduler:
+    """Runs completion requests concurrently on one background event loop.
+
+    ``send`` performs a single request; it should raise :class:`RetryableError` for transient
+    failures, which are retried with capped, fully jittered exponential backoff. At most
+    ``max_concurrency`` requests are in flight and, with ``requests_per_second``, they start
+    no faster than a token bucket allows. Completions are cached by a hash of ``namespace``
+    (the model) and the prompt, and identical prompts in flight at once share one request.
+
+    ``complete`` and ``complete_many`` are synchronous and thread-safe, so worker threads can
+    share one scheduler and with it one HTTP client and one set of limits.
+    """
+
+    def __init__(
+        self,
+        send: Send,
+        namespace: str = "",
+        max_concurrency: int = 8,
+        requests_per_second: float | None = None,
+        burst: float | None = None,
+        max_retries: int = 4,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        cache: PromptCache | None = None,
+        on_close: Callable[[], Awaitable[None]] | None = None,
+    ) -> None:
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.namespace = namespace
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.cache = cache if cache is not None else PromptCache()
+        self.requests = 0
+        self.retries = 0
+        self.cache_hits = 0
+        self._send = send
+        self._on_close = on_close
+        self._rate = (requests_per_second, burst)
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._start_lock = threading.Lock()
+        # Created on the scheduler's loop, which is the only place they are used.
+        self._semaphore: asyncio.Semaphore | None = None
+        self._bucket: TokenBucket | None = None
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    def complete(self, prompt: str) -> str:
+        return self.submit(prompt).result()
+
+    def complete_many(self, prompts: Iterable[str]) -> list[str]:
+        futures = [self.submit(prompt) for prompt in prompts]
+        return [future.result() for future in futures]
+
+    def submit(self, prompt: str) -> Future:
+        return asyncio.run_coroutine_threadsafe(self._complete(prompt), self._ensure_loop())
+
+    def close(self) -> None:
+        with self._start_lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+        if self._on_close is not None:
+            asyncio.run_coroutine_threadsafe(self._on_close(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._start_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                ready = threading.Event()
+
+                def run() -> None:
+                    asyncio.set_event_loop(loop)
+                    self._semaphore = asyncio.Semaphore(self.max_concurrency)
+                    rate, burst = self._rate
+                    self._bucket = TokenBucket(rate, burst) if rate else None
+                    loop.call_soon(ready.set)
+                    loop.run_forever()
+
+                self._thread = threading.Thread(target=run, name="llm-scheduler", daemon=True)
+                self._thread.start()
+                ready.wait()
+                self._loop = loop
+            return self._loop
+
+    async def _complete(self, prompt: str) -> str:
+        key = PromptCache.key(self.namespace, prompt)
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.cache_hits += 1
+            return cached
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.cache_hits += 1
+            return await asyncio.shield(pending)
+        pending = self._inflight[key] = asyncio.get_running_loop().create_future()
+        try:
+            text = await self._request(prompt)
+        except asyncio.CancelledError:
+            pending.cancel()
+            raise
+        except Exception as exc:
+            pending.set_exception(exc)
+            # Waiters that already joined see the error; nobody is left to retrieve it otherwise.
+            pending.exception()
+            raise
+        else:
+            if text.strip():
+                self.cache.put(key, text)
+            pending.set_result(text)
+            return text
+        finally:
+            del self._inflight[key]
+
+    async def _request(self, prompt: str) -> str:
+        attempt = 0
+        while True:
+            if self._bucket is not None:
+                await self._bucket.acquire()
+            try:
+                async with self._semaphore:
+                    self.requests += 1
+                    return await self._send(prompt)
+            except RetryableError as exc:
+                if attempt >= self.max_retries:
+                    raise
+                delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+                if exc.retry_after is not None:
+                    delay = max(delay, min(exc.retry_after, self.backoff_max))
+                attempt += 1
+                self.retries += 1
+                # Back off outside the semaphore so other prompts keep the slot busy.
+                await asyncio.sleep(delay)
+
+
+def openai_responses_scheduler(
+    api_key: str,
+    model: str,
+    base_url: str | None = None,
+    cache: PromptCache | None = None,
+    **limits,
+) -> LLMScheduler:
+    """Scheduler that sends prompts to the OpenAI Responses API through one shared client.
+
+    The client's own retries are disabled; the scheduler retries instead so backoff is
+    shared with the rate limiter. Requires the optional ``openai`` package.
+    """
+    import openai  # type: ignore
+
+    client = openai.AsyncOpenAI(api_key=api_key, base_url=base_url, max_retries=0)
+
+    async def send(prompt: str) -> str:
+        try:
+            response = await client.responses.create(model=model, input=prompt, temperature=0)
+        except openai.APIStatusError as exc:
+            if exc.status_code not in RETRYABLE_STATUS:
+                raise
+            raise RetryableError(str(exc), retry_after=_retry_after(exc.response.headers)) from exc
+        except openai.APIConnectionError as exc:
+            raise RetryableError(str(exc)) from exc
+        return getattr(response, "output_text", "") or ""
+
+    return LLMScheduler(send, namespace=model, cache=cache, on_close=client.close, **limits)
+
+
+def _retry_after(headers) -> float | None:
+    try:
+        return max(0.0, float(headers.get("retry-after")))
+    except (TypeError, ValueError):
+        return None
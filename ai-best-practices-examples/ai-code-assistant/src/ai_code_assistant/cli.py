@@ -7,13 +7,21 @@ from ai_code_assistant.audit import append_audit_event
 from ai_code_assistant.automation import load_plan, run_steps
 from ai_code_assistant.extensions import validate_manifest
 from ai_code_assistant.github_ingest import ingest_pr_with_gh
-from ai_code_assistant.policy import load_policy
+from ai_code_assistant.policy import AssistantPolicy, load_policy
 from ai_code_assistant.redaction import redact_mapping
 from ai_code_assistant.risk import evaluate_risk, score_write_action
-from ai_code_assistant.services.repo_scanner import scan_python_files
+from ai_code_assistant.services.repo_generation import (
+    GenerationCache,
+    generate_repo_tests,
+    generator_fingerprint,
+)
+from ai_code_assistant.services.repo_scanner import iter_python_files
 from ai_code_assistant.services.test_generator import generate_pyramid_for_file
 from ai_code_assistant.security import build_policy
 
+# OpenAI completions keyed by prompt hash, relative to the repo (or the cwd for a single file).
+LLM_CACHE_PATH = Path(".ai-code-assistant") / "llm-cache.jsonl"
+
 
 def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(prog="ai-code-assistant")
@@ -49,6 +57,31 @@ def build_parser() -> argparse.ArgumentParser:
         default="unit",
         help="Generate one level or full test pyramid.",
     )
+    gen_tests.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Worker processes for --repo generation (default: 1, in-process).",
+    )
+    gen_tests.add_argument(
+        "--no-cache",
+        action="store_true",
+        help=(
+            "Regenerate every file instead of skipping sources unchanged since the last --repo run, "
+            "and bypass the OpenAI response cache."
+        ),
+    )
+    gen_tests.add_argument(
+        "--llm-concurrency",
+        type=int,
+        default=8,
+        help="Maximum OpenAI requests in flight at once (default: 8).",
+    )
+    gen_tests.add_argument(
+        "--llm-rate",
+        type=float,
+        help="Maximum OpenAI requests started per second (default: unlimited).",
+    )
     gen_tests.add_argument("--pr-repo", help="GitHub repo owner/name for PR ingestion.")
     gen_tests.add_argument("--pr-number", type=int, help="GitHub PR number for metadata enrichment.")
 
@@ -90,8 +123,34 @@ def _run_gen_tests(args: argparse.Namespace, parser: argparse.ArgumentParser) ->
     if args.headless:
         args.output = "json"
 
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1.")
+    if args.llm_concurrency < 1:
+        parser.error("--llm-concurrency must be at least 1.")
+    if args.llm_rate is not None and args.llm_rate <= 0:
+        parser.error("--llm-rate must be positive.")
+
     policy_data, policy_source = load_policy(args.policy_file)
-    adapter = LLMAdapter()
+    cache_root = Path(args.repo).resolve() if args.repo else Path.cwd().resolve()
+    adapter = LLMAdapter(
+        max_concurrency=args.llm_concurrency,
+        requests_per_second=args.llm_rate,
+        cache_path=None if args.no_cache else cache_root / LLM_CACHE_PATH,
+    )
+    try:
+        return _generate(args, parser, adapter, policy_data, policy_source)
+    finally:
+        # Stops the OpenAI scheduler's loop thread and closes its HTTP client.
+        adapter.close()
+
+
+def _generate(
+    args: argparse.Namespace,
+    parser: argparse.ArgumentParser,
+    adapter: LLMAdapter,
+    policy_data: AssistantPolicy,
+    policy_source: str,
+) -> int:
     results: list[dict[str, str | bool]] = []
     audit_log_path = Path(args.audit_log).resolve()
     pr_metadata = None
@@ -141,15 +200,23 @@ def _run_gen_tests(args: argparse.Namespace, parser: argparse.ArgumentParser) ->
     if not repo_root.exists() or not repo_root.is_dir():
         parser.error("--repo must be an existing directory.")
 
-    files = scan_python_files(repo_path=repo_root)
-    for source_path in files:
-        generated_tests = _generate_tests_for_levels(
-            source_path=source_path,
-            repo_root=repo_root,
-            adapter=adapter,
-            pyramid=args.pyramid,
-        )
-        for generated in generated_tests:
+    cache = None if args.no_cache else GenerationCache(repo_root, generator_fingerprint(adapter))
+    file_counts = {"processed": 0, "skipped": 0, "cached": 0}
+    # Every scanned file yields exactly one outcome; they are the sources the cache keeps.
+    seen: list[Path] = []
+    outcomes = generate_repo_tests(
+        iter_python_files(repo_root),
+        repo_root=repo_root,
+        adapter=adapter,
+        levels=_pyramid_levels(args.pyramid),
+        jobs=args.jobs,
+        cache=cache,
+        dry_run=args.dry_run,
+    )
+    for outcome in outcomes:
+        seen.append(outcome.source_path)
+        file_counts[outcome.status] += 1
+        for generated in outcome.tests:
             results.append(
                 _output_one(
                     generated.target_path,
@@ -157,12 +224,14 @@ def _run_gen_tests(args: argparse.Namespace, parser: argparse.ArgumentParser) ->
                     dry_run=args.dry_run,
                     output_mode=args.output,
                     audit_log_path=audit_log_path,
-                    source_path=source_path,
+                    source_path=outcome.source_path,
                     profile=args.profile,
                     policy=policy_data,
                     approve_high_risk=args.approve_high_risk,
                 )
             )
+    if cache is not None:
+        cache.save(keep=seen)
 
     _finalize_output(
         output_mode=args.output,
@@ -175,14 +244,19 @@ def _run_gen_tests(args: argparse.Namespace, parser: argparse.ArgumentParser) ->
         pr_metadata=pr_metadata,
         redaction_patterns=policy_data.redaction_patterns,
         redaction_enabled=policy_data.redaction_enabled,
+        file_counts=file_counts,
     )
     return 0
 
 
-def _generate_tests_for_levels(source_path: Path, repo_root: Path, adapter: LLMAdapter, pyramid: str):
+def _pyramid_levels(pyramid: str) -> tuple[str, ...]:
     if pyramid == "all":
-        return generate_pyramid_for_file(source_path, repo_root, adapter, ("unit", "integration", "e2e"))
-    return generate_pyramid_for_file(source_path, repo_root, adapter, (pyramid,))
+        return ("unit", "integration", "e2e")
+    return (pyramid,)
+
+
+def _generate_tests_for_levels(source_path: Path, repo_root: Path, adapter: LLMAdapter, pyramid: str):
+    return generate_pyramid_for_file(source_path, repo_root, adapter, _pyramid_levels(pyramid))
 
 
 def _output_one(
@@ -245,18 +319,19 @@ def _finalize_output(
     pr_metadata,
     redaction_patterns: list[str],
     redaction_enabled: bool,
+    file_counts: dict[str, int] | None = None,
 ) -> None:
-    append_audit_event(
-        audit_log_path,
-        {
-            "event_type": "run_summary",
-            "profile": profile,
-            "dry_run": dry_run,
-            "processed_count": processed_count,
-            "output_mode": output_mode,
-            "policy_source": policy_source,
-        },
-    )
+    summary = {
+        "event_type": "run_summary",
+        "profile": profile,
+        "dry_run": dry_run,
+        "processed_count": processed_count,
+        "output_mode": output_mode,
+        "policy_source": policy_source,
+    }
+    if file_counts is not None:
+        summary["files"] = file_counts
+    append_audit_event(audit_log_path, summary)
     safe_results = results
     if redaction_enabled:
         safe_results = [redact_mapping(result, redaction_patterns) for result in results]
@@ -269,6 +344,8 @@ def _finalize_output(
             "policy_source": policy_source,
             "results": safe_results,
         }
+        if file_counts is not None:
+            payload["files"] = file_counts
         if pr_metadata is not None:
             payload["pr_metadata"] = {
                 "number": pr_metadata.number,
@@ -282,6 +359,11 @@ def _finalize_output(
         return
 
     print(f"Processed {processed_count} file(s).")
+    if file_counts is not None and (file_counts["skipped"] or file_counts["cached"]):
+        print(
+            f"Sources: {file_counts['processed']} generated, {file_counts['cached']} from cache, "
+            f"{file_counts['skipped']} unchanged and skipped."
+        )
 
 
 def _run_extensions(args: argparse.Namespace) -> int:
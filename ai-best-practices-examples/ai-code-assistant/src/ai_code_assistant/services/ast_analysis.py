@@ -14,7 +14,11 @@ class AnalysisFacts:
 
 def analyze_source(source_path: Path) -> AnalysisFacts:
     source_code = source_path.read_text(encoding="utf-8")
-    tree = ast.parse(source_code)
+    return analyze_tree(ast.parse(source_code), module_name=source_path.stem)
+
+
+def analyze_tree(tree: ast.Module, module_name: str) -> AnalysisFacts:
+    """Collect facts from an already parsed module, so callers can share one parse."""
     function_names: list[str] = []
     class_names: list[str] = []
     import_names: list[str] = []
@@ -34,7 +38,7 @@ def analyze_source(source_path: Path) -> AnalysisFacts:
             import_names.extend(alias.name for alias in node.names)
 
     return AnalysisFacts(
-        module_name=source_path.stem,
+        module_name=module_name,
         function_names=sorted(set(function_names)),
         class_names=sorted(set(class_names)),
         import_names=sorted(set(import_names)),
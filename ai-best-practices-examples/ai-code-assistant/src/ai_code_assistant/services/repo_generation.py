@@ -0,0 +1,195 @@
+import ast
+import hashlib
+import json
+import os
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from ai_code_assistant import __version__
+from ai_code_assistant.adapters.llm_adapter import LLMAdapter
+from ai_code_assistant.services.test_generator import GeneratedTest, generate_pyramid_for_file
+
+CACHE_DIRNAME = ".ai-code-assistant"
+CACHE_FILENAME = "generation-cache.json"
+CACHE_FORMAT = 1
+# Files submitted to the pool ahead of the one being yielded, per worker.
+IN_FLIGHT_PER_WORKER = 2
+
+
+@dataclass(frozen=True)
+class FileOutcome:
+    source_path: Path
+    # "processed" (generated now), "cached" (replayed from the cache) or "skipped" (unchanged, tests on disk).
+    status: str
+    tests: list[GeneratedTest]
+
+
+class GenerationCache:
+    """Content-hash cache of generated tests, stored as JSON under ``<repo>/.ai-code-assistant/``.
+
+    Entries are keyed by source path relative to the repo and hold the source's SHA-256 plus
+    each generated level's target and content. The whole cache is discarded when the
+    generator (package version or adapter backend) changes.
+    """
+
+    def __init__(self, repo_root: Path, generator: str) -> None:
+        self.repo_root = repo_root
+        self.path = repo_root / CACHE_DIRNAME / CACHE_FILENAME
+        self.generator = generator
+        self._entries: dict[str, dict] = {}
+        try:
+            payload = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if payload.get("format") == CACHE_FORMAT and payload.get("generator") == generator:
+            self._entries = payload.get("files", {})
+
+    def lookup(self, source_path: Path, digest: str, levels: tuple[str, ...]) -> list[GeneratedTest] | None:
+        entry = self._entries.get(self._key(source_path))
+        if entry is None or entry.get("sha256") != digest:
+            return None
+        cached_levels = entry.get("levels", {})
+        if any(level not in cached_levels for level in levels):
+            return None
+        return [
+            GeneratedTest(
+                source_path=source_path,
+                target_path=self.repo_root / cached_levels[level]["target_path"],
+                content=cached_levels[level]["content"],
+                level=level,
+            )
+            for level in levels
+        ]
+
+    def store(self, source_path: Path, digest: str, tests: list[GeneratedTest]) -> None:
+        key = self._key(source_path)
+        entry = self._entries.get(key)
+        if entry is None or entry.get("sha256") != digest:
+            entry = self._entries[key] = {"sha256": digest, "levels": {}}
+        for test in tests:
+            entry["levels"][test.level] = {
+                "target_path": os.path.relpath(test.target_path, self.repo_root),
+                "content": test.content,
+            }
+
+    def save(self, keep: Iterable[Path]) -> None:
+        """Write the cache atomically, dropping entries for sources not in ``keep``."""
+        keys = {self._key(path) for path in keep}
+        files = {key: entry for key, entry in self._entries.items() if key in keys}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".json.tmp")
+        tmp_path.write_text(
+            json.dumps({"format": CACHE_FORMAT, "generator": self.generator, "files": files}),
+            encoding="utf-8",
+        )
+        os.replace(tmp_path, self.path)
+
+    def _key(self, source_path: Path) -> str:
+        return os.path.relpath(source_path, self.repo_root)
+
+
+def generator_fingerprint(adapter: LLMAdapter) -> str:
+    return f"{__version__}:{adapter.backend}"
+
+
+def generate_repo_tests(
+    files: Iterable[Path],
+    repo_root: Path,
+    adapter: LLMAdapter,
+    levels: tuple[str, ...],
+    jobs: int = 1,
+    cache: GenerationCache | None = None,
+    dry_run: bool = False,
+) -> Iterator[FileOutcome]:
+    """Generate tests for ``files``, yielding one outcome per file in input order.
+
+    Files whose content hash matches the cache are not parsed at all: they are skipped when
+    their tests are already on disk, and replayed from the cache otherwise (always on a dry
+    run, which writes nothing). The rest are read and hashed here and handed to ``jobs``
+    worker processes, each of which parses a file once for all levels. With the OpenAI
+    backend, work is I/O-bound, so files are parsed here and go to threads instead, enough
+    to keep the adapter's shared request scheduler at its concurrency limit. ``files`` is
+    consumed lazily, so work starts while a scan is still producing paths.
+
+    At most ``IN_FLIGHT_PER_WORKER`` files per worker are submitted but not yet yielded; past
+    that, reading more files waits for the oldest one, so sources and trees for a whole
+    repository are never held at once.
+    """
+    workers = _workers(adapter, jobs)
+    executor = _executor(adapter, workers)
+    max_in_flight = IN_FLIGHT_PER_WORKER * workers
+    in_flight = 0
+    # Outcomes in input order; a pending entry holds (digest, future) until its worker is done.
+    queue: deque[tuple[Path, FileOutcome | tuple[str, Future]]] = deque()
+    try:
+        for source_path in files:
+            while in_flight >= max_in_flight:
+                source, entry = queue.popleft()
+                in_flight -= not isinstance(entry, FileOutcome)
+                yield _resolve(cache, source, entry)
+            data = source_path.read_bytes()
+            digest = hashlib.sha256(data).hexdigest()
+            cached = cache.lookup(source_path, digest, levels) if cache is not None else None
+            if cached is None:
+                source_text = data.decode("utf-8")
+                # Threads get a tree parsed here: ast.parse is not thread-safe on every
+                # supported CPython, and the workers only need to wait on requests.
+                tree = ast.parse(source_text) if isinstance(executor, ThreadPoolExecutor) else None
+                task = (source_path, source_text, repo_root, adapter, levels, tree)
+                if executor is None:
+                    queue.append((source_path, _processed(cache, source_path, digest, _generate_one(task))))
+                else:
+                    queue.append((source_path, (digest, executor.submit(_generate_one, task))))
+                    in_flight += 1
+            elif not dry_run and all(test.target_path.exists() for test in cached):
+                queue.append((source_path, FileOutcome(source_path, "skipped", [])))
+            else:
+                queue.append((source_path, FileOutcome(source_path, "cached", cached)))
+            while queue and (isinstance(queue[0][1], FileOutcome) or queue[0][1][1].done()):
+                source, entry = queue.popleft()
+                in_flight -= not isinstance(entry, FileOutcome)
+                yield _resolve(cache, source, entry)
+        while queue:
+            yield _resolve(cache, *queue.popleft())
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+
+def _workers(adapter: LLMAdapter, jobs: int) -> int:
+    if adapter.backend == "openai":
+        return max(jobs, adapter.max_concurrency)
+    return jobs
+
+
+def _executor(adapter: LLMAdapter, workers: int) -> Executor | None:
+    if adapter.backend == "openai":
+        return ThreadPoolExecutor(max_workers=workers)
+    return ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+
+
+def _resolve(
+    cache: GenerationCache | None, source_path: Path, entry: FileOutcome | tuple[str, Future]
+) -> FileOutcome:
+    if isinstance(entry, FileOutcome):
+        return entry
+    digest, future = entry
+    return _processed(cache, source_path, digest, future.result())
+
+
+def _processed(
+    cache: GenerationCache | None, source_path: Path, digest: str, tests: list[GeneratedTest]
+) -> FileOutcome:
+    if cache is not None:
+        cache.store(source_path, digest, tests)
+    return FileOutcome(source_path, "processed", tests)
+
+
+def _generate_one(
+    task: tuple[Path, str, Path, LLMAdapter, tuple[str, ...], ast.Module | None],
+) -> list[GeneratedTest]:
+    source_path, source_text, repo_root, adapter, levels, tree = task
+    return generate_pyramid_for_file(source_path, repo_root, adapter, levels, source_text=source_text, tree=tree)
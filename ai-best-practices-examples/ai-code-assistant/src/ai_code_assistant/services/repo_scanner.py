@@ -1,4 +1,9 @@
+import os
+import re
+import shutil
+import subprocess
 from pathlib import Path
+from typing import Iterator, NamedTuple
 
 EXCLUDED_DIRS = {
     ".git",
@@ -14,22 +19,205 @@ EXCLUDED_DIRS = {
 }
 
 
-def scan_python_files(repo_path: str | Path) -> list[Path]:
+class IgnoreRule(NamedTuple):
+    regex: re.Pattern
+    negate: bool
+    dir_only: bool
+    # Patterns with a slash match the path relative to their .gitignore; others match any name.
+    anchored: bool
+
+
+def scan_python_files(repo_path: str | Path, use_git: bool = True) -> list[Path]:
+    return sorted(iter_python_files(repo_path, use_git=use_git))
+
+
+def iter_python_files(repo_path: str | Path, use_git: bool = True) -> Iterator[Path]:
+    """Yield candidate source files under ``repo_path`` as they are found.
+
+    In a git checkout (and with ``use_git``) the candidates come from ``git ls-files``:
+    tracked files plus untracked ones that are not ignored. Otherwise the tree is walked with
+    ``os.scandir``; excluded, hidden and ``.gitignore``-d directories are pruned before they
+    are entered. Either way, paths under excluded or hidden directories and test modules are
+    skipped. The walk yields in sorted order; git yields in git's order.
+    """
     root = Path(repo_path).resolve()
-    files: list[Path] = []
-    for path in root.rglob("*.py"):
-        if _is_excluded(path=path, root=root):
+    if use_git and _in_git_checkout(root):
+        yield from _iter_git_files(root)
+    else:
+        yield from _walk(root)
+
+
+def load_gitignore(path: str | Path) -> list[IgnoreRule]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    except (OSError, UnicodeDecodeError):
+        return []
+    rules = [_compile_rule(line) for line in lines]
+    return [rule for rule in rules if rule is not None]
+
+
+def is_ignored(rules: list[tuple[str, list[IgnoreRule]]], rel_path: str, is_dir: bool) -> bool:
+    """Whether ``rel_path`` (relative to the walk root, ``/``-separated) is ignored.
+
+    ``rules`` pairs each .gitignore's directory (relative, ``""`` for the root) with its rules,
+    outermost first; as in git, the last matching rule wins.
+    """
+    ignored = False
+    name = rel_path.rsplit("/", 1)[-1]
+    for base, base_rules in rules:
+        if base:
+            if not rel_path.startswith(base + "/"):
+                continue
+            local = rel_path[len(base) + 1 :]
+        else:
+            local = rel_path
+        for rule in base_rules:
+            if rule.dir_only and not is_dir:
+                continue
+            if rule.regex.fullmatch(local if rule.anchored else name):
+                ignored = not rule.negate
+    return ignored
+
+
+def _walk(root: Path) -> Iterator[Path]:
+    # Depth-first with each directory's entries sorted by name, which is Path sort order.
+    # Each frame holds a sorted entry iterator, the directory's relative path and the
+    # .gitignore rules in effect there.
+    root_rules = load_gitignore(root / ".gitignore")
+    stack = [(iter(_sorted_entries(str(root))), "", [("", root_rules)] if root_rules else [])]
+    while stack:
+        entries, rel_dir, rules = stack[-1]
+        entry = next(entries, None)
+        if entry is None:
+            stack.pop()
+            continue
+        rel = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+        try:
+            is_dir = entry.is_dir(follow_symlinks=False)
+        except OSError:
             continue
-        files.append(path)
-    return sorted(files)
-
-
-def _is_excluded(path: Path, root: Path) -> bool:
-    rel = path.resolve().relative_to(root)
-    parts = rel.parts[:-1]
-    for part in parts:
-        if part.startswith(".") or part in EXCLUDED_DIRS:
-            return True
-    if path.name.startswith("test_") or path.name.endswith("_test.py"):
-        return True
-    return False
+        if is_dir:
+            if entry.name.startswith(".") or entry.name in EXCLUDED_DIRS or is_ignored(rules, rel, True):
+                continue
+            child_rules = load_gitignore(os.path.join(entry.path, ".gitignore"))
+            if child_rules:
+                rules = [*rules, (rel, child_rules)]
+            stack.append((iter(_sorted_entries(entry.path)), rel, rules))
+        elif _is_candidate(entry.name) and not is_ignored(rules, rel, False):
+            yield Path(entry.path)
+
+
+def _sorted_entries(path: str) -> list[os.DirEntry]:
+    try:
+        with os.scandir(path) as it:
+            return sorted(it, key=lambda entry: entry.name)
+    except OSError:
+        return []
+
+
+def _in_git_checkout(root: Path) -> bool:
+    if not root.is_dir() or shutil.which("git") is None:
+        return False
+    result = subprocess.run(
+        ["git", "rev-parse", "--is-inside-work-tree"],
+        cwd=root,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    return result.returncode == 0 and result.stdout.strip() == "true"
+
+
+def _iter_git_files(root: Path) -> Iterator[Path]:
+    # Paths come back relative to ``root``, NUL-separated, as git finds them.
+    process = subprocess.Popen(
+        ["git", "ls-files", "-z", "--cached", "--others", "--exclude-standard", "--", "*.py"],
+        cwd=root,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        pending = b""
+        for chunk in iter(lambda: process.stdout.read(65536), b""):
+            *names, pending = (pending + chunk).split(b"\0")
+            for name in names:
+                rel = os.fsdecode(name)
+                if _is_candidate_path(rel) and os.path.isfile(root / rel):
+                    # Tracked files deleted from the work tree are still listed; isfile drops them.
+                    yield root / rel
+    finally:
+        process.stdout.close()
+        if process.wait() not in (0, -13):
+            raise RuntimeError(f"git ls-files failed in {root} (exit {process.returncode})")
+
+
+def _is_candidate_path(rel_path: str) -> bool:
+    *parts, name = rel_path.split("/")
+    if any(part.startswith(".") or part in EXCLUDED_DIRS for part in parts):
+        return False
+    return _is_candidate(name)
+
+
+def _is_candidate(name: str) -> bool:
+    return name.endswith(".py") and not (name.startswith("test_") or name.endswith("_test.py"))
+
+
+def _compile_rule(line: str) -> IgnoreRule | None:
+    line = line.rstrip("\n")
+    if not line.strip() or line.startswith("#"):
+        return None
+    # Trailing spaces are ignored unless escaped.
+    stripped = line.rstrip(" ")
+    if stripped.endswith("\\") and len(stripped) < len(line):
+        stripped += " "
+    line = stripped
+    negate = line.startswith("!")
+    if negate:
+        line = line[1:]
+    elif line.startswith("\\!") or line.startswith("\\#"):
+        line = line[1:]
+    dir_only = line.endswith("/")
+    line = line.rstrip("/")
+    if not line:
+        return None
+    anchored = "/" in line
+    return IgnoreRule(re.compile(_translate(line.lstrip("/"))), negate, dir_only, anchored)
+
+
+def _translate(pattern: str) -> str:
+    """Regex for one gitignore glob: ``*`` and ``?`` stop at ``/``, ``**`` spans directories."""
+    out = []
+    index = 0
+    while index < len(pattern):
+        char = pattern[index]
+        if pattern.startswith("**/", index):
+            out.append("(?:.*/)?")
+            index += 3
+        elif pattern.startswith("**", index):
+            out.append(".*")
+            index += 2
+        elif char == "*":
+            out.append("[^/]*")
+            index += 1
+        elif char == "?":
+            out.append("[^/]")
+            index += 1
+        elif char == "[":
+            end = pattern.find("]", index + 2)
+            if end == -1:
+                out.append(re.escape(char))
+                index += 1
+                continue
+            body = pattern[index + 1 : end]
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            out.append(f"[{body}]")
+            index = end + 1
+        elif char == "\\" and index + 1 < len(pattern):
+            out.append(re.escape(pattern[index + 1]))
+            index += 2
+        else:
+            out.append(re.escape(char))
+            index += 1
+    return "".join(out)
@@ -68,9 +68,10 @@ def generate_robust_tests(
     test_level: str,
     source_path: Path | None = None,
     repo_root: Path | None = None,
+    tree: ast.Module | None = None,
 ) -> str:
     module_import = derive_module_import(source_path, repo_root, module_name)
-    functions = _extract_functions(source_code)
+    functions = _extract_functions(source_code, tree=tree)
     io_imports = _io_imports_from_facts(facts)
     targets = _select_targets(functions, test_level)
 
@@ -103,8 +104,9 @@ def _io_imports_from_facts(facts: AnalysisFacts | None) -> list[str]:
     return sorted(name for name in facts.import_names if name.split(".")[0] in _IO_MODULES)
 
 
-def _extract_functions(source_code: str) -> list[_FunctionInfo]:
-    tree = ast.parse(source_code)
+def _extract_functions(source_code: str, tree: ast.Module | None = None) -> list[_FunctionInfo]:
+    if tree is None:
+        tree = ast.parse(source_code)
     functions: list[_FunctionInfo] = []
     io_names = _collect_io_names(tree)
 
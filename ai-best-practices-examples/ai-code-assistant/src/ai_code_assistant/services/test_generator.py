@@ -1,8 +1,9 @@
+import ast
 from dataclasses import dataclass
 from pathlib import Path
 
 from ai_code_assistant.adapters.llm_adapter import LLMAdapter
-from ai_code_assistant.services.ast_analysis import analyze_source
+from ai_code_assistant.services.ast_analysis import analyze_source, analyze_tree
 from ai_code_assistant.services.test_codegen import generate_robust_tests
 
 
@@ -52,11 +53,20 @@ def generate_for_file(source_path: Path, repo_root: Path, adapter: LLMAdapter) -
 
 
 def generate_pyramid_for_file(
-    source_path: Path, repo_root: Path, adapter: LLMAdapter, levels: tuple[str, ...]
+    source_path: Path,
+    repo_root: Path,
+    adapter: LLMAdapter,
+    levels: tuple[str, ...],
+    source_text: str | None = None,
+    tree: ast.Module | None = None,
 ) -> list[GeneratedTest]:
-    source_text = source_path.read_text(encoding="utf-8")
-    facts = analyze_source(source_path)
+    if source_text is None:
+        source_text = source_path.read_text(encoding="utf-8")
     module_name = source_path.stem
+    # Parsed once; the facts and every level's codegen share this tree.
+    if tree is None:
+        tree = ast.parse(source_text)
+    facts = analyze_tree(tree, module_name=module_name)
     tests: list[GeneratedTest] = []
     for level in levels:
         content = adapter.generate_tests(
@@ -66,6 +76,7 @@ def generate_pyramid_for_file(
             test_level=level,
             source_path=source_path,
             repo_root=repo_root,
+            tree=tree,
         )
         content = _stabilize_generated_content(
             content=content,
@@ -75,6 +86,7 @@ def generate_pyramid_for_file(
             test_level=level,
             source_path=source_path,
             repo_root=repo_root,
+            tree=tree,
         )
         target_path = repo_root / "tests" / level / f"test_{module_name}.py"
         tests.append(GeneratedTest(source_path=source_path, target_path=target_path, content=content, level=level))
@@ -89,6 +101,7 @@ def _stabilize_generated_content(
     test_level: str = "unit",
     source_path: Path | None = None,
     repo_root: Path | None = None,
+    tree: ast.Module | None = None,
 ) -> str:
     if "def test_" in content and "assert True" not in content:
         return content
@@ -100,5 +113,6 @@ def _stabilize_generated_content(
             test_level=test_level,
             source_path=source_path,
             repo_root=repo_root,
+            tree=tree,
         )
     return content
@@ -0,0 +1,265 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+from ai_code_assistant.adapters.llm_adapter import LLMAdapter
+from ai_code_assistant.adapters.llm_scheduler import LLMScheduler, PromptCache, RetryableError, openai_responses_scheduler
+from ai_code_assistant.services.repo_generation import generate_repo_tests
+
+pytest.importorskip("openai")
+
+
+class FakeResponsesServer(ThreadingHTTPServer):
+    """Minimal OpenAI-compatible ``POST /v1/responses`` that echoes the prompt after ``latency``."""
+
+    daemon_threads = True
+
+    def __init__(self, latency: float = 0.0, failures: int = 0) -> None:
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.latency = latency
+        self.failures = failures
+        self.prompts: list[str] = []
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: FakeResponsesServer
+
+    def do_POST(self) -> None:
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        server = self.server
+        with server.lock:
+            server.prompts.append(body["input"])
+            server.in_flight += 1
+            server.peak_in_flight = max(server.peak_in_flight, server.in_flight)
+            fail = server.failures > 0
+            server.failures -= fail
+        time.sleep(server.latency)
+        with server.lock:
+            server.in_flight -= 1
+        if fail:
+            self._send(429, {"error": {"message": "slow down", "type": "rate_limit"}}, {"Retry-After": "0"})
+            return
+        text = f"def test_echo():\n    assert {len(body['input'])} > 0\n"
+        self._send(
+            200,
+            {
+                "id": "resp_1",
+                "object": "response",
+                "created_at": 0,
+                "model": body["model"],
+                "status": "completed",
+                "output": [
+                    {
+                        "type": "message",
+                        "id": "msg_1",
+                        "role": "assistant",
+                        "status": "completed",
+                        "content": [{"type": "output_text", "text": text, "annotations": []}],
+                    }
+                ],
+                "parallel_tool_calls": False,
+                "tool_choice": "auto",
+                "tools": [],
+            },
+        )
+
+    def _send(self, status: int, payload: dict, headers: dict[str, str] | None = None) -> None:
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args) -> None:
+        del format, args
+
+
+@pytest.fixture
+def fake_server():
+    servers: list[FakeResponsesServer] = []
+
+    def start(**options) -> FakeResponsesServer:
+        server = FakeResponsesServer(**options)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def _scheduler(server: FakeResponsesServer, **options) -> LLMScheduler:
+    return openai_responses_scheduler(api_key="test", model="fake-model", base_url=server.base_url, **options)
+
+
+def test_requests_run_concurrently_up_to_the_limit(fake_server) -> None:
+    server = fake_server(latency=0.2)
+    scheduler = _scheduler(server, max_concurrency=8)
+    prompts = [f"prompt {index}" for index in range(16)]
+
+    start = time.perf_counter()
+    completions = scheduler.complete_many(prompts)
+    elapsed = time.perf_counter() - start
+    scheduler.close()
+
+    # Serially this is 16 x 0.2s = 3.2s; eight at a time it is two rounds.
+    assert elapsed < 1.6
+    assert 1 < server.peak_in_flight <= 8
+    assert sorted(server.prompts) == sorted(prompts)
+    assert completions[3] == f"def test_echo():\n    assert {len(prompts[3])} > 0\n"
+
+
+def test_identical_prompts_are_billed_once_across_runs(fake_server, tmp_path: Path) -> None:
+    server = fake_server(latency=0.05)
+    cache_path = tmp_path / "llm-cache.jsonl"
+    first = _scheduler(server, cache=PromptCache(cache_path))
+    first_run = first.complete_many(["same", "same", "other", "same"])
+    first.close()
+
+    assert sorted(server.prompts) == ["other", "same"]
+    assert first.cache_hits == 2
+
+    second = _scheduler(server, cache=PromptCache(cache_path))
+    assert second.complete_many(["same", "other"]) == [first_run[0], first_run[2]]
+    second.close()
+
+    assert len(server.prompts) == 2
+    assert second.requests == 0
+    assert second.cache_hits == 2
+
+
+def test_cache_is_namespaced_by_model(tmp_path: Path) -> None:
+    cache = PromptCache(tmp_path / "llm-cache.jsonl")
+    cache.put(PromptCache.key("model-a", "prompt"), "completion")
+
+    reloaded = PromptCache(tmp_path / "llm-cache.jsonl")
+    assert reloaded.get(PromptCache.key("model-a", "prompt")) == "completion"
+    assert reloaded.get(PromptCache.key("model-b", "prompt")) is None
+
+
+def test_torn_cache_line_is_ignored(tmp_path: Path) -> None:
+    path = tmp_path / "llm-cache.jsonl"
+    PromptCache(path).put("k1", "one")
+    with path.open("a", encoding="utf-8") as f:
+        f.write('{"key": "k2", "compl')
+
+    assert PromptCache(path).get("k1") == "one"
+    assert len(PromptCache(path)) == 1
+
+    # The next entry goes on its own line rather than onto the end of the torn one.
+    PromptCache(path).put("new", "fresh")
+    reloaded = PromptCache(path)
+    assert (reloaded.get("k1"), reloaded.get("new")) == ("one", "fresh")
+
+
+def test_superseded_cache_lines_are_compacted_on_load(tmp_path: Path) -> None:
+    path = tmp_path / "llm-cache.jsonl"
+    cache = PromptCache(path)
+    for attempt in range(5):
+        cache.put("k1", f"one v{attempt}")
+    cache.put("k2", "two")
+    with path.open("a", encoding="utf-8") as f:
+        f.write('{"key": "k3", "compl')
+
+    reloaded = PromptCache(path)
+    assert (reloaded.get("k1"), reloaded.get("k2")) == ("one v4", "two")
+    assert [json.loads(line)["key"] for line in path.read_text(encoding="utf-8").splitlines()] == ["k1", "k2"]
+
+
+def test_rate_limited_responses_are_retried(fake_server) -> None:
+    server = fake_server(failures=2)
+    scheduler = _scheduler(server, backoff_base=0.01)
+
+    completion = scheduler.complete("retry me")
+    scheduler.close()
+
+    assert completion.startswith("def test_echo")
+    assert scheduler.retries == 2
+    assert len(server.prompts) == 3
+
+
+def test_retries_give_up_after_max_retries() -> None:
+    calls = 0
+
+    async def always_busy(prompt: str) -> str:
+        nonlocal calls
+        calls += 1
+        raise RetryableError("busy")
+
+    scheduler = LLMScheduler(always_busy, max_retries=2, backoff_base=0.001)
+    with pytest.raises(RetryableError):
+        scheduler.complete("prompt")
+    scheduler.close()
+
+    assert calls == 3
+
+
+def test_token_bucket_paces_request_starts() -> None:
+    starts: list[float] = []
+
+    async def record(prompt: str) -> str:
+        starts.append(time.perf_counter())
+        return prompt
+
+    scheduler = LLMScheduler(record, requests_per_second=20, burst=1)
+    scheduler.complete_many([f"p{index}" for index in range(6)])
+    scheduler.close()
+
+    # One token up front, then one every 50ms.
+    assert starts[-1] - starts[0] >= 0.2
+
+
+def test_adapter_shares_scheduler_and_cache(fake_server, tmp_path: Path) -> None:
+    server = fake_server()
+    adapter = LLMAdapter(api_key="test", base_url=server.base_url, cache_path=tmp_path / "llm-cache.jsonl")
+    source = "def add(a, b):\n    return a + b\n"
+
+    unit = adapter.generate_tests(source_code=source, module_name="calc")
+    assert adapter.generate_tests(source_code=source, module_name="calc") == unit.strip()
+    adapter.generate_tests(source_code=source, module_name="calc", test_level="integration")
+    adapter.close()
+
+    assert len(server.prompts) == 2
+    assert "integration tests" in server.prompts[1]
+
+    LLMAdapter(api_key="test", base_url=server.base_url, cache_path=tmp_path / "llm-cache.jsonl").generate_tests(
+        source_code=source, module_name="calc"
+    )
+    assert len(server.prompts) == 2
+
+
+def test_repo_generation_overlaps_requests_across_files(fake_server, tmp_path: Path) -> None:
+    server = fake_server(latency=0.4)
+    files = []
+    for index in range(8):
+        path = tmp_path / f"mod{index}.py"
+        path.write_text(f"def f{index}():\n    return {index}\n", encoding="utf-8")
+        files.append(path)
+    adapter = LLMAdapter(api_key="test", base_url=server.base_url, max_concurrency=8)
+
+    start = time.perf_counter()
+    outcomes = list(generate_repo_tests(files, tmp_path, adapter, ("unit",)))
+    elapsed = time.perf_counter() - start
+    adapter.close()
+
+    assert [outcome.source_path for outcome in outcomes] == files
+    assert all(outcome.tests[0].content.startswith("def test_echo") for outcome in outcomes)
+    assert len(server.prompts) == 8
+    # One file at a time this is 8 x 0.4s = 3.2s.
+    assert elapsed < 1.6
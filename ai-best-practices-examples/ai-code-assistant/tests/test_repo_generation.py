@@ -0,0 +1,136 @@
+import ast
+import hashlib
+import json
+from pathlib import Path
+
+import pytest
+
+from ai_code_assistant.adapters.llm_adapter import LLMAdapter
+from ai_code_assistant.cli import main
+from ai_code_assistant.services.repo_generation import GenerationCache, generate_repo_tests
+
+
+def _make_repo(root: Path, count: int = 3) -> list[Path]:
+    (root / "pkg").mkdir()
+    files = []
+    for index in range(count):
+        path = root / "pkg" / f"mod{index}.py"
+        path.write_text(f"def f{index}():\n    return {index}\n", encoding="utf-8")
+        files.append(path)
+    return files
+
+
+def _run_json(args: list[str], capsys: pytest.CaptureFixture[str]) -> dict:
+    assert main(args) == 0
+    return json.loads(capsys.readouterr().out)
+
+
+def test_each_file_is_parsed_once_for_all_levels(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    files = _make_repo(tmp_path, count=2)
+    parsed: list[str] = []
+    real_parse = ast.parse
+
+    def counting_parse(source, *args, **kwargs):
+        parsed.append(source)
+        return real_parse(source, *args, **kwargs)
+
+    monkeypatch.setattr(ast, "parse", counting_parse)
+    outcomes = list(
+        generate_repo_tests(files, tmp_path, LLMAdapter(api_key=None), ("unit", "integration", "e2e"))
+    )
+
+    assert len(parsed) == 2
+    assert [len(outcome.tests) for outcome in outcomes] == [3, 3]
+
+
+def test_process_pool_matches_in_process_output(tmp_path: Path) -> None:
+    files = _make_repo(tmp_path, count=4)
+    adapter = LLMAdapter(api_key=None)
+
+    serial = list(generate_repo_tests(files, tmp_path, adapter, ("unit",)))
+    pooled = list(generate_repo_tests(files, tmp_path, adapter, ("unit",), jobs=2))
+
+    assert [outcome.source_path for outcome in pooled] == files
+    assert [outcome.tests for outcome in pooled] == [outcome.tests for outcome in serial]
+
+
+def test_pool_submissions_are_bounded(tmp_path: Path) -> None:
+    files = _make_repo(tmp_path, count=40)
+    pulled: list[Path] = []
+
+    def scan():
+        for path in files:
+            pulled.append(path)
+            yield path
+
+    outcomes = generate_repo_tests(scan(), tmp_path, LLMAdapter(api_key=None), ("unit",), jobs=2)
+    first = next(outcomes)
+    # Two workers, two files each in flight, plus the one that had to wait.
+    assert len(pulled) <= 5
+    assert [first.source_path, *(outcome.source_path for outcome in outcomes)] == files
+
+
+def test_gen_tests_closes_the_adapter(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    _make_repo(tmp_path)
+    closed: list[LLMAdapter] = []
+    monkeypatch.setattr(LLMAdapter, "close", lambda self: closed.append(self))
+
+    _run_json(["gen-tests", "--repo", str(tmp_path), "--dry-run", "--output", "json"], capsys)
+
+    assert len(closed) == 1
+
+
+def test_cache_skips_unchanged_sources(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    files = _make_repo(tmp_path)
+    args = ["gen-tests", "--repo", str(tmp_path), "--output", "json"]
+
+    first = _run_json(args, capsys)
+    assert first["files"] == {"processed": 3, "skipped": 0, "cached": 0}
+
+    files[0].write_text("def f0():\n    return 42\n", encoding="utf-8")
+    second = _run_json(args, capsys)
+    assert second["files"] == {"processed": 1, "skipped": 2, "cached": 0}
+    assert second["processed_count"] == 1
+    assert "assert result == 42" in (tmp_path / "tests" / "unit" / "test_mod0.py").read_text(encoding="utf-8")
+
+
+def test_cache_replays_output_for_dry_runs_and_missing_targets(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    _make_repo(tmp_path, count=2)
+    dry_run = ["gen-tests", "--repo", str(tmp_path), "--output", "json", "--dry-run"]
+
+    _run_json(dry_run, capsys)
+    replayed = _run_json(dry_run, capsys)
+    assert replayed["files"] == {"processed": 0, "skipped": 0, "cached": 2}
+    assert len(replayed["results"]) == 2
+
+    written = _run_json(["gen-tests", "--repo", str(tmp_path), "--output", "json"], capsys)
+    assert written["files"] == {"processed": 0, "skipped": 0, "cached": 2}
+    assert (tmp_path / "tests" / "unit" / "test_mod1.py").exists()
+
+
+def test_no_cache_regenerates_everything(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    _make_repo(tmp_path, count=2)
+    args = ["gen-tests", "--repo", str(tmp_path), "--output", "json"]
+    _run_json(args, capsys)
+
+    payload = _run_json([*args, "--no-cache", "--jobs", "2"], capsys)
+
+    assert payload["files"] == {"processed": 2, "skipped": 0, "cached": 0}
+
+
+def test_cache_is_dropped_when_the_generator_changes(tmp_path: Path) -> None:
+    files = _make_repo(tmp_path, count=1)
+    cache = GenerationCache(tmp_path, "0.1.0:ast")
+    list(generate_repo_tests(files, tmp_path, LLMAdapter(api_key=None), ("unit",), cache=cache))
+    cache.save(keep=files)
+
+    assert GenerationCache(tmp_path, "0.1.0:ast").lookup(files[0], _digest(files[0]), ("unit",))
+    assert GenerationCache(tmp_path, "0.1.0:openai").lookup(files[0], _digest(files[0]), ("unit",)) is None
+
+
+def _digest(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
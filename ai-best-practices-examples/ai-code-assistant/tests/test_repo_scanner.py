@@ -1,6 +1,11 @@
+import os
+import shutil
+import subprocess
 from pathlib import Path
 
-from ai_code_assistant.services.repo_scanner import scan_python_files
+import pytest
+
+from ai_code_assistant.services.repo_scanner import iter_python_files, scan_python_files
 
 
 def test_scan_python_files_excludes_ignored_dirs(tmp_path: Path) -> None:
@@ -29,3 +34,79 @@ def test_scan_python_files_returns_sorted_paths(tmp_path: Path) -> None:
     found = scan_python_files(tmp_path)
 
     assert found == [tmp_path / "a.py", tmp_path / "b.py"]
+
+
+def test_excluded_directories_are_never_entered(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    (tmp_path / "app").mkdir()
+    (tmp_path / "app" / "service.py").write_text("x = 1\n", encoding="utf-8")
+    (tmp_path / "node_modules" / "pkg").mkdir(parents=True)
+    (tmp_path / "node_modules" / "pkg" / "vendored.py").write_text("x = 2\n", encoding="utf-8")
+    (tmp_path / ".venv" / "lib").mkdir(parents=True)
+    visited: list[str] = []
+    real_scandir = os.scandir
+
+    def recording_scandir(path):
+        visited.append(os.path.relpath(path, tmp_path))
+        return real_scandir(path)
+
+    monkeypatch.setattr(os, "scandir", recording_scandir)
+
+    assert scan_python_files(tmp_path, use_git=False) == [tmp_path / "app" / "service.py"]
+    assert sorted(visited) == [".", "app"]
+
+
+def test_gitignore_rules_are_honoured(tmp_path: Path) -> None:
+    for rel in [
+        "app/service.py",
+        "app/generated_pb2.py",
+        "app/keep_pb2.py",
+        "build/lib/app.py",
+        "docs/conf.py",
+        "pkg/local.py",
+        "pkg/sub/nested.py",
+        "pkg/sub/scratch.py",
+    ]:
+        (tmp_path / rel).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / rel).write_text("x = 1\n", encoding="utf-8")
+    (tmp_path / ".gitignore").write_text(
+        "# build output\nbuild/\n*_pb2.py\n!keep_pb2.py\n/docs/conf.py\n", encoding="utf-8"
+    )
+    (tmp_path / "pkg" / ".gitignore").write_text("sub/scratch.py\nlocal.py\n", encoding="utf-8")
+
+    found = scan_python_files(tmp_path, use_git=False)
+
+    assert found == [
+        tmp_path / "app" / "keep_pb2.py",
+        tmp_path / "app" / "service.py",
+        tmp_path / "pkg" / "sub" / "nested.py",
+    ]
+
+
+def test_walk_streams_in_sorted_order(tmp_path: Path) -> None:
+    for rel in ["b.py", "a/z.py", "a.py", "a/b/c.py"]:
+        (tmp_path / rel).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / rel).write_text("x = 1\n", encoding="utf-8")
+
+    paths = iter_python_files(tmp_path, use_git=False)
+
+    assert next(paths) == tmp_path / "a" / "b" / "c.py"
+    assert [next(paths) for _ in range(3)] == sorted(tmp_path.rglob("*.py"))[1:]
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git is not installed")
+def test_git_checkout_lists_tracked_and_unignored_files(tmp_path: Path) -> None:
+    subprocess.run(["git", "init", "-q", str(tmp_path)], check=True)
+    (tmp_path / "app").mkdir()
+    (tmp_path / "app" / "tracked.py").write_text("x = 1\n", encoding="utf-8")
+    (tmp_path / "app" / "untracked.py").write_text("x = 2\n", encoding="utf-8")
+    (tmp_path / "app" / "ignored.py").write_text("x = 3\n", encoding="utf-8")
+    (tmp_path / "app" / "deleted.py").write_text("x = 4\n", encoding="utf-8")
+    (tmp_path / "tests").mkdir()
+    (tmp_path / "tests" / "helpers.py").write_text("x = 5\n", encoding="utf-8")
+    (tmp_path / ".gitignore").write_text("ignored.py\n", encoding="utf-8")
+    subprocess.run(["git", "add", "app/tracked.py", "app/deleted.py", "tests"], cwd=tmp_path, check=True)
+    (tmp_path / "app" / "deleted.py").unlink()
+
+    expected = [tmp_path / "app" / "tracked.py", tmp_path / "app" / "untracked.py"]
+    assert scan_python_files(tmp_path) == expected
+    assert scan_python_files(tmp_path / "app") == expected
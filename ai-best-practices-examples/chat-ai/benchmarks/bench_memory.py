@@ -0,0 +1,121 @@
+"""Measure MemoryService latency, resident footprint and startup time as stored turns grow.
+
+Run from the chat-ai directory:
+
+    PYTHONPATH=src python3 benchmarks/bench_memory.py --sizes 10000 100000 1000000 --users 1000
+
+For comparison, ``linear scan`` scores every stored turn the way the previous single-list store did,
+and ``load all users`` deserializes every journal the way the previous eager ``_load`` did. Footprint
+is the traced Python heap held by the service after the load step.
+"""
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from ai_app.services.memory import MemoryService
+
+VOCABULARY = [
+    "hiking", "mountains", "tea", "coffee", "weather", "berlin", "paris", "python", "rust", "music",
+    "jazz", "running", "cycling", "recipes", "pasta", "garden", "tomatoes", "books", "science", "history",
+    "travel", "trains", "budget", "meeting", "project", "deadline", "family", "birthday", "movies", "chess",
+]
+
+
+def _sentence(rng: random.Random) -> str:
+    return "I like " + " ".join(rng.choices(VOCABULARY, k=6)) + f" {rng.randrange(100_000)}"
+
+
+def _percentiles(samples: list[float]) -> str:
+    ordered = sorted(samples)
+    p50 = statistics.median(ordered) * 1e6
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1e6
+    return f"p50={p50:8.1f}us p99={p99:8.1f}us"
+
+
+def _load_users(store_path: Path, user_ids: list[str], max_resident_turns: int | None) -> tuple[float, float, int]:
+    """Touch every user in a fresh service; return (seconds, traced MiB, resident turns)."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    memory = MemoryService(store_path=store_path, max_turns_per_user=None, max_resident_turns=max_resident_turns)
+    for user_id in user_ids:
+        memory.retrieve(user_id, "hiking", top_k=3)
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, current / 2**20, memory.resident_turns()
+
+
+def run(size: int, users: int, queries: int, seed: int, max_resident_turns: int) -> None:
+    rng = random.Random(seed)
+    user_ids = [f"user-{index}" for index in range(users)]
+    with tempfile.TemporaryDirectory() as tmp:
+        memory = MemoryService(store_path=Path(tmp) / "memory.json", max_resident_turns=None)
+
+        add_samples: list[float] = []
+        for _ in range(size):
+            user_id = rng.choice(user_ids)
+            text = _sentence(rng)
+            start = time.perf_counter()
+            memory.add_turn(user_id, text)
+            add_samples.append(time.perf_counter() - start)
+
+        retrieve_samples: list[float] = []
+        for _ in range(queries):
+            user_id = rng.choice(user_ids)
+            query = " ".join(rng.choices(VOCABULARY, k=3))
+            start = time.perf_counter()
+            memory.retrieve(user_id, query, top_k=3)
+            retrieve_samples.append(time.perf_counter() - start)
+
+        all_items = [item for partition in memory._partitions.values() for item in partition.items]
+        linear_samples: list[float] = []
+        for _ in range(min(queries, 20)):
+            user_id = rng.choice(user_ids)
+            query_vector = memory._embed(" ".join(rng.choices(VOCABULARY, k=3)))
+            start = time.perf_counter()
+            scored = [
+                (memory._cosine_similarity(query_vector, item.vector), item)
+                for item in all_items
+                if item.user_id == user_id
+            ]
+            scored.sort(key=lambda pair: pair[0], reverse=True)
+            linear_samples.append(time.perf_counter() - start)
+
+        del memory, all_items
+        start = time.perf_counter()
+        reloaded = MemoryService(store_path=Path(tmp) / "memory.json")
+        reloaded.retrieve(user_ids[0], "hiking", top_k=3)
+        startup = time.perf_counter() - start
+        del reloaded
+
+        eager = _load_users(Path(tmp) / "memory.json", user_ids, max_resident_turns=None)
+        bounded = _load_users(Path(tmp) / "memory.json", user_ids, max_resident_turns=max_resident_turns)
+
+    print(f"turns={size:>9,}  users={users}")
+    print(f"  add_turn        {_percentiles(add_samples)}")
+    print(f"  retrieve        {_percentiles(retrieve_samples)}")
+    print(f"  linear scan     {_percentiles(linear_samples)}")
+    print(f"  startup + first retrieve  {startup * 1e3:9.1f}ms")
+    for label, (elapsed, mib, resident) in (("load all users", eager), (f"budget {max_resident_turns:,}", bounded)):
+        print(f"  {label:<24}  {elapsed * 1e3:9.1f}ms  heap={mib:8.1f}MiB  resident_turns={resident:,}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--max-resident-turns", type=int, default=50_000)
+    args = parser.parse_args()
+    for size in args.sizes:
+        run(size, args.users, args.queries, args.seed, args.max_resident_turns)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,32 +1,44 @@
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.responses import HTMLResponse
 from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 
 from ai_app.models import ChatRequest
 from ai_app.services.conversation import ConversationService
 from ai_app.services.tools import ToolService
-from ai_app.tools.weather import fetch_weather
+from ai_app.tools.weather import fetch_weather_async
 
-app = FastAPI(title="AI Chat Assistant MVP")
 tool_service = ToolService()
-tool_service.register("weather", fetch_weather)
+# Forecasts are reused across users for a few minutes; geocoding is cached inside the tool.
+tool_service.register("weather", fetch_weather_async, timeout=5.0, cache_ttl=300.0)
 conversation_service = ConversationService(tool_service=tool_service)
 
 
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    yield
+    await tool_service.aclose()
+
+
+app = FastAPI(title="AI Chat Assistant MVP", lifespan=lifespan)
+
+
 @app.get("/health")
 def health() -> dict[str, str]:
     return {"status": "ok"}
 
 
 @app.post("/chat")
-def chat(request: ChatRequest) -> StreamingResponse:
-    result = conversation_service.chat(request)
-
-    def event_stream() -> str:
-        for token in conversation_service.stream_text(result.text):
-            yield token
-
-    return StreamingResponse(event_stream(), media_type="text/plain")
+async def chat(request: ChatRequest) -> StreamingResponse:
+    # Persisting the turn runs after the last token is sent, off the response path.
+    return StreamingResponse(
+        conversation_service.astream(request),
+        media_type="text/plain",
+        background=BackgroundTask(conversation_service.remember, request),
+    )
 
 
 @app.get("/", response_class=HTMLResponse)
@@ -1,9 +1,20 @@
-from collections.abc import Iterator
+import asyncio
+import re
+from collections.abc import AsyncIterator
 from pathlib import Path
 
 from ai_app.models import ChatMetadata, ChatRequest, ChatResult
 from ai_app.services.memory import MemoryService
-from ai_app.services.tools import ToolService
+from ai_app.services.tools import ToolService, ToolTimeoutError, ToolUnavailableError
+
+
+# Whitespace-preserving pieces, so streamed tokens concatenate back to the exact response text.
+TOKEN_PIECE_RE = re.compile(r"\s*\S+")
+
+
+async def _tokens(text: str) -> AsyncIterator[str]:
+    for piece in TOKEN_PIECE_RE.findall(text):
+        yield piece
 
 
 class ConversationService:
@@ -16,24 +27,61 @@ class ConversationService:
         self.tool_service = tool_service or ToolService()
 
     def chat(self, request: ChatRequest) -> ChatResult:
-        memories = self.memory_service.retrieve(request.user_id, request.message, top_k=3)
-        memory_hits = len(memories)
-        tool_name = None
-        lower = request.message.lower()
-        response_text = f"You said: {request.message}"
-        if "weather in " in lower and self.tool_service.has("weather"):
-            tool_name = "weather"
-            city = request.message.split("weather in ", 1)[-1].strip(" ?.")
-            if not city:
-                city = "your location"
-            tool_output = self.tool_service.execute("weather", city)
-            response_text = f"{tool_output}."
-        elif memories:
-            response_text = f"You said: {request.message}. I remember: {memories[0].text}"
+        return asyncio.run(self.achat(request))
+
+    async def achat(self, request: ChatRequest) -> ChatResult:
+        metadata = ChatMetadata()
+        text = "".join([piece async for piece in self.astream(request, metadata)])
+        await asyncio.to_thread(self.remember, request)
+        return ChatResult(text=text, metadata=metadata)
 
+    async def astream(self, request: ChatRequest, metadata: ChatMetadata | None = None) -> AsyncIterator[str]:
+        """Yield response tokens as each stage produces them; ``metadata`` is filled in along the way.
+
+        Memory retrieval and the tool call start together. The direct reply does not depend on
+        either, so its opening tokens are sent before memory retrieval finishes. The turn itself is
+        not persisted here; call ``remember`` once the response is out.
+        """
+        metadata = metadata if metadata is not None else ChatMetadata()
+        memories_task = asyncio.create_task(
+            asyncio.to_thread(self.memory_service.retrieve, request.user_id, request.message, 3)
+        )
+        try:
+            city = self._weather_city(request.message)
+            if city is not None:
+                metadata.tool_invoked = "weather"
+                tool_task = asyncio.create_task(self._run_weather(city))
+                try:
+                    metadata.memory_hits = len(await memories_task)
+                except BaseException:
+                    tool_task.cancel()
+                    await asyncio.gather(tool_task, return_exceptions=True)
+                    raise
+                async for piece in _tokens(f"{await tool_task}."):
+                    yield piece
+                return
+
+            async for piece in _tokens(f"You said: {request.message}"):
+                yield piece
+            memories = await memories_task
+            metadata.memory_hits = len(memories)
+            if memories:
+                async for piece in _tokens(f". I remember: {memories[0].text}"):
+                    yield piece
+        finally:
+            memories_task.cancel()
+
+    def remember(self, request: ChatRequest) -> None:
         self.memory_service.add_turn(request.user_id, request.message)
-        return ChatResult(text=response_text, metadata=ChatMetadata(tool_invoked=tool_name, memory_hits=memory_hits))
 
-    def stream_text(self, text: str) -> Iterator[str]:
-        for chunk in text.split():
-            yield f"{chunk} "
+    def _weather_city(self, message: str) -> str | None:
+        if "weather in " not in message.lower() or not self.tool_service.has("weather"):
+            return None
+        city = message.split("weather in ", 1)[-1].strip(" ?.")
+        return city or "your location"
+
+    async def _run_weather(self, city: str) -> str:
+        try:
+            return await self.tool_service.aexecute("weather", city)
+        except (ToolTimeoutError, ToolUnavailableError):
+            return f"Weather tool is unavailable for {city} right now"
@@ -1,7 +1,12 @@
+import hashlib
 import json
 import math
+import os
 import re
-from dataclasses import dataclass
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from pathlib import Path
 
 
@@ -13,30 +18,182 @@ class MemoryItem:
     user_id: str
     text: str
     vector: dict[str, float]
+    created_at: float = 0.0
+    hits: int = 0
+
+
+@dataclass
+class _Partition:
+    """One user's memories plus a token -> item-index posting list."""
+
+    items: list[MemoryItem] = field(default_factory=list)
+    postings: dict[str, list[int]] = field(default_factory=dict)
+    # Journal lines a rewrite would drop: torn writes, evicted turns and hit/eviction deltas.
+    dead_records: int = 0
+    # Bumped on every journal write, so a background rewrite can tell it raced with one.
+    generation: int = 0
+
+    def add(self, item: MemoryItem) -> None:
+        index = len(self.items)
+        self.items.append(item)
+        for token in item.vector:
+            self.postings.setdefault(token, []).append(index)
+
+    def replace(self, items: list[MemoryItem]) -> None:
+        self.items = []
+        self.postings = {}
+        for item in items:
+            self.add(item)
 
 
 class MemoryService:
-    def __init__(self, store_path: Path) -> None:
+    """Per-user memory store with an inverted index and append-only JSONL journals.
+
+    Each user's turns live in their own journal under ``store_path`` without its suffix
+    (``memory.json`` -> ``memory/<user hash>.jsonl``) and are loaded on first access. Requests
+    only ever append: ``add_turn`` writes the turn, ``retrieve`` writes the indexes of the
+    memories it recalled (so hit counts survive restarts) and eviction writes the indexes it
+    dropped. Once dead lines outnumber ``compact_dead_ratio`` of the live ones, a background
+    thread rewrites the journal from the live items. A legacy ``memory.json`` array is migrated
+    into the journals once and kept as ``memory.json.migrated``.
+
+    Growth is bounded two ways. A user over ``max_turns_per_user`` loses the memories with the lowest
+    ``(1 + hits) * 0.5 ** (age / decay_half_life_seconds)`` score, down to 90% of the cap so eviction
+    is amortized. When more than ``max_resident_turns`` are held in RAM, least recently used
+    partitions are unloaded; their journals stay on disk and are already up to date.
+    """
+
+    def __init__(
+        self,
+        store_path: Path,
+        max_turns_per_user: int | None = 2000,
+        max_resident_turns: int | None = 500_000,
+        decay_half_life_seconds: float = 7 * 24 * 3600,
+        compact_dead_ratio: float = 0.5,
+    ) -> None:
         self.store_path = store_path
-        self._items: list[MemoryItem] = []
-        self._load()
+        self.journal_dir = store_path.with_suffix("")
+        self.max_turns_per_user = max_turns_per_user
+        self.max_resident_turns = max_resident_turns
+        self.decay_half_life_seconds = decay_half_life_seconds
+        self.compact_dead_ratio = compact_dead_ratio
+        self._partitions: OrderedDict[str, _Partition] = OrderedDict()
+        self._resident_turns = 0
+        self._lock = threading.RLock()
+        # Users whose journals are due for a background rewrite, in request order.
+        self._pending_compactions: dict[str, None] = {}
+        self._compacting = False
+        self._compaction_changed = threading.Condition(self._lock)
+        self._compactor: threading.Thread | None = None
+        self._migrate_legacy()
 
     def add_turn(self, user_id: str, text: str) -> None:
-        item = MemoryItem(user_id=user_id, text=text, vector=self._embed(text))
-        self._items.append(item)
-        self._save()
+        item = MemoryItem(user_id=user_id, text=text, vector=self._embed(text), created_at=time.time())
+        with self._lock:
+            partition = self._partition(user_id)
+            partition.add(item)
+            self._resident_turns += 1
+            self._append(user_id, partition, [self._record(item)])
+            if self.max_turns_per_user is not None and len(partition.items) > self.max_turns_per_user:
+                self._evict(user_id, partition)
+            self._enforce_budget(keep=user_id)
 
     def retrieve(self, user_id: str, query: str, top_k: int = 3) -> list[MemoryItem]:
         query_vector = self._embed(query)
-        scored: list[tuple[float, MemoryItem]] = []
-        for item in self._items:
-            if item.user_id != user_id:
-                continue
-            score = self._cosine_similarity(query_vector, item.vector)
-            if score > 0:
-                scored.append((score, item))
-        scored.sort(key=lambda pair: pair[0], reverse=True)
-        return [item for _, item in scored[:top_k]]
+        with self._lock:
+            partition = self._partition(user_id, create=False)
+            # Only memories sharing a token with the query can have a positive cosine score.
+            candidates: set[int] = set()
+            for token in query_vector:
+                candidates.update(partition.postings.get(token, ()))
+            scored: list[tuple[float, int]] = []
+            for index in candidates:
+                score = self._cosine_similarity(query_vector, partition.items[index].vector)
+                if score > 0:
+                    scored.append((score, index))
+            scored.sort(key=lambda pair: (-pair[0], pair[1]))
+            recalled = [index for _, index in scored[:top_k]]
+            for index in recalled:
+                partition.items[index].hits += 1
+            if recalled:
+                self._append(user_id, partition, [self._delta(user_id, "hit", recalled)])
+                partition.dead_records += 1
+                self._maybe_schedule_compaction(user_id, partition)
+            self._enforce_budget(keep=user_id)
+            return [partition.items[index] for index in recalled]
+
+    def resident_turns(self) -> int:
+        """Number of memories currently held in RAM across loaded partitions."""
+        return self._resident_turns
+
+    def compact(self, user_id: str) -> None:
+        """Rewrite a user's journal from the live items, atomically."""
+        with self._lock:
+            partition = self._partition(user_id)
+            self._write_journal(user_id, [self._record(item) for item in partition.items], suffix=".jsonl.tmp")
+            self._compacted(partition)
+
+    def flush(self) -> None:
+        """Block until scheduled background compactions have finished."""
+        with self._lock:
+            self._compaction_changed.wait_for(lambda: not self._pending_compactions and not self._compacting)
+
+    def _write_journal(self, user_id: str, lines: list[str], suffix: str) -> None:
+        path = self._journal_path(user_id)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(suffix)
+        with tmp_path.open("w", encoding="utf-8") as handle:
+            handle.writelines(lines)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp_path, path)
+
+    def _compacted(self, partition: _Partition) -> None:
+        partition.dead_records = 0
+        partition.generation += 1
+
+    def _maybe_schedule_compaction(self, user_id: str, partition: _Partition) -> None:
+        if partition.dead_records <= self.compact_dead_ratio * max(1, len(partition.items)):
+            return
+        with self._compaction_changed:
+            self._pending_compactions[user_id] = None
+            if self._compactor is None:
+                self._compactor = threading.Thread(target=self._compaction_loop, name="memory-compactor", daemon=True)
+                self._compactor.start()
+            self._compaction_changed.notify_all()
+
+    def _compaction_loop(self) -> None:
+        # Snapshots a partition under the lock, writes and fsyncs outside it, and swaps the file in
+        # only if no request wrote to the journal in the meantime; otherwise it tries again.
+        while True:
+            with self._lock:
+                self._compacting = False
+                self._compaction_changed.notify_all()
+                self._compaction_changed.wait_for(lambda: bool(self._pending_compactions))
+                user_id = next(iter(self._pending_compactions))
+                del self._pending_compactions[user_id]
+                partition = self._partitions.get(user_id)
+                if partition is None:
+                    # Unloaded meanwhile; it is checked again when next loaded.
+                    continue
+                self._compacting = True
+                lines = [self._record(item) for item in partition.items]
+                generation = partition.generation
+            path = self._journal_path(user_id)
+            # Per-service name: services sharing a directory must not write each other's temp file.
+            tmp_path = path.with_suffix(f".jsonl.{id(self):x}.compact")
+            with tmp_path.open("w", encoding="utf-8") as handle:
+                handle.writelines(lines)
+                handle.flush()
+                os.fsync(handle.fileno())
+            with self._lock:
+                if self._partitions.get(user_id) is partition and partition.generation == generation:
+                    os.replace(tmp_path, path)
+                    self._compacted(partition)
+                else:
+                    tmp_path.unlink(missing_ok=True)
+                    if self._partitions.get(user_id) is partition:
+                        self._maybe_schedule_compaction(user_id, partition)
 
     def _embed(self, text: str) -> dict[str, float]:
         tokens = [self._normalize_token(token.lower()) for token in WORD_RE.findall(text)]
@@ -62,25 +219,128 @@ class MemoryService:
             left, right = right, left
         return sum(value * right.get(token, 0.0) for token, value in left.items())
 
-    def _save(self) -> None:
-        self.store_path.parent.mkdir(parents=True, exist_ok=True)
-        payload = [
-            {"user_id": item.user_id, "text": item.text, "vector": item.vector}
-            for item in self._items
-        ]
-        self.store_path.write_text(json.dumps(payload), encoding="utf-8")
+    def _journal_path(self, user_id: str) -> Path:
+        digest = hashlib.sha1(user_id.encode("utf-8")).hexdigest()[:20]
+        return self.journal_dir / f"{digest}.jsonl"
+
+    def _record(self, item: MemoryItem) -> str:
+        return (
+            json.dumps({"user_id": item.user_id, "text": item.text, "created_at": item.created_at, "hits": item.hits})
+            + "\n"
+        )
+
+    def _delta(self, user_id: str, kind: str, indexes: list[int]) -> str:
+        # Positions refer to the partition's items at the time of writing, which replay reproduces.
+        return json.dumps({"user_id": user_id, kind: indexes}) + "\n"
+
+    def _append(self, user_id: str, partition: _Partition | None, lines: list[str]) -> None:
+        path = self._journal_path(user_id)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("a", encoding="utf-8") as handle:
+            handle.writelines(lines)
+        if partition is not None:
+            partition.generation += 1
+
+    def _partition(self, user_id: str, create: bool = True) -> _Partition:
+        partition = self._partitions.get(user_id)
+        if partition is not None:
+            self._partitions.move_to_end(user_id)
+        else:
+            partition = self._load_partition(user_id)
+            if not partition.items and not create:
+                # Lookups for users with no memories must not pin an empty partition in RAM.
+                return partition
+            self._partitions[user_id] = partition
+            self._resident_turns += len(partition.items)
+            self._maybe_schedule_compaction(user_id, partition)
+        return partition
+
+    def _load_partition(self, user_id: str) -> _Partition:
+        partition = _Partition()
+        path = self._journal_path(user_id)
+        if not path.exists():
+            return partition
+        torn_tail = False
+        with path.open(encoding="utf-8") as handle:
+            for line in handle:
+                torn_tail = not line.endswith("\n")
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    partition.dead_records += 1
+                    continue
+                # Hash collisions are possible in principle; keep partitions exact.
+                if record.get("user_id") != user_id:
+                    continue
+                if "hit" in record:
+                    for index in record["hit"]:
+                        if 0 <= index < len(partition.items):
+                            partition.items[index].hits += 1
+                    partition.dead_records += 1
+                    continue
+                if "evict" in record:
+                    evicted = set(record["evict"])
+                    partition.replace([item for index, item in enumerate(partition.items) if index not in evicted])
+                    partition.dead_records += len(evicted) + 1
+                    continue
+                partition.add(
+                    MemoryItem(
+                        user_id=user_id,
+                        text=record["text"],
+                        vector=self._embed(record["text"]),
+                        created_at=float(record.get("created_at", 0.0)),
+                        hits=int(record.get("hits", 0)),
+                    )
+                )
+        if torn_tail:
+            # End the torn line so the next append starts a record of its own.
+            self._append(user_id, None, ["\n"])
+        return partition
+
+    def _retention_score(self, item: MemoryItem, now: float) -> float:
+        age = max(0.0, now - item.created_at)
+        return (1 + item.hits) * 0.5 ** (age / self.decay_half_life_seconds)
 
-    def _load(self) -> None:
-        if not self.store_path.exists():
+    def _evict(self, user_id: str, partition: _Partition) -> None:
+        keep_count = max(1, self.max_turns_per_user - max(1, self.max_turns_per_user // 10))
+        now = time.time()
+        ranked = sorted(
+            range(len(partition.items)),
+            key=lambda index: self._retention_score(partition.items[index], now),
+            reverse=True,
+        )
+        evicted = sorted(ranked[keep_count:])
+        if not evicted:
             return
-        raw = self.store_path.read_text(encoding="utf-8").strip()
-        if not raw:
+        self._append(user_id, partition, [self._delta(user_id, "evict", evicted)])
+        dropped = set(evicted)
+        partition.replace([item for index, item in enumerate(partition.items) if index not in dropped])
+        self._resident_turns -= len(evicted)
+        partition.dead_records += len(evicted) + 1
+        self._maybe_schedule_compaction(user_id, partition)
+
+    def _enforce_budget(self, keep: str) -> None:
+        if self.max_resident_turns is None:
             return
-        for item in json.loads(raw):
-            self._items.append(
-                MemoryItem(
-                    user_id=item["user_id"],
-                    text=item["text"],
-                    vector={k: float(v) for k, v in item["vector"].items()},
-                )
+        while self._resident_turns > self.max_resident_turns and len(self._partitions) > 1:
+            user_id, partition = next(iter(self._partitions.items()))
+            if user_id == keep:
+                self._partitions.move_to_end(user_id)
+                continue
+            # Journals are always current, so unloading costs no I/O.
+            del self._partitions[user_id]
+            self._pending_compactions.pop(user_id, None)
+            self._resident_turns -= len(partition.items)
+
+    def _migrate_legacy(self) -> None:
+        if self.store_path.suffix != ".json" or not self.store_path.exists():
+            return
+        raw = self.store_path.read_text(encoding="utf-8").strip()
+        by_user: dict[str, list[MemoryItem]] = {}
+        for item in json.loads(raw) if raw else []:
+            by_user.setdefault(item["user_id"], []).append(
+                MemoryItem(user_id=item["user_id"], text=item["text"], vector={}, created_at=time.time())
             )
+        for user_id, items in by_user.items():
+            self._append(user_id, None, [self._record(item) for item in items])
+        self.store_path.rename(self.store_path.with_suffix(".json.migrated"))
@@ -1,20 +1,193 @@
-from collections.abc import Callable
+import asyncio
+import inspect
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Generic, TypeVar
+
+import httpx
 
 
 ToolFn = Callable[[str], str]
+AsyncToolFn = Callable[[str, httpx.AsyncClient], Awaitable[str]]
+
+V = TypeVar("V")
+
+# Client for the current synchronous ``execute`` call, which runs on an event loop of its own.
+_call_client: ContextVar[httpx.AsyncClient | None] = ContextVar("_call_client", default=None)
+
+
+class ToolTimeoutError(TimeoutError):
+    def __init__(self, name: str, timeout: float) -> None:
+        super().__init__(f"Tool {name} timed out after {timeout:g}s")
+        self.name = name
+        self.timeout = timeout
+
+
+class ToolUnavailableError(RuntimeError):
+    """Raised by a tool whose upstream failed; callers decide what to tell the user."""
+
+    def __init__(self, name: str, query: str) -> None:
+        super().__init__(f"Tool {name} is unavailable for {query!r}")
+        self.name = name
+        self.query = query
+
+
+class TTLCache(Generic[V]):
+    """Small LRU map whose entries expire ``ttl_seconds`` after being stored."""
+
+    def __init__(self, ttl_seconds: float, max_size: int = 1024) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._items: OrderedDict[Hashable, tuple[float, V]] = OrderedDict()
+
+    def get(self, key: Hashable) -> V | None:
+        item = self._items.get(key)
+        if item is not None and time.monotonic() - item[0] > self.ttl_seconds:
+            del self._items[key]
+            item = None
+        if item is None:
+            self.misses += 1
+            return None
+        self._items.move_to_end(key)
+        self.hits += 1
+        return item[1]
+
+    def put(self, key: Hashable, value: V) -> None:
+        if self.ttl_seconds <= 0 or self.max_size <= 0:
+            return
+        self._items[key] = (time.monotonic(), value)
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+
+    def metrics(self) -> dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._items),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+@dataclass
+class _Tool:
+    fn: ToolFn | AsyncToolFn
+    is_async: bool
+    timeout: float | None
+    cache: TTLCache[str] | None
 
 
 class ToolService:
-    def __init__(self) -> None:
-        self._tools: dict[str, ToolFn] = {}
+    """Registry of sync and async tools.
 
-    def register(self, name: str, tool: ToolFn) -> None:
-        self._tools[name] = tool
+    Async tools receive a pooled ``httpx.AsyncClient`` shared by every tool. Each tool can have a
+    timeout and a TTL cache of results keyed by normalized query; concurrent calls for the same
+    uncached query share one execution. Only results are cached: a tool that raises is retried on
+    the next call.
+    """
+
+    def __init__(self, http_client: httpx.AsyncClient | None = None) -> None:
+        self._tools: dict[str, _Tool] = {}
+        self._http = http_client
+        self._http_loop: asyncio.AbstractEventLoop | None = None
+        self._inflight: dict[tuple[str, str], asyncio.Task[str]] = {}
+
+    def register(
+        self,
+        name: str,
+        tool: ToolFn | AsyncToolFn,
+        timeout: float | None = None,
+        cache_ttl: float | None = None,
+    ) -> None:
+        cache = TTLCache[str](cache_ttl) if cache_ttl else None
+        self._tools[name] = _Tool(fn=tool, is_async=inspect.iscoroutinefunction(tool), timeout=timeout, cache=cache)
 
     def execute(self, name: str, query: str) -> str:
-        if name not in self._tools:
-            raise KeyError(f"Unknown tool: {name}")
-        return self._tools[name](query)
+        tool = self._get(name)
+        if tool.is_async:
+            return asyncio.run(self._aexecute_once(name, query))
+        if tool.cache is not None or tool.timeout is not None:
+            return asyncio.run(self.aexecute(name, query))
+        return tool.fn(query)
+
+    async def aexecute(self, name: str, query: str) -> str:
+        tool = self._get(name)
+        key = (name, " ".join(query.lower().split()))
+        if tool.cache is not None:
+            cached = tool.cache.get(key)
+            if cached is not None:
+                return cached
+        inflight = self._inflight.get(key)
+        if inflight is None:
+            # The shared call runs as its own task so that cancelling whichever caller started it
+            # does not cancel it for the callers waiting on the same key.
+            inflight = asyncio.ensure_future(self._run_shared(key, name, tool, query))
+            self._inflight[key] = inflight
+        return await asyncio.shield(inflight)
 
     def has(self, name: str) -> bool:
         return name in self._tools
+
+    def cache_metrics(self) -> dict[str, dict[str, float]]:
+        return {name: tool.cache.metrics() for name, tool in self._tools.items() if tool.cache is not None}
+
+    async def aclose(self) -> None:
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    async def _run_shared(self, key: tuple[str, str], name: str, tool: _Tool, query: str) -> str:
+        try:
+            result = await self._run(name, tool, query)
+        finally:
+            del self._inflight[key]
+        if tool.cache is not None:
+            tool.cache.put(key, result)
+        return result
+
+    async def _aexecute_once(self, name: str, query: str) -> str:
+        # Pooled connections belong to the loop that opened them and this loop ends with the call,
+        # so the call gets a client of its own and closes it rather than replacing the shared one.
+        async with self._new_client() as client:
+            token = _call_client.set(client)
+            try:
+                return await self.aexecute(name, query)
+            finally:
+                _call_client.reset(token)
+
+    def _get(self, name: str) -> _Tool:
+        if name not in self._tools:
+            raise KeyError(f"Unknown tool: {name}")
+        return self._tools[name]
+
+    async def _run(self, name: str, tool: _Tool, query: str) -> str:
+        if tool.is_async:
+            call = tool.fn(query, self._client())
+        else:
+            call = asyncio.to_thread(tool.fn, query)
+        try:
+            return await asyncio.wait_for(call, tool.timeout)
+        except TimeoutError as exc:
+            raise ToolTimeoutError(name, tool.timeout) from exc
+
+    def _client(self) -> httpx.AsyncClient:
+        client = _call_client.get()
+        if client is not None:
+            return client
+        loop = asyncio.get_running_loop()
+        if self._http is None or (self._http_loop is not None and self._http_loop is not loop):
+            self._http = self._new_client()
+            self._http_loop = loop
+        return self._http
+
+    def _new_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            timeout=httpx.Timeout(10.0),
+        )
@@ -1,34 +1,70 @@
-import json
-from urllib.parse import quote
-from urllib.request import urlopen
+import asyncio
+
+import httpx
+
+from ai_app.services.tools import AsyncToolFn, TTLCache, ToolUnavailableError
+
+
+GEOCODE_URL = "https://geocoding-api.open-meteo.com/v1/search"
+FORECAST_URL = "https://api.open-meteo.com/v1/forecast"
+
+
+def build_weather_tool(
+    geocode_url: str = GEOCODE_URL,
+    forecast_url: str = FORECAST_URL,
+    geocode_ttl_seconds: float = 24 * 3600,
+) -> AsyncToolFn:
+    """Return an async weather tool that caches city -> location lookups across users.
+
+    Upstream failures raise :class:`ToolUnavailableError` instead of returning a message, so a
+    result cache in front of the tool never keeps an outage around.
+    """
+    locations: TTLCache[dict] = TTLCache(geocode_ttl_seconds, max_size=4096)
+
+    async def weather(city: str, client: httpx.AsyncClient) -> str:
+        key = " ".join(city.lower().split())
+        try:
+            location = locations.get(key)
+            if location is None:
+                response = await client.get(
+                    geocode_url, params={"name": city, "count": 1, "language": "en", "format": "json"}
+                )
+                response.raise_for_status()
+                results = response.json().get("results") or []
+                # An empty dict caches "no such city" too.
+                location = results[0] if results else {}
+                locations.put(key, location)
+            if not location:
+                return f"I could not find weather data for {city}"
+
+            response = await client.get(
+                forecast_url,
+                params={
+                    "latitude": location["latitude"],
+                    "longitude": location["longitude"],
+                    "current": "temperature_2m,weather_code",
+                },
+            )
+            response.raise_for_status()
+            current = response.json().get("current", {})
+            temp_c = current.get("temperature_2m", "?")
+            code = current.get("weather_code", "?")
+            return f"Current weather in {location.get('name', city)}: {temp_c}C (code {code})"
+        except (httpx.HTTPError, ValueError, KeyError) as exc:
+            raise ToolUnavailableError("weather", city) from exc
+
+    return weather
+
+
+fetch_weather_async = build_weather_tool()
 
 
 def fetch_weather(city: str) -> str:
-    safe_city = quote(city)
-    geo_url = (
-        "https://geocoding-api.open-meteo.com/v1/search"
-        f"?name={safe_city}&count=1&language=en&format=json"
-    )
-    try:
-        with urlopen(geo_url, timeout=4) as response:
-            payload = json.loads(response.read().decode("utf-8"))
-        results = payload.get("results") or []
-        if not results:
-            return f"I could not find weather data for {city}"
-        location = results[0]
-        latitude = location["latitude"]
-        longitude = location["longitude"]
-        name = location.get("name", city)
-
-        forecast_url = (
-            "https://api.open-meteo.com/v1/forecast"
-            f"?latitude={latitude}&longitude={longitude}&current=temperature_2m,weather_code"
-        )
-        with urlopen(forecast_url, timeout=4) as response:
-            forecast_payload = json.loads(response.read().decode("utf-8"))
-        current = forecast_payload.get("current", {})
-        temp_c = current.get("temperature_2m", "?")
-        code = current.get("weather_code", "?")
-        return f"Current weather in {name}: {temp_c}C (code {code})"
-    except Exception:
-        return f"Weather tool is unavailable for {city} right now"
+    async def run() -> str:
+        async with httpx.AsyncClient(timeout=4) as client:
+            try:
+                return await fetch_weather_async(city, client)
+            except ToolUnavailableError:
+                return f"Weather tool is unavailable for {city} right now"
+
+    return asyncio.run(run())
@@ -1,8 +1,13 @@
+import asyncio
+import threading
+import time
 from pathlib import Path
 
+import pytest
 from fastapi.testclient import TestClient
 
 from ai_app.main import app
+from ai_app.models import ChatMetadata, ChatRequest
 from ai_app.services.conversation import ConversationService
 from ai_app.services.memory import MemoryService
 from ai_app.services.tools import ToolService
@@ -41,3 +46,106 @@ def test_chat_memory_augmented_path(tmp_path) -> None:
     second = client.post("/chat", json={"user_id": "u1", "message": "Any mountain tips?"})
     assert second.status_code == 200
     assert "I remember: I enjoy hiking mountains" in second.text
+
+
+class _SlowMemory(MemoryService):
+    def __init__(self, store_path: Path, delay: float) -> None:
+        super().__init__(store_path=store_path)
+        self.delay = delay
+        self.retrieve_finished = threading.Event()
+
+    def retrieve(self, user_id: str, query: str, top_k: int = 3):
+        time.sleep(self.delay)
+        matches = super().retrieve(user_id, query, top_k)
+        self.retrieve_finished.set()
+        return matches
+
+
+def test_stream_emits_tokens_before_memory_retrieval_finishes(tmp_path) -> None:
+    memory = _SlowMemory(tmp_path / "memory.json", delay=0.3)
+    memory.add_turn("u1", "I enjoy hiking mountains")
+    convo = ConversationService(memory_service=memory, tool_service=ToolService())
+
+    async def scenario() -> tuple[str, bool, str, ChatMetadata]:
+        metadata = ChatMetadata()
+        stream = convo.astream(ChatRequest(user_id="u1", message="Any mountain tips?"), metadata)
+        first = await anext(stream)
+        finished_before_first = memory.retrieve_finished.is_set()
+        rest = "".join([piece async for piece in stream])
+        return first, finished_before_first, first + rest, metadata
+
+    first, finished_before_first, text, metadata = asyncio.run(scenario())
+    assert first == "You"
+    assert not finished_before_first
+    assert text == "You said: Any mountain tips?. I remember: I enjoy hiking mountains"
+    assert metadata.memory_hits == 1
+
+
+def test_weather_tool_and_memory_retrieval_overlap(tmp_path) -> None:
+    memory = _SlowMemory(tmp_path / "memory.json", delay=0.3)
+    tools = ToolService()
+
+    async def slow_weather(city: str, client) -> str:
+        await asyncio.sleep(0.3)
+        return f"Sunny in {city}"
+
+    tools.register("weather", slow_weather)
+    convo = ConversationService(memory_service=memory, tool_service=tools)
+
+    start = time.perf_counter()
+    result = convo.chat(ChatRequest(user_id="u1", message="weather in Oslo"))
+    assert time.perf_counter() - start < 0.55
+    assert result.text == "Sunny in Oslo."
+    assert result.metadata.tool_invoked == "weather"
+
+
+def test_weather_tool_is_cancelled_when_memory_retrieval_fails(tmp_path) -> None:
+    class _BrokenMemory(MemoryService):
+        def retrieve(self, user_id: str, query: str, top_k: int = 3):
+            time.sleep(0.05)
+            raise OSError("memory store unavailable")
+
+    tools = ToolService()
+    tools.register("weather", lambda city: f"Sunny in {city}")
+    convo = ConversationService(memory_service=_BrokenMemory(store_path=tmp_path / "memory.json"), tool_service=tools)
+    cancelled = asyncio.Event()
+
+    async def slow_weather(city: str) -> str:
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        return f"Sunny in {city}"
+
+    convo._run_weather = slow_weather
+
+    async def scenario() -> None:
+        with pytest.raises(OSError):
+            async for _ in convo.astream(ChatRequest(user_id="u1", message="weather in Oslo")):
+                pass
+        assert cancelled.is_set()
+        assert asyncio.all_tasks() == {asyncio.current_task()}
+
+    asyncio.run(scenario())
+
+
+def test_stream_does_not_persist_turn_until_remembered(tmp_path) -> None:
+    memory = MemoryService(store_path=tmp_path / "memory.json")
+    convo = ConversationService(memory_service=memory, tool_service=ToolService())
+    request = ChatRequest(user_id="u1", message="I enjoy hiking mountains")
+
+    async def consume() -> str:
+        return "".join([piece async for piece in convo.astream(request)])
+
+    assert asyncio.run(consume()) == "You said: I enjoy hiking mountains"
+    assert memory.retrieve("u1", "hiking") == []
+    convo.remember(request)
+    assert [item.text for item in memory.retrieve("u1", "hiking")] == ["I enjoy hiking mountains"]
+
+
+def test_chat_stream_matches_full_response(tmp_path) -> None:
+    client = _test_client_with_stubbed_weather(tmp_path)
+    client.post("/chat", json={"user_id": "u1", "message": "I enjoy hiking mountains"})
+    response = client.post("/chat", json={"user_id": "u1", "message": "Any mountain tips?"})
+    assert response.text == "You said: Any mountain tips?. I remember: I enjoy hiking mountains"
@@ -1,3 +1,7 @@
+import json
+import os
+import threading
+
 from ai_app.services.memory import MemoryService
 
 
@@ -22,3 +26,184 @@ def test_memory_persists_to_disk(tmp_path) -> None:
     matches = reloaded.retrieve("u1", "fact", top_k=1)
     assert len(matches) == 1
     assert matches[0].text == "remember this fact"
+
+
+def test_memory_is_partitioned_per_user(tmp_path) -> None:
+    memory = MemoryService(store_path=tmp_path / "memory.json")
+    memory.add_turn("u1", "I enjoy hiking in mountains")
+    memory.add_turn("u2", "mountains are my favourite hiking spot")
+
+    matches = memory.retrieve("u1", "hiking mountains", top_k=5)
+    assert [item.user_id for item in matches] == ["u1"]
+
+
+def test_memory_index_matches_full_scan_ranking(tmp_path) -> None:
+    memory = MemoryService(store_path=tmp_path / "memory.json")
+    texts = [
+        "tea in the morning",
+        "coffee at work",
+        "tea and coffee together",
+        "hiking trails",
+        "green tea tea tea",
+    ]
+    for text in texts:
+        memory.add_turn("u1", text)
+
+    query_vector = memory._embed("tea coffee")
+    expected = sorted(
+        (item for item in memory._partition("u1").items if memory._cosine_similarity(query_vector, item.vector) > 0),
+        key=lambda item: memory._cosine_similarity(query_vector, item.vector),
+        reverse=True,
+    )
+    assert [item.text for item in memory.retrieve("u1", "tea coffee", top_k=10)] == [item.text for item in expected]
+
+
+def test_memory_appends_to_journal(tmp_path) -> None:
+    memory = MemoryService(store_path=tmp_path / "memory.json")
+    memory.add_turn("u1", "first")
+    memory.add_turn("u1", "second")
+
+    journal = memory._journal_path("u1")
+    assert journal.parent == tmp_path / "memory"
+    assert [json.loads(line)["text"] for line in journal.read_text(encoding="utf-8").splitlines()] == [
+        "first",
+        "second",
+    ]
+
+
+def test_memory_migrates_legacy_json_store(tmp_path) -> None:
+    store_path = tmp_path / "memory.json"
+    store_path.write_text(
+        json.dumps([{"user_id": "u1", "text": "legacy hiking note", "vector": {"hiking": 1.0}}]),
+        encoding="utf-8",
+    )
+
+    memory = MemoryService(store_path=store_path)
+    assert not store_path.exists()
+    assert (tmp_path / "memory.json.migrated").exists()
+    assert [item.text for item in memory.retrieve("u1", "hiking", top_k=1)] == ["legacy hiking note"]
+    assert [item.text for item in MemoryService(store_path=store_path).retrieve("u1", "hiking")] == [
+        "legacy hiking note"
+    ]
+
+
+def test_memory_compacts_torn_journal_lines(tmp_path) -> None:
+    store_path = tmp_path / "memory.json"
+    memory = MemoryService(store_path=store_path)
+    memory.add_turn("u1", "kept memory")
+    journal = memory._journal_path("u1")
+    with journal.open("a", encoding="utf-8") as handle:
+        handle.write('{"user_id": "u1", "te\n{"user_id"\n')
+
+    reloaded = MemoryService(store_path=store_path)
+    assert [item.text for item in reloaded.retrieve("u1", "kept")] == ["kept memory"]
+    reloaded.flush()
+    assert [json.loads(line)["text"] for line in journal.read_text(encoding="utf-8").splitlines()] == ["kept memory"]
+
+
+def test_memory_repairs_torn_tail_before_appending(tmp_path) -> None:
+    store_path = tmp_path / "memory.json"
+    MemoryService(store_path=store_path).add_turn("u1", "before crash")
+    journal = MemoryService(store_path=store_path)._journal_path("u1")
+    with journal.open("a", encoding="utf-8") as handle:
+        handle.write('{"user_id": "u1", "text": "half')
+
+    memory = MemoryService(store_path=store_path)
+    memory.add_turn("u1", "after crash")
+    assert [item.text for item in MemoryService(store_path=store_path)._partition("u1").items] == [
+        "before crash",
+        "after crash",
+    ]
+
+
+def test_memory_caps_turns_per_user_by_age_and_hits(tmp_path, monkeypatch) -> None:
+    clock = iter(range(1, 100))
+    monkeypatch.setattr("ai_app.services.memory.time.time", lambda: float(next(clock)) * 3600)
+    memory = MemoryService(store_path=tmp_path / "memory.json", max_turns_per_user=10, decay_half_life_seconds=3600)
+    memory.add_turn("u1", "favourite mountain is rainier")
+    for index in range(9):
+        memory.add_turn("u1", f"filler note {index}")
+    for _ in range(20):
+        memory.retrieve("u1", "mountain", top_k=1)
+
+    memory.add_turn("u1", "newest note")
+    texts = [item.text for item in memory._partition("u1").items]
+    # Over the cap: trimmed to 90% of it, keeping the frequently recalled old memory and the newest ones.
+    assert len(texts) == 9
+    assert texts[0] == "favourite mountain is rainier"
+    assert texts[-1] == "newest note"
+    assert "filler note 0" not in texts
+    assert memory.resident_turns() == 9
+
+    reloaded = MemoryService(store_path=tmp_path / "memory.json", max_turns_per_user=10)
+    assert [item.text for item in reloaded._partition("u1").items] == texts
+    assert reloaded._partition("u1").items[0].hits == 20
+
+
+def test_memory_budget_unloads_least_recently_used_users(tmp_path) -> None:
+    store_path = tmp_path / "memory.json"
+    memory = MemoryService(store_path=store_path, max_resident_turns=4)
+    for user_id in ("u1", "u2", "u3"):
+        memory.add_turn(user_id, f"{user_id} likes tea")
+        memory.add_turn(user_id, f"{user_id} likes hiking")
+
+    assert list(memory._partitions) == ["u2", "u3"]
+    assert memory.resident_turns() == 4
+    # Unloaded users reload lazily from their journal.
+    assert [item.text for item in memory.retrieve("u1", "tea")] == ["u1 likes tea"]
+    assert list(memory._partitions) == ["u3", "u1"]
+
+
+def test_memory_hits_survive_restart_without_unloading(tmp_path) -> None:
+    store_path = tmp_path / "memory.json"
+    memory = MemoryService(store_path=store_path)
+    memory.add_turn("u1", "favourite mountain is rainier")
+    memory.add_turn("u1", "tea in the morning")
+    for _ in range(3):
+        memory.retrieve("u1", "mountain", top_k=1)
+
+    reloaded = MemoryService(store_path=store_path)
+    assert [item.hits for item in reloaded._partition("u1").items] == [3, 0]
+
+
+def test_memory_requests_only_append_to_journals(tmp_path, monkeypatch) -> None:
+    memory = MemoryService(store_path=tmp_path / "memory.json", max_resident_turns=2, max_turns_per_user=3)
+    for user_id in ("u1", "u2"):
+        memory.add_turn(user_id, f"{user_id} likes tea")
+    memory.flush()
+
+    replace = os.replace
+    request_thread = threading.current_thread()
+
+    def replace_off_request_path(*args) -> None:
+        assert threading.current_thread() is not request_thread, "journal rewritten on the request path"
+        replace(*args)
+
+    monkeypatch.setattr("ai_app.services.memory.os.replace", replace_off_request_path)
+    for index in range(5):
+        memory.retrieve("u1", "tea")
+        memory.add_turn("u3", f"note {index}")
+    memory.retrieve("u2", "tea")
+    memory.flush()
+
+    assert [item.hits for item in memory._partition("u1").items] == [5]
+
+
+def test_memory_cap_of_one_keeps_the_newest_turn(tmp_path) -> None:
+    store_path = tmp_path / "memory.json"
+    memory = MemoryService(store_path=store_path, max_turns_per_user=1)
+    memory.add_turn("u1", "first")
+    memory.add_turn("u1", "second")
+
+    assert [item.text for item in memory._partition("u1").items] == ["second"]
+    assert [item.text for item in MemoryService(store_path=store_path)._partition("u1").items] == ["second"]
+
+
+def test_memory_lookups_for_unknown_users_stay_unloaded(tmp_path) -> None:
+    memory = MemoryService(store_path=tmp_path / "memory.json")
+    for index in range(100):
+        assert memory.retrieve(f"anonymous-{index}", "anything") == []
+    memory.add_turn("u1", "remember this fact")
+
+    assert list(memory._partitions) == ["u1"]
+    assert [item.text for item in memory.retrieve("u1", "fact")] == ["remember this fact"]
@@ -1,7 +1,20 @@
+import asyncio
+import json
+import threading
+import time
+from collections import Counter
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import httpx
+import pytest
+
 from ai_app.models import ChatRequest
 from ai_app.services.conversation import ConversationService
 from ai_app.services.memory import MemoryService
-from ai_app.services.tools import ToolService
+from ai_app.services.tools import ToolService, ToolTimeoutError, ToolUnavailableError
+from ai_app.tools.weather import build_weather_tool
 
 
 def test_tool_service_registers_and_executes_tools() -> None:
@@ -24,3 +37,189 @@ def test_conversation_routes_weather_query_to_tool(tmp_path) -> None:
     result = convo.chat(ChatRequest(user_id="u1", message="What's the weather in Paris?"))
     assert result.metadata.tool_invoked == "weather"
     assert "Sunny in Paris" in result.text
+
+
+class _StubWeatherServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, delay: float) -> None:
+        super().__init__(("127.0.0.1", 0), _StubWeatherHandler)
+        self.delay = delay
+        self.failures = 0
+        self.calls: Counter[str] = Counter()
+        self.active = 0
+        self.peak_active = 0
+        self.lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class _StubWeatherHandler(BaseHTTPRequestHandler):
+    server: _StubWeatherServer
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        with self.server.lock:
+            self.server.calls[url.path] += 1
+            self.server.active += 1
+            self.server.peak_active = max(self.server.peak_active, self.server.active)
+            fail = self.server.failures > 0
+            self.server.failures -= fail
+        time.sleep(self.server.delay)
+        if fail:
+            with self.server.lock:
+                self.server.active -= 1
+            self.send_error(503)
+            return
+        if url.path == "/search":
+            name = params["name"]
+            results = [] if name == "Atlantis" else [{"name": name, "latitude": len(name), "longitude": 1.0}]
+            body = {"results": results}
+        else:
+            body = {"current": {"temperature_2m": params["latitude"], "weather_code": 1}}
+        payload = json.dumps(body).encode("utf-8")
+        with self.server.lock:
+            self.server.active -= 1
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format: str, *args: object) -> None:
+        return
+
+
+@pytest.fixture
+def weather_server() -> Iterator[_StubWeatherServer]:
+    server = _StubWeatherServer(delay=0.2)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _weather_tools(server: _StubWeatherServer, cache_ttl: float | None = 60.0, timeout: float = 5.0) -> ToolService:
+    tools = ToolService()
+    tool = build_weather_tool(geocode_url=f"{server.base_url}/search", forecast_url=f"{server.base_url}/forecast")
+    tools.register("weather", tool, timeout=timeout, cache_ttl=cache_ttl)
+    return tools
+
+
+def test_weather_tool_results_are_shared_across_concurrent_users(weather_server) -> None:
+    tools = _weather_tools(weather_server)
+
+    async def scenario() -> list[str]:
+        try:
+            first = await asyncio.gather(*(tools.aexecute("weather", "Paris") for _ in range(20)))
+            again = await asyncio.gather(*(tools.aexecute("weather", " paris ") for _ in range(20)))
+            return first + again
+        finally:
+            await tools.aclose()
+
+    outputs = asyncio.run(scenario())
+    assert set(outputs) == {"Current weather in Paris: 5C (code 1)"}
+    # Concurrent misses share one execution; the second wave is served from the cache.
+    assert weather_server.calls == {"/search": 1, "/forecast": 1}
+    assert tools.cache_metrics()["weather"]["hits"] == 20
+
+
+def test_cancelled_caller_does_not_cancel_shared_tool_call(weather_server) -> None:
+    tools = _weather_tools(weather_server)
+
+    async def scenario() -> str:
+        try:
+            first = asyncio.create_task(tools.aexecute("weather", "Paris"))
+            await asyncio.sleep(0.05)
+            second = asyncio.create_task(tools.aexecute("weather", "Paris"))
+            await asyncio.sleep(0.05)
+            first.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await first
+            return await second
+        finally:
+            await tools.aclose()
+
+    assert asyncio.run(scenario()) == "Current weather in Paris: 5C (code 1)"
+    assert weather_server.calls == {"/search": 1, "/forecast": 1}
+
+
+def test_weather_tool_runs_different_cities_concurrently(weather_server) -> None:
+    tools = _weather_tools(weather_server)
+    cities = ["Paris", "Berlin", "Lisbon", "Oslo", "Rome"]
+
+    async def scenario() -> float:
+        start = time.perf_counter()
+        try:
+            await asyncio.gather(*(tools.aexecute("weather", city) for city in cities))
+        finally:
+            await tools.aclose()
+        return time.perf_counter() - start
+
+    elapsed = asyncio.run(scenario())
+    # Two sequential 0.2s requests per city; run serially this would take 2s.
+    assert elapsed < 1.0
+    assert weather_server.peak_active >= len(cities)
+
+
+def test_weather_tool_caches_geocoding_separately_from_forecasts(weather_server) -> None:
+    tools = _weather_tools(weather_server, cache_ttl=None)
+
+    async def scenario() -> list[str]:
+        try:
+            return [await tools.aexecute("weather", city) for city in ("Paris", "Paris", "Atlantis", "Atlantis")]
+        finally:
+            await tools.aclose()
+
+    outputs = asyncio.run(scenario())
+    assert outputs[-1] == "I could not find weather data for Atlantis"
+    assert weather_server.calls == {"/search": 2, "/forecast": 2}
+
+
+def test_tool_timeout_raises_and_conversation_falls_back(weather_server, tmp_path) -> None:
+    tools = _weather_tools(weather_server, timeout=0.05)
+    with pytest.raises(ToolTimeoutError):
+        tools.execute("weather", "Paris")
+
+    convo = ConversationService(memory_service=MemoryService(store_path=tmp_path / "memory.json"), tool_service=tools)
+    result = convo.chat(ChatRequest(user_id="u1", message="What's the weather in Paris?"))
+    assert result.text == "Weather tool is unavailable for Paris right now."
+
+
+def test_upstream_failure_is_not_cached(weather_server, tmp_path) -> None:
+    tools = _weather_tools(weather_server)
+    weather_server.failures = 1
+    with pytest.raises(ToolUnavailableError):
+        tools.execute("weather", "Paris")
+
+    convo = ConversationService(memory_service=MemoryService(store_path=tmp_path / "memory.json"), tool_service=tools)
+    weather_server.failures = 1
+    result = convo.chat(ChatRequest(user_id="u1", message="What's the weather in Paris?"))
+    assert result.text == "Weather tool is unavailable for Paris right now."
+
+    # The outage passed; the next call reaches the upstream again instead of a cached fallback.
+    assert tools.execute("weather", "Paris") == "Current weather in Paris: 5C (code 1)"
+    assert tools.cache_metrics()["weather"]["size"] == 1
+
+
+def test_sync_execute_closes_its_client(weather_server, monkeypatch) -> None:
+    tools = _weather_tools(weather_server)
+    clients: list[httpx.AsyncClient] = []
+    new_client = tools._new_client
+
+    def recording_new_client() -> httpx.AsyncClient:
+        clients.append(new_client())
+        return clients[-1]
+
+    monkeypatch.setattr(tools, "_new_client", recording_new_client)
+    tools.execute("weather", "Paris")
+    tools.execute("weather", "Berlin")
+
+    assert len(clients) == 2
+    assert all(client.is_closed for client in clients)
+    # Sync calls leave the shared pool for the app's own loop alone.
+    assert tools._http is None
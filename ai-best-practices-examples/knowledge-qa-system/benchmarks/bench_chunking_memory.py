@@ -0,0 +1,61 @@
+"""Compare peak memory of chunk_text on a materialized document with iter_chunks over a page iterator.
+
+Run from the project root:
+
+    PYTHONPATH=src python3 benchmarks/bench_chunking_memory.py --pages 600 --batch 256
+"""
+
+import argparse
+import random
+import tracemalloc
+from collections.abc import Callable, Iterator
+
+from app.ingestion.chunking import chunk_text, iter_chunks
+
+
+def iter_pages(pages: int, sentences_per_page: int, seed: int) -> Iterator[str]:
+    rng = random.Random(seed)
+    words = [f"word{index}" for index in range(5000)]
+    for _ in range(pages):
+        yield " ".join(" ".join(rng.choices(words, k=rng.randint(8, 25))) + "." for _ in range(sentences_per_page))
+
+
+def peak_bytes(func: Callable[[], int]) -> tuple[int, int]:
+    tracemalloc.start()
+    count = func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak, count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=600)
+    parser.add_argument("--sentences", type=int, default=40, help="sentences per page")
+    parser.add_argument("--chunk-size", type=int, default=800)
+    parser.add_argument("--overlap", type=int, default=120)
+    parser.add_argument("--batch", type=int, default=256, help="chunks buffered per upsert")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    def materialized() -> int:
+        text = "\n".join(iter_pages(args.pages, args.sentences, args.seed))
+        return len(chunk_text(text, args.chunk_size, args.overlap))
+
+    def streamed() -> int:
+        count = 0
+        batch: list[str] = []
+        for chunk in iter_chunks(iter_pages(args.pages, args.sentences, args.seed), args.chunk_size, args.overlap):
+            batch.append(chunk)
+            if len(batch) >= args.batch:
+                count += len(batch)
+                batch = []
+        return count + len(batch)
+
+    for label, func in (("chunk_text (materialized)", materialized), ("iter_chunks (streamed)", streamed)):
+        peak, count = peak_bytes(func)
+        print(f"{label:<28} {count:8d} chunks  peak {peak / 1_048_576:8.2f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Compare documents/sec of the batched HashEmbeddings path with the previous per-token loop.
+
+Run from the project root:
+
+    PYTHONPATH=src python3 benchmarks/bench_hash_embeddings.py --documents 20000 --workers 4
+"""
+
+import argparse
+import hashlib
+import random
+import time
+
+from app.retrieval.embeddings import HashEmbeddings
+
+
+def legacy_embed(text: str, size: int) -> list[float]:
+    vector = [0.0] * size
+    for token in text.lower().split():
+        digest = hashlib.sha256(token.encode("utf-8")).digest()
+        index = int.from_bytes(digest[:4], byteorder="big") % size
+        vector[index] += 1.0
+    norm = sum(value * value for value in vector) ** 0.5
+    if norm > 0:
+        vector = [value / norm for value in vector]
+    return vector
+
+
+def make_corpus(documents: int, words_per_document: int, vocabulary: int, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    words = [f"term{index}" for index in range(vocabulary)]
+    return [" ".join(rng.choices(words, k=words_per_document)) for _ in range(documents)]
+
+
+def timed(label: str, documents: int, func) -> float:
+    started = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<28} {elapsed:8.3f}s  {documents / elapsed:12.0f} docs/sec")
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--documents", type=int, default=20000)
+    parser.add_argument("--words", type=int, default=120, help="tokens per document (~one 800 char chunk)")
+    parser.add_argument("--vocabulary", type=int, default=30000)
+    parser.add_argument("--size", type=int, default=384)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.documents, args.words, args.vocabulary, args.seed)
+    print(f"{args.documents} documents x {args.words} tokens, {args.size} buckets")
+
+    legacy = timed("legacy per-token loop", args.documents, lambda: [legacy_embed(text, args.size) for text in corpus])
+    batched = HashEmbeddings(size=args.size)
+    timed("batched (cold cache)", args.documents, lambda: batched.embed_documents(corpus))
+    warm = timed("batched (warm cache)", args.documents, lambda: batched.embed_documents(corpus))
+    if args.workers > 1:
+        pooled = HashEmbeddings(size=args.size, workers=args.workers, parallel_threshold=1)
+        timed(f"batched, {args.workers} processes", args.documents, lambda: pooled.embed_documents(corpus))
+    print(f"warm batched speedup vs legacy: {legacy / warm:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
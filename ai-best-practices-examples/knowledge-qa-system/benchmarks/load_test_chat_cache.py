@@ -0,0 +1,92 @@
+"""Measure /chat answer latency (p50/p99) with the retrieval cache on and off.
+
+Builds a throwaway Chroma collection of synthetic chunks, then replays a skewed, FAQ-like
+query mix through ChatService in-process. Run from the project root:
+
+    PYTHONPATH=src python3 benchmarks/load_test_chat_cache.py --requests 2000 --chunks 5000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("KQ_EMBEDDING_BACKEND", "hash")
+os.environ.setdefault("KQ_CHROMA_PATH", tempfile.mkdtemp(prefix="kq-load-"))
+os.environ.setdefault("KQ_COLLECTION_NAME", "load_test_chunks")
+
+from app.domain.models import ChunkRecord  # noqa: E402
+from app.domain.services.chat_service import ChatService  # noqa: E402
+from app.domain.services.retrieval_service import RetrievalService  # noqa: E402
+from app.retrieval.vector_store import ChromaVectorStore  # noqa: E402
+
+
+def seed_collection(store: ChromaVectorStore, chunks: int, rng: random.Random) -> None:
+    words = [f"term{index}" for index in range(3000)]
+    records = [
+        ChunkRecord(
+            chunk_id=f"doc{index // 20}::{index % 20}",
+            document_id=f"doc{index // 20}",
+            chunk_index=index % 20,
+            text=" ".join(rng.choices(words, k=120)),
+            source_type="web",
+            source_uri=f"https://wiki.example/doc{index // 20}",
+            title=f"Doc {index // 20}",
+        )
+        for index in range(chunks)
+    ]
+    for start in range(0, len(records), 500):
+        store.upsert_chunks(records[start : start + 500])
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def run(label: str, service: ChatService, queries: list[str]) -> None:
+    latencies: list[float] = []
+    for query in queries:
+        started = time.perf_counter()
+        service.answer(query)
+        latencies.append((time.perf_counter() - started) * 1000)
+    print(
+        f"{label:<10} p50 {percentile(latencies, 0.50):7.2f} ms  p99 {percentile(latencies, 0.99):7.2f} ms"
+        f"  mean {statistics.fmean(latencies):7.2f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--chunks", type=int, default=5000)
+    parser.add_argument("--distinct-questions", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    store = ChromaVectorStore()
+    seed_collection(store, args.chunks, rng)
+
+    questions = [
+        f"how do I configure term{rng.randrange(3000)} with term{rng.randrange(3000)}?"
+        for _ in range(args.distinct_questions)
+    ]
+    # Zipf-like skew: a few FAQ questions dominate traffic.
+    weights = [1 / (rank + 1) for rank in range(len(questions))]
+    queries = rng.choices(questions, weights=weights, k=args.requests)
+
+    uncached = RetrievalService(vector_store=store)
+    uncached.cache_enabled = False
+    cached = RetrievalService(vector_store=store)
+
+    print(f"{args.chunks} chunks, {args.requests} requests over {args.distinct_questions} distinct questions")
+    run("cache off", ChatService(retrieval_service=uncached), queries)
+    run("cache on", ChatService(retrieval_service=cached), queries)
+    print(f"result cache hit rate: {cached.result_cache.metrics()['hit_rate']:.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+import asyncio
 import json
 
 from fastapi import APIRouter
@@ -12,17 +13,18 @@ chat_service = ChatService()
 
 
 @router.post("/chat", response_model=None)
-def chat(request: ChatRequest) -> Response:
-    response = chat_service.answer(request.message, top_k=request.top_k)
+async def chat(request: ChatRequest) -> Response:
     if not request.stream:
+        response = await asyncio.to_thread(chat_service.answer, request.message, request.top_k)
         return JSONResponse(response.model_dump())
 
-    def event_stream():
-        yield "event: retrieval_started\ndata: {}\n\n"
-        for citation in response.citations:
-            yield f"event: citation\ndata: {json.dumps(citation.model_dump())}\n\n"
-        for token in chat_service.stream_answer(response.answer):
-            yield f"event: token\ndata: {json.dumps({'token': token})}\n\n"
-        yield f"event: final\ndata: {json.dumps(response.model_dump())}\n\n"
+    async def event_stream():
+        async for event, payload in chat_service.astream(request.message, top_k=request.top_k):
+            yield f"event: {event}\ndata: {json.dumps(payload)}\n\n"
 
     return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
+@router.get("/chat/cache")
+def chat_cache_metrics() -> dict[str, object]:
+    return chat_service.retrieval_service.cache_metrics()
@@ -1,22 +1,56 @@
-from fastapi import APIRouter
+import asyncio
+import json
 
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+
+from app.core.config import settings
+from app.domain.services.ingest_jobs import FINISHED_STATUSES, IngestJobQueue, IngestQueueFullError
 from app.domain.services.ingestion_service import IngestionService
 from app.schemas.ingest import IngestRequest, IngestResponse
 
 router = APIRouter(prefix="", tags=["ingest"])
 ingestion_service = IngestionService()
-_JOB_STATUS: dict[str, IngestResponse] = {}
+ingest_jobs = IngestJobQueue(
+    ingestion_service,
+    workers=settings.ingest_job_workers,
+    max_pending=settings.ingest_job_queue_size,
+    history=settings.ingest_job_history,
+    ttl_seconds=settings.ingest_job_ttl_seconds,
+)
+PROGRESS_POLL_SECONDS = 0.25
+
+
+def _not_found(job_id: str) -> IngestResponse:
+    return IngestResponse(job_id=job_id, status="not_found", failures=["job not found"])
 
 
-@router.post("/ingest", response_model=IngestResponse)
+@router.post("/ingest", response_model=IngestResponse, status_code=202)
 def ingest(request: IngestRequest) -> IngestResponse:
-    result = ingestion_service.ingest(request)
-    _JOB_STATUS[result.job_id] = result
-    return result
+    try:
+        return ingest_jobs.submit(request)
+    except IngestQueueFullError as exc:
+        raise HTTPException(status_code=503, detail=str(exc)) from exc
 
 
 @router.get("/ingest/{job_id}", response_model=IngestResponse)
 def ingest_status(job_id: str) -> IngestResponse:
-    if job_id not in _JOB_STATUS:
-        return IngestResponse(job_id=job_id, documents_ingested=0, chunks_written=0, failures=["job not found"])
-    return _JOB_STATUS[job_id]
+    return ingest_jobs.get(job_id) or _not_found(job_id)
+
+
+@router.get("/ingest/{job_id}/events")
+async def ingest_events(job_id: str) -> StreamingResponse:
+    async def event_stream():
+        last: IngestResponse | None = None
+        while True:
+            record = ingest_jobs.get(job_id) or _not_found(job_id)
+            finished = record.status in FINISHED_STATUSES or record.status == "not_found"
+            if record != last:
+                event = "final" if finished else "progress"
+                yield f"event: {event}\ndata: {json.dumps(record.model_dump())}\n\n"
+                last = record
+            if finished:
+                return
+            await asyncio.sleep(PROGRESS_POLL_SECONDS)
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
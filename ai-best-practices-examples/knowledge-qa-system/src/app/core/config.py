@@ -6,15 +6,44 @@ class Settings(BaseSettings):
     collection_name: str = "knowledge_chunks_lc_v1"
     chunk_size: int = 800
     chunk_overlap: int = 120
+    # "chars", or "tokens" to measure chunk_size/chunk_overlap with the embedding model's tokenizer.
+    chunk_unit: str = "chars"
+    upsert_batch_size: int = 256
     retrieval_top_k: int = 6
     min_similarity: float = 0.25
+    hybrid_retrieval_enabled: bool = True
+    # Share of the reciprocal-rank-fusion weight given to BM25; the dense retriever gets the rest.
+    hybrid_lexical_weight: float = 0.5
+    hybrid_rrf_k: int = 60
+    hybrid_candidate_multiplier: int = 3
+    retrieval_cache_enabled: bool = True
+    query_embedding_cache_size: int = 4096
+    retrieval_cache_size: int = 2048
+    retrieval_cache_ttl_seconds: float = 300.0
     embedding_backend: str = "sentence_transformers"
     embedding_model_name: str = "sentence-transformers/all-MiniLM-L6-v2"
     embedding_device: str = "cpu"
     embedding_hash_size: int = 384
+    embedding_hash_workers: int = 0
+    embedding_hash_parallel_threshold: int = 2048
+    embedding_cache_enabled: bool = True
+    embedding_cache_path: str | None = None
+    manifest_path: str | None = None
+    ingest_concurrency: int = 16
+    ingest_per_host_rate: float = 8.0
+    ingest_pdf_workers: int = 2
+    ingest_job_workers: int = 2
+    ingest_job_queue_size: int = 64
+    ingest_job_history: int = 500
+    ingest_job_ttl_seconds: float = 3600.0
     notion_token: str | None = None
     notion_version: str = "2022-06-28"
     notion_timeout_seconds: float = 20.0
+    notion_api_url: str = "https://api.notion.com/v1"
+    notion_page_size: int = 100
+    notion_max_concurrency: int = 4
+    notion_max_retries: int = 5
+    notion_backoff_seconds: float = 0.5
 
     model_config = SettingsConfigDict(env_prefix="KQ_", extra="ignore")
 
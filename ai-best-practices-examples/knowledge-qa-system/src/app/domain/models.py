@@ -26,3 +26,8 @@ class Citation(BaseModel):
     source_uri: str
     snippet: str
     score: float
+
+
+class UpsertStats(BaseModel):
+    embedding_cache_hits: int = 0
+    embedding_cache_misses: int = 0
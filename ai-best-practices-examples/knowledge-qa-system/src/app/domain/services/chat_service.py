@@ -1,40 +1,86 @@
-from collections.abc import Iterator
+import asyncio
+import re
+from collections.abc import AsyncIterator, Iterator
+from typing import Any
 
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.runnables import RunnableLambda
+from langchain_core.runnables import Runnable, RunnableGenerator, RunnableLambda
 
 from app.domain.services.retrieval_service import RetrievalService
 from app.schemas.chat import ChatResponse
 
+INSUFFICIENT_CONTEXT_ANSWER = "I do not have enough grounded context to answer confidently yet."
+# Whitespace-preserving pieces, so streamed tokens concatenate back to the exact answer.
+TOKEN_PIECE_RE = re.compile(r"\S+\s*|\s+")
+
+
+def _split_tokens(chunks: Iterator[str]) -> Iterator[str]:
+    for chunk in chunks:
+        yield from TOKEN_PIECE_RE.findall(chunk)
+
+
+async def _asplit_tokens(chunks: AsyncIterator[str]) -> AsyncIterator[str]:
+    async for chunk in chunks:
+        for piece in TOKEN_PIECE_RE.findall(chunk):
+            yield piece
+
+
+async def _single(text: str) -> AsyncIterator[str]:
+    yield text
+
 
 class ChatService:
     def __init__(self, retrieval_service: RetrievalService | None = None) -> None:
         self.retrieval_service = retrieval_service or RetrievalService()
+        self._synthesis = self._build_synthesis_chain()
+
+    @staticmethod
+    def _build_synthesis_chain() -> Runnable:
+        prompt = ChatPromptTemplate.from_template(
+            "Question: {question}\n\nContext:\n{context}\n\n"
+            "Answer using only the context in 2-4 concise sentences."
+        )
+        return (
+            prompt
+            | RunnableLambda(
+                lambda prompt_value: prompt_value.to_messages()[0].content  # grounded synthesis fallback
+            )
+            | RunnableLambda(lambda text: text.split("Context:\n", 1)[-1].strip())
+            | RunnableLambda(lambda text: text.split("\n\nAnswer using only the context", 1)[0].strip())
+            | RunnableLambda(lambda text: text[:420] if len(text) > 420 else text)
+            | StrOutputParser()
+            # Emits token pieces as soon as upstream produces them (all at once for the fallback above,
+            # incrementally once an LLM step streams).
+            | RunnableGenerator(_split_tokens, _asplit_tokens)
+        )
 
     def answer(self, message: str, top_k: int | None = None) -> ChatResponse:
         citations, snippets, partial_context = self.retrieval_service.retrieve(message, top_k=top_k)
         if partial_context:
-            answer = "I do not have enough grounded context to answer confidently yet."
+            answer = INSUFFICIENT_CONTEXT_ANSWER
         else:
-            context = "\n\n".join(snippets[:4])
-            prompt = ChatPromptTemplate.from_template(
-                "Question: {question}\n\nContext:\n{context}\n\n"
-                "Answer using only the context in 2-4 concise sentences."
-            )
-            chain = (
-                prompt
-                | RunnableLambda(
-                    lambda prompt_value: prompt_value.to_messages()[0].content  # grounded synthesis fallback
-                )
-                | RunnableLambda(lambda text: text.split("Context:\n", 1)[-1].strip())
-                | RunnableLambda(lambda text: text.split("\n\nAnswer using only the context", 1)[0].strip())
-                | RunnableLambda(lambda text: text[:420] if len(text) > 420 else text)
-                | StrOutputParser()
-            )
-            answer = chain.invoke({"question": message, "context": context})
+            answer = self._synthesis.invoke({"question": message, "context": "\n\n".join(snippets[:4])})
         return ChatResponse(answer=answer, citations=citations, partial_context=partial_context)
 
-    def stream_answer(self, text: str) -> Iterator[str]:
-        for token in text.split():
-            yield f"{token} "
+    async def astream(self, message: str, top_k: int | None = None) -> AsyncIterator[tuple[str, dict[str, Any]]]:
+        """Yield ``(event, payload)`` pairs: retrieval_started, one citation each, tokens, then final."""
+        yield "retrieval_started", {}
+        # Retrieval hits Chroma synchronously; keep it off the event loop.
+        citations, snippets, partial_context = await asyncio.to_thread(
+            self.retrieval_service.retrieve, message, top_k
+        )
+        for citation in citations:
+            yield "citation", citation.model_dump()
+
+        pieces: list[str] = []
+        if partial_context:
+            tokens: AsyncIterator[str] = _asplit_tokens(_single(INSUFFICIENT_CONTEXT_ANSWER))
+        else:
+            tokens = self._synthesis.astream({"question": message, "context": "\n\n".join(snippets[:4])})
+        async for piece in tokens:
+            pieces.append(piece)
+            yield "token", {"token": piece}
+
+        response = ChatResponse(answer="".join(pieces), citations=citations, partial_context=partial_context)
+        yield "final", response.model_dump()
@@ -0,0 +1,116 @@
+import asyncio
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from app.domain.models import DocumentRecord
+from app.domain.services.ingestion_service import IngestionService
+from app.schemas.ingest import IngestRequest, IngestResponse
+
+FINISHED_STATUSES = frozenset({"completed", "failed"})
+
+
+class IngestQueueFullError(RuntimeError):
+    pass
+
+
+class IngestJobQueue:
+    """Bounded background queue for ingest jobs with live, evictable status records.
+
+    Jobs run on ``workers`` daemon threads, each driving ``IngestionService.aingest`` on its own
+    event loop. Finished records are kept for ``ttl_seconds`` and at most ``history`` of them
+    are retained, least recently read first out.
+    """
+
+    def __init__(
+        self,
+        service: IngestionService,
+        workers: int,
+        max_pending: int,
+        history: int,
+        ttl_seconds: float,
+    ) -> None:
+        self.service = service
+        self.workers = max(1, workers)
+        self.history = history
+        self.ttl_seconds = ttl_seconds
+        self._pending: queue.Queue[tuple[str, IngestRequest]] = queue.Queue(maxsize=max_pending)
+        self._lock = threading.Lock()
+        self._active: dict[str, IngestResponse] = {}
+        self._finished: OrderedDict[str, tuple[float, IngestResponse]] = OrderedDict()
+        self._threads: list[threading.Thread] = []
+
+    def submit(self, request: IngestRequest) -> IngestResponse:
+        self._ensure_workers()
+        job_id = str(uuid.uuid4())
+        record = IngestResponse(job_id=job_id, status="queued", sources_total=len(request.sources))
+        with self._lock:
+            self._active[job_id] = record
+        try:
+            self._pending.put_nowait((job_id, request))
+        except queue.Full:
+            with self._lock:
+                del self._active[job_id]
+            raise IngestQueueFullError("ingest queue is full, retry later") from None
+        return record.model_copy(deep=True)
+
+    def get(self, job_id: str) -> IngestResponse | None:
+        with self._lock:
+            self._evict_expired()
+            if job_id in self._active:
+                return self._active[job_id].model_copy(deep=True)
+            if job_id in self._finished:
+                self._finished.move_to_end(job_id)
+                return self._finished[job_id][1].model_copy(deep=True)
+        return None
+
+    def _ensure_workers(self) -> None:
+        with self._lock:
+            if self._threads:
+                return
+            for index in range(self.workers):
+                thread = threading.Thread(target=self._worker, name=f"ingest-worker-{index}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _worker(self) -> None:
+        loop = asyncio.new_event_loop()
+        while True:
+            job_id, request = self._pending.get()
+            try:
+                result = loop.run_until_complete(self._run(job_id, request))
+            except Exception as exc:  # noqa: BLE001
+                with self._lock:
+                    result = self._active[job_id].model_copy(update={"status": "failed"})
+                    result.failures.append(f"ingest job failed: {exc}")
+            with self._lock:
+                self._active.pop(job_id, None)
+                self._finished[job_id] = (time.monotonic(), result)
+                self._evict_expired()
+                while len(self._finished) > self.history:
+                    self._finished.popitem(last=False)
+            self._pending.task_done()
+
+    async def _run(self, job_id: str, request: IngestRequest) -> IngestResponse:
+        with self._lock:
+            self._active[job_id].status = "loading"
+
+        def on_loaded(index: int, result: DocumentRecord | Exception) -> None:
+            source = request.sources[index]
+            with self._lock:
+                record = self._active[job_id]
+                record.sources_processed += 1
+                if isinstance(result, Exception):
+                    record.failures.append(f"{source.source_type}:{source.source_uri}: {result}")
+                if record.sources_processed == record.sources_total:
+                    record.status = "writing"
+
+        return await self.service.aingest(request, job_id=job_id, on_loaded=on_loaded)
+
+    def _evict_expired(self) -> None:
+        cutoff = time.monotonic() - self.ttl_seconds
+        expired = [job_id for job_id, (finished_at, _) in self._finished.items() if finished_at < cutoff]
+        for job_id in expired:
+            del self._finished[job_id]
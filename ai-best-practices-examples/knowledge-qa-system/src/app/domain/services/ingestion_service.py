@@ -1,54 +1,135 @@
+import asyncio
 import uuid
+from collections.abc import Callable, Iterator
+from pathlib import Path
 
 from app.core.config import settings
-from app.domain.models import ChunkRecord, DocumentRecord
-from app.ingestion.adapters.notion_adapter import load_notion_document
-from app.ingestion.adapters.pdf_adapter import load_pdf_document
-from app.ingestion.adapters.web_adapter import load_web_document
-from app.ingestion.chunking import chunk_text
+from app.domain.models import ChunkRecord, DocumentRecord, UpsertStats
+from app.ingestion.async_loader import AsyncSourceLoader
+from app.ingestion.chunking import build_length_function, iter_chunks, iter_paragraphs
+from app.ingestion.manifest import IngestManifest, ManifestEntry
 from app.schemas.ingest import IngestRequest, IngestResponse
+from app.retrieval.embedding_cache import content_digest
 from app.retrieval.vector_store import ChromaVectorStore
 
 
 class IngestionService:
-    def __init__(self, vector_store: ChromaVectorStore | None = None) -> None:
+    def __init__(
+        self,
+        vector_store: ChromaVectorStore | None = None,
+        manifest: IngestManifest | None = None,
+        loader: AsyncSourceLoader | None = None,
+    ) -> None:
         self.vector_store = vector_store or ChromaVectorStore()
+        self.manifest = manifest or IngestManifest(
+            settings.manifest_path or str(Path(settings.chroma_path) / "ingest_manifest.sqlite3"),
+            settings.collection_name,
+        )
+        self.loader = loader or AsyncSourceLoader(
+            concurrency=settings.ingest_concurrency,
+            per_host_rate=settings.ingest_per_host_rate,
+            pdf_workers=settings.ingest_pdf_workers,
+        )
+        self._chunk_length = build_length_function()
 
     def ingest(self, request: IngestRequest) -> IngestResponse:
-        job_id = str(uuid.uuid4())
+        return asyncio.run(self.aingest(request))
+
+    async def aingest(
+        self,
+        request: IngestRequest,
+        job_id: str | None = None,
+        on_loaded: Callable[[int, DocumentRecord | Exception], None] | None = None,
+    ) -> IngestResponse:
+        loaded = await self.loader.load_all(request.sources, on_loaded=on_loaded)
+        # Chunking and the Chroma write are blocking; keep them off the event loop.
+        return await asyncio.to_thread(self._write, job_id or str(uuid.uuid4()), request, loaded)
+
+    def _write(self, job_id: str, request: IngestRequest, loaded: list[DocumentRecord | Exception]) -> IngestResponse:
+        incremental = request.mode == "incremental"
         failures: list[str] = []
-        all_chunks: list[ChunkRecord] = []
+        batch = _UpsertBatch(self.vector_store, settings.upsert_batch_size)
+        stale_chunk_ids: list[str] = []
+        entries: list[ManifestEntry] = []
         documents_ingested = 0
+        documents_skipped = 0
 
-        for source in request.sources:
-            try:
-                document = self._load(source.source_type, source.source_uri, source.title)
-                documents_ingested += 1
-                all_chunks.extend(self._chunk_document(document))
-            except Exception as exc:  # noqa: BLE001
-                failures.append(f"{source.source_type}:{source.source_uri}: {exc}")
+        for source, document in zip(request.sources, loaded, strict=True):
+            if isinstance(document, Exception):
+                failures.append(f"{source.source_type}:{source.source_uri}: {document}")
+                continue
+            entry = self._write_document(document, incremental, batch, stale_chunk_ids)
+            if entry is None:
+                documents_skipped += 1
+                continue
+            documents_ingested += 1
+            entries.append(entry)
 
-        self.vector_store.upsert_chunks(all_chunks)
+        batch.flush()
+        self.vector_store.delete_chunks(stale_chunk_ids)
+        self.manifest.put_many(entries)
         return IngestResponse(
             job_id=job_id,
+            status="completed",
+            sources_total=len(request.sources),
+            sources_processed=len(request.sources),
             documents_ingested=documents_ingested,
-            chunks_written=len(all_chunks),
+            documents_skipped=documents_skipped,
+            chunks_written=batch.written,
+            chunks_deleted=len(stale_chunk_ids),
+            embedding_cache_hits=batch.stats.embedding_cache_hits,
+            embedding_cache_misses=batch.stats.embedding_cache_misses,
             failures=failures,
         )
 
-    def _load(self, source_type: str, source_uri: str, title: str | None) -> DocumentRecord:
-        if source_type == "pdf":
-            return load_pdf_document(source_uri, title)
-        if source_type == "notion":
-            return load_notion_document(source_uri, title)
-        if source_type == "web":
-            return load_web_document(source_uri, title)
-        raise ValueError(f"Unsupported source_type: {source_type}")
-
-    def _chunk_document(self, document: DocumentRecord) -> list[ChunkRecord]:
-        pieces = chunk_text(document.text, settings.chunk_size, settings.chunk_overlap)
-        return [
-            ChunkRecord(
+    def _write_document(
+        self,
+        document: DocumentRecord,
+        incremental: bool,
+        batch: "_UpsertBatch",
+        stale_chunk_ids: list[str],
+    ) -> ManifestEntry | None:
+        """Stream the document's changed chunks into ``batch`` and collect chunk ids that no longer exist.
+
+        Returns None when ``incremental`` is set and the document is unchanged.
+        """
+        fingerprint = content_digest(
+            f"{settings.chunk_unit}:{settings.chunk_size}:{settings.chunk_overlap}\x00"
+            f"{document.title}\x00{document.source_uri}\x00{document.text}"
+        )
+        previous = self.manifest.get(document.document_id)
+        if incremental and previous is not None and previous.fingerprint == fingerprint:
+            return None
+
+        old = previous.chunk_digests if incremental and previous is not None else None
+        digests: list[str] = []
+        for chunk in self._iter_chunk_records(document):
+            digest = content_digest(f"{chunk.source_uri}\x00{chunk.title}\x00{chunk.text}")
+            digests.append(digest)
+            if old is None or chunk.chunk_index >= len(old) or old[chunk.chunk_index] != digest:
+                batch.add(chunk)
+
+        if previous is None:
+            # Nothing recorded yet (first ingest, or data written before the manifest existed):
+            # ask the store which chunk ids it already holds for this document.
+            current_ids = {f"{document.document_id}::{index}" for index in range(len(digests))}
+            existing = self.vector_store.chunk_ids_for_document(document.document_id)
+            stale_chunk_ids.extend(sorted(chunk_id for chunk_id in existing if chunk_id not in current_ids))
+        else:
+            stale_chunk_ids.extend(
+                f"{document.document_id}::{index}" for index in range(len(digests), previous.chunk_count)
+            )
+        return ManifestEntry(document_id=document.document_id, fingerprint=fingerprint, chunk_digests=digests)
+
+    def _iter_chunk_records(self, document: DocumentRecord) -> Iterator[ChunkRecord]:
+        pieces = iter_chunks(
+            iter_paragraphs(document.text),
+            settings.chunk_size,
+            settings.chunk_overlap,
+            length=self._chunk_length,
+        )
+        for index, piece in enumerate(pieces):
+            yield ChunkRecord(
                 chunk_id=f"{document.document_id}::{index}",
                 document_id=document.document_id,
                 chunk_index=index,
@@ -57,5 +138,28 @@ class IngestionService:
                 source_uri=document.source_uri,
                 title=document.title,
             )
-            for index, piece in enumerate(pieces)
-        ]
+
+
+class _UpsertBatch:
+    """Buffers chunks and upserts them ``size`` at a time so memory is bounded by the batch, not the corpus."""
+
+    def __init__(self, vector_store: ChromaVectorStore, size: int) -> None:
+        self.vector_store = vector_store
+        self.size = max(1, size)
+        self.pending: list[ChunkRecord] = []
+        self.written = 0
+        self.stats = UpsertStats()
+
+    def add(self, chunk: ChunkRecord) -> None:
+        self.pending.append(chunk)
+        if len(self.pending) >= self.size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self.pending:
+            return
+        stats = self.vector_store.upsert_chunks(self.pending)
+        self.stats.embedding_cache_hits += stats.embedding_cache_hits
+        self.stats.embedding_cache_misses += stats.embedding_cache_misses
+        self.written += len(self.pending)
+        self.pending = []
@@ -1,14 +1,36 @@
+import hashlib
+
+import numpy as np
+
 from app.core.config import settings
 from app.domain.models import Citation
+from app.retrieval.query_cache import LRUCache
 from app.retrieval.vector_store import ChromaVectorStore
 
 
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
 class RetrievalService:
     def __init__(self, vector_store: ChromaVectorStore | None = None) -> None:
         self.vector_store = vector_store or ChromaVectorStore()
+        self.cache_enabled = settings.retrieval_cache_enabled
+        # Level 1: query as typed -> query embedding. Keyed by the raw text because cased
+        # embedding models embed "Chroma" and "chroma" differently.
+        self.embedding_cache: LRUCache[list[float]] = LRUCache(settings.query_embedding_cache_size)
+        # Level 2: (embedding digest, normalized query, top_k, collection version) ->
+        # (citations, snippets). The normalized query is part of the key because hybrid retrieval
+        # also matches it lexically; queries that embed alike and differ only in case or spacing
+        # share an entry.
+        # The version is shared by every process using the collection; the TTL bounds staleness
+        # for writers that bypass ChromaVectorStore.
+        self.result_cache: LRUCache[tuple[list[Citation], list[str]]] = LRUCache(
+            settings.retrieval_cache_size, ttl_seconds=settings.retrieval_cache_ttl_seconds
+        )
 
     def retrieve(self, query: str, top_k: int | None = None) -> tuple[list[Citation], list[str], bool]:
-        citations, snippets = self.vector_store.retrieve(query, top_k or settings.retrieval_top_k)
+        citations, snippets = self._search(query, top_k or settings.retrieval_top_k)
         if not citations:
             return [], [], True
         filtered = [item for item in citations if item.score >= settings.min_similarity]
@@ -17,3 +39,30 @@ class RetrievalService:
         filtered_ids = {item.chunk_id for item in filtered}
         filtered_snippets = [snippet for item, snippet in zip(citations, snippets, strict=False) if item.chunk_id in filtered_ids]
         return filtered, filtered_snippets, False
+
+    def cache_metrics(self) -> dict[str, object]:
+        return {
+            "enabled": self.cache_enabled,
+            "collection_version": self.vector_store.version,
+            "query_embeddings": self.embedding_cache.metrics(),
+            "results": self.result_cache.metrics(),
+        }
+
+    def _search(self, query: str, top_k: int) -> tuple[list[Citation], list[str]]:
+        if not self.cache_enabled:
+            return self.vector_store.retrieve(query, top_k)
+
+        embedding = self.embedding_cache.get(query)
+        if embedding is None:
+            embedding = self.vector_store.embed_query(query)
+            self.embedding_cache.put(query, embedding)
+        normalized = normalize_query(query)
+
+        digest = hashlib.blake2b(np.asarray(embedding, dtype=np.float32).tobytes(), digest_size=16).digest()
+        key = (digest, normalized, top_k, self.vector_store.version)
+        cached = self.result_cache.get(key)
+        if cached is not None:
+            return list(cached[0]), list(cached[1])
+        citations, snippets = self.vector_store.search(normalized, embedding, top_k)
+        self.result_cache.put(key, (citations, snippets))
+        return list(citations), list(snippets)
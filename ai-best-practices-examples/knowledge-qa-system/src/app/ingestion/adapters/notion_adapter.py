@@ -1,4 +1,8 @@
+import asyncio
 import re
+import threading
+from collections import OrderedDict
+from typing import Any
 
 import httpx
 
@@ -7,6 +11,14 @@ from app.domain.models import DocumentRecord
 
 
 NOTION_PAGE_ID_RE = re.compile(r"([0-9a-fA-F]{32})")
+# Child pages and databases are separate documents; do not inline them into the parent.
+NOTION_NON_RECURSIVE_TYPES = frozenset({"child_page", "child_database"})
+NOTION_PAGE_CACHE_SIZE = 256
+
+# page_id -> (last_edited_time, extracted body); lets unchanged pages skip the block download.
+# Ingest workers each run their own event loop in a thread, so access goes through the lock.
+_PAGE_BODY_CACHE: OrderedDict[str, tuple[str, str]] = OrderedDict()
+_PAGE_BODY_LOCK = threading.Lock()
 
 
 def _extract_page_id(source_uri: str) -> str:
@@ -19,44 +31,137 @@ def _extract_page_id(source_uri: str) -> str:
     return match.group(1)
 
 
-def load_notion_document(source_uri: str, title: str | None = None) -> DocumentRecord:
+def _notion_headers() -> dict[str, str]:
     if not settings.notion_token:
         raise ValueError("KQ_NOTION_TOKEN is required for Notion ingestion")
-
-    page_id = _extract_page_id(source_uri)
-    headers = {
+    return {
         "Authorization": f"Bearer {settings.notion_token}",
         "Notion-Version": settings.notion_version,
     }
-    with httpx.Client(timeout=settings.notion_timeout_seconds) as client:
-        page_resp = client.get(f"https://api.notion.com/v1/pages/{page_id}", headers=headers)
-        page_resp.raise_for_status()
-        blocks_resp = client.get(
-            f"https://api.notion.com/v1/blocks/{page_id}/children?page_size=100",
-            headers=headers,
-        )
-        blocks_resp.raise_for_status()
-
-    page = page_resp.json()
-    blocks = blocks_resp.json().get("results", [])
-    block_texts: list[str] = []
-    for block in blocks:
-        block_type = block.get("type")
-        typed = block.get(block_type, {}) if block_type else {}
-        rich = typed.get("rich_text", [])
-        if not rich:
-            continue
-        plain = "".join(str(part.get("plain_text", "")) for part in rich).strip()
+
+
+def load_notion_document(source_uri: str, title: str | None = None) -> DocumentRecord:
+    async def run() -> DocumentRecord:
+        async with httpx.AsyncClient() as client:
+            return await aload_notion_document(source_uri, title, client)
+
+    return asyncio.run(run())
+
+
+async def aload_notion_document(source_uri: str, title: str | None, client: httpx.AsyncClient) -> DocumentRecord:
+    headers = _notion_headers()
+    page_id = _extract_page_id(source_uri)
+    page = await _notion_get(client, f"{settings.notion_api_url}/pages/{page_id}", headers)
+
+    last_edited = str(page.get("last_edited_time", ""))
+    body = _cached_page_body(page_id, last_edited)
+    if body is None:
+        semaphore = asyncio.Semaphore(max(1, settings.notion_max_concurrency))
+        body = "\n".join(await _fetch_block_texts(client, headers, page_id, semaphore)).strip()
+        if last_edited:
+            _store_page_body(page_id, last_edited, body)
+    return _build_notion_document(source_uri, title, page_id, page, body)
+
+
+def _cached_page_body(page_id: str, last_edited: str) -> str | None:
+    if not last_edited:
+        return None
+    with _PAGE_BODY_LOCK:
+        cached = _PAGE_BODY_CACHE.get(page_id)
+        if cached is None or cached[0] != last_edited:
+            return None
+        _PAGE_BODY_CACHE.move_to_end(page_id)
+        return cached[1]
+
+
+def _store_page_body(page_id: str, last_edited: str, body: str) -> None:
+    with _PAGE_BODY_LOCK:
+        _PAGE_BODY_CACHE[page_id] = (last_edited, body)
+        _PAGE_BODY_CACHE.move_to_end(page_id)
+        while len(_PAGE_BODY_CACHE) > NOTION_PAGE_CACHE_SIZE:
+            _PAGE_BODY_CACHE.popitem(last=False)
+
+
+async def _notion_get(client: httpx.AsyncClient, url: str, headers: dict[str, str]) -> dict[str, Any]:
+    """GET a Notion API url, backing off on 429 (honouring Retry-After) up to ``notion_max_retries`` times."""
+    attempt = 0
+    while True:
+        response = await client.get(url, headers=headers, timeout=settings.notion_timeout_seconds)
+        if response.status_code != 429 or attempt >= settings.notion_max_retries:
+            response.raise_for_status()
+            return response.json()
+        retry_after = response.headers.get("Retry-After")
+        try:
+            delay = float(retry_after) if retry_after is not None else None
+        except ValueError:
+            delay = None
+        await asyncio.sleep(delay if delay is not None else settings.notion_backoff_seconds * 2**attempt)
+        attempt += 1
+
+
+async def _fetch_children(
+    client: httpx.AsyncClient, headers: dict[str, str], block_id: str, semaphore: asyncio.Semaphore
+) -> list[dict[str, Any]]:
+    blocks: list[dict[str, Any]] = []
+    cursor: str | None = None
+    while True:
+        url = f"{settings.notion_api_url}/blocks/{block_id}/children?page_size={settings.notion_page_size}"
+        if cursor:
+            url += f"&start_cursor={cursor}"
+        async with semaphore:
+            payload = await _notion_get(client, url, headers)
+        blocks.extend(payload.get("results", []))
+        cursor = payload.get("next_cursor")
+        if not payload.get("has_more") or not cursor:
+            return blocks
+
+
+async def _fetch_block_texts(
+    client: httpx.AsyncClient, headers: dict[str, str], block_id: str, semaphore: asyncio.Semaphore
+) -> list[str]:
+    """Return the plain text of ``block_id``'s descendants in document order; siblings' children load in parallel."""
+    blocks = await _fetch_children(client, headers, block_id, semaphore)
+    nested = [
+        block.get("id")
+        if block.get("has_children") and block.get("id") and block.get("type") not in NOTION_NON_RECURSIVE_TYPES
+        else None
+        for block in blocks
+    ]
+    children = await asyncio.gather(
+        *(_fetch_block_texts(client, headers, child_id, semaphore) for child_id in nested if child_id)
+    )
+    child_texts = iter(children)
+
+    texts: list[str] = []
+    for block, child_id in zip(blocks, nested, strict=True):
+        plain = _block_plain_text(block)
         if plain:
-            block_texts.append(plain)
+            texts.append(plain)
+        if child_id:
+            texts.extend(next(child_texts))
+    return texts
+
+
+def _block_plain_text(block: dict[str, Any]) -> str:
+    block_type = block.get("type")
+    typed = block.get(block_type, {}) if block_type else {}
+    rich = typed.get("rich_text", [])
+    return "".join(str(part.get("plain_text", "")) for part in rich).strip()
+
 
+def _build_notion_document(
+    source_uri: str,
+    title: str | None,
+    page_id: str,
+    page: dict[str, Any],
+    body: str,
+) -> DocumentRecord:
     resolved_title = title
     if not resolved_title:
         title_prop = page.get("properties", {}).get("title", {})
         title_items = title_prop.get("title", [])
         resolved_title = "".join(str(item.get("plain_text", "")) for item in title_items).strip() or "Notion Page"
 
-    body = "\n".join(block_texts).strip()
     if not body:
         raise ValueError("No text blocks found in Notion page")
 
@@ -66,4 +171,5 @@ def load_notion_document(source_uri: str, title: str | None = None) -> DocumentR
         source_uri=source_uri,
         title=resolved_title,
         text=body,
+        metadata={"last_edited_time": str(page.get("last_edited_time", ""))},
     )
@@ -1,3 +1,4 @@
+from collections.abc import Iterator
 from pathlib import Path
 
 from pypdf import PdfReader
@@ -5,14 +6,19 @@ from pypdf import PdfReader
 from app.domain.models import DocumentRecord
 
 
+def iter_pdf_pages(source_uri: str) -> Iterator[str]:
+    """Yield the extracted text of each non-empty page without holding the whole document."""
+    reader = PdfReader(source_uri)
+    for page in reader.pages:
+        text = (page.extract_text() or "").strip()
+        if text:
+            yield text
+
+
 def load_pdf_document(source_uri: str, title: str | None = None) -> DocumentRecord:
     path = Path(source_uri)
     if path.suffix.lower() == ".pdf":
-        reader = PdfReader(str(path))
-        pages: list[str] = []
-        for page in reader.pages:
-            pages.append((page.extract_text() or "").strip())
-        text = "\n".join(part for part in pages if part).strip()
+        text = "\n".join(iter_pdf_pages(str(path))).strip()
         if not text:
             raise ValueError(f"No extractable text found in PDF: {source_uri}")
     else:
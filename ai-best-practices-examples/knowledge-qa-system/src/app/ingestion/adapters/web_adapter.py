@@ -3,12 +3,24 @@ from bs4 import BeautifulSoup
 
 from app.domain.models import DocumentRecord
 
+WEB_TIMEOUT_SECONDS = 15.0
+
 
 def load_web_document(source_uri: str, title: str | None = None) -> DocumentRecord:
-    with httpx.Client(timeout=15.0, follow_redirects=True) as client:
+    with httpx.Client(timeout=WEB_TIMEOUT_SECONDS, follow_redirects=True) as client:
         response = client.get(source_uri)
         response.raise_for_status()
-    soup = BeautifulSoup(response.text, "html.parser")
+    return _build_web_document(source_uri, title, response.text)
+
+
+async def aload_web_document(source_uri: str, title: str | None, client: httpx.AsyncClient) -> DocumentRecord:
+    response = await client.get(source_uri, timeout=WEB_TIMEOUT_SECONDS, follow_redirects=True)
+    response.raise_for_status()
+    return _build_web_document(source_uri, title, response.text)
+
+
+def _build_web_document(source_uri: str, title: str | None, html: str) -> DocumentRecord:
+    soup = BeautifulSoup(html, "html.parser")
     text = " ".join(soup.stripped_strings)
     return DocumentRecord(
         document_id=f"web::{source_uri}",
@@ -0,0 +1,102 @@
+import asyncio
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+
+import httpx
+
+from app.domain.models import DocumentRecord
+from app.ingestion.adapters.notion_adapter import aload_notion_document
+from app.ingestion.adapters.pdf_adapter import load_pdf_document
+from app.ingestion.adapters.web_adapter import aload_web_document
+from app.schemas.ingest import SourceInput
+
+
+class HostRateLimiter:
+    """Spaces requests to the same host at least ``1 / rate_per_second`` seconds apart."""
+
+    def __init__(self, rate_per_second: float) -> None:
+        self._interval = 1.0 / rate_per_second if rate_per_second > 0 else 0.0
+        self._next_slot: dict[str, float] = {}
+
+    async def wait(self, host: str) -> None:
+        if not self._interval:
+            return
+        now = asyncio.get_running_loop().time()
+        slot = max(now, self._next_slot.get(host, now))
+        self._next_slot[host] = slot + self._interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    async def on_request(self, request: httpx.Request) -> None:
+        await self.wait(request.url.host)
+
+
+class AsyncSourceLoader:
+    """Loads ingest sources concurrently over one pooled ``httpx.AsyncClient``.
+
+    PDF text extraction is CPU-bound, so it runs in a process pool when ``pdf_workers`` > 0.
+    """
+
+    def __init__(
+        self,
+        concurrency: int,
+        per_host_rate: float,
+        pdf_workers: int,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        self.concurrency = max(1, concurrency)
+        self.per_host_rate = per_host_rate
+        self.pdf_workers = pdf_workers
+        self.transport = transport
+        self._pdf_pool: ProcessPoolExecutor | None = None
+
+    async def load_all(
+        self,
+        sources: list[SourceInput],
+        on_loaded: Callable[[int, DocumentRecord | Exception], None] | None = None,
+    ) -> list[DocumentRecord | Exception]:
+        """Return one document or exception per source, in request order.
+
+        ``on_loaded`` is called with the source index as soon as each source finishes.
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        limiter = HostRateLimiter(self.per_host_rate)
+        limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+        async with httpx.AsyncClient(
+            limits=limits, transport=self.transport, event_hooks={"request": [limiter.on_request]}
+        ) as client:
+
+            async def load_one(index: int, source: SourceInput) -> DocumentRecord | Exception:
+                async with semaphore:
+                    try:
+                        result: DocumentRecord | Exception = await self._load(source, client)
+                    except Exception as exc:  # noqa: BLE001
+                        result = exc
+                if on_loaded is not None:
+                    on_loaded(index, result)
+                return result
+
+            return list(await asyncio.gather(*(load_one(index, source) for index, source in enumerate(sources))))
+
+    async def _load(self, source: SourceInput, client: httpx.AsyncClient) -> DocumentRecord:
+        if source.source_type == "pdf":
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._pdf_executor(), load_pdf_document, source.source_uri, source.title)
+        if source.source_type == "notion":
+            return await aload_notion_document(source.source_uri, source.title, client)
+        if source.source_type == "web":
+            return await aload_web_document(source.source_uri, source.title, client)
+        raise ValueError(f"Unsupported source_type: {source.source_type}")
+
+    def _pdf_executor(self) -> ProcessPoolExecutor | None:
+        # None means the event loop's default thread pool.
+        if self.pdf_workers <= 0:
+            return None
+        if self._pdf_pool is None:
+            self._pdf_pool = ProcessPoolExecutor(max_workers=self.pdf_workers)
+        return self._pdf_pool
+
+    def close(self) -> None:
+        if self._pdf_pool is not None:
+            self._pdf_pool.shutdown(cancel_futures=True)
+            self._pdf_pool = None
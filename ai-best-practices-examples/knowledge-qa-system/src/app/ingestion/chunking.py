@@ -1,8 +1,14 @@
+import re
+from collections.abc import Callable, Iterable, Iterator
+
+from app.core.config import settings
+
+SENTENCE_BOUNDARY_RE = re.compile(r"(?<=[.!?])\s+")
+PARAGRAPH_RE = re.compile(r"[^\n]+")
+
+
 def chunk_text(text: str, chunk_size: int, overlap: int) -> list[str]:
-    if chunk_size <= 0:
-        raise ValueError("chunk_size must be positive")
-    if overlap < 0 or overlap >= chunk_size:
-        raise ValueError("overlap must be >= 0 and < chunk_size")
+    _validate(chunk_size, overlap)
     if not text.strip():
         return []
 
@@ -16,3 +22,103 @@ def chunk_text(text: str, chunk_size: int, overlap: int) -> list[str]:
             chunks.append(piece)
         start += step
     return chunks
+
+
+def _validate(chunk_size: int, overlap: int) -> None:
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+    if overlap < 0 or overlap >= chunk_size:
+        raise ValueError("overlap must be >= 0 and < chunk_size")
+
+
+def iter_paragraphs(text: str) -> Iterator[str]:
+    for match in PARAGRAPH_RE.finditer(text):
+        paragraph = match.group(0).strip()
+        if paragraph:
+            yield paragraph
+
+
+def build_length_function() -> Callable[[str], int]:
+    """Measure chunk sizes in characters, or in embedding-model tokens when ``chunk_unit`` is "tokens"."""
+    if settings.chunk_unit != "tokens":
+        return len
+    if settings.embedding_backend == "hash":
+        # HashEmbeddings tokenizes on whitespace.
+        return lambda text: len(text.split())
+    from transformers import AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(settings.embedding_model_name)
+    return lambda text: len(tokenizer.encode(text, add_special_tokens=False))
+
+
+def _split_oversized(text: str, chunk_size: int, length: Callable[[str], int]) -> Iterator[str]:
+    words: list[str] = []
+    for word in text.split():
+        if length is len and len(word) > chunk_size:
+            if words:
+                yield " ".join(words)
+                words = []
+            for start in range(0, len(word), chunk_size):
+                yield word[start : start + chunk_size]
+            continue
+        if words and length(" ".join([*words, word])) > chunk_size:
+            yield " ".join(words)
+            words = []
+        words.append(word)
+    if words:
+        yield " ".join(words)
+
+
+def iter_chunks(
+    segments: Iterable[str],
+    chunk_size: int,
+    overlap: int,
+    length: Callable[[str], int] = len,
+) -> Iterator[str]:
+    """Lazily pack sentences from ``segments`` (pages or paragraphs) into chunks of at most ``chunk_size``.
+
+    Chunks break on sentence boundaries; a sentence longer than ``chunk_size`` is split on words.
+    Each chunk repeats trailing sentences of the previous one up to ``overlap``. Only the current
+    window of sentences is held in memory.
+    """
+    _validate(chunk_size, overlap)
+    separator_cost = {" ": length(" "), "\n": length("\n")}
+    # (separator before the unit, unit text, unit size)
+    window: list[tuple[str, str, int]] = []
+    total = 0
+    fresh = False
+
+    def render() -> str:
+        return "".join((sep if index else "") + text for index, (sep, text, _) in enumerate(window)).strip()
+
+    def measure(units: list[tuple[str, str, int]]) -> int:
+        return sum(size for _, _, size in units) + sum(separator_cost[sep] for sep, _, _ in units[1:])
+
+    for segment in segments:
+        separator = "\n"
+        for sentence in SENTENCE_BOUNDARY_RE.split(segment.strip()):
+            if not sentence:
+                continue
+            size = length(sentence)
+            units = [sentence] if size <= chunk_size else list(_split_oversized(sentence, chunk_size, length))
+            for unit in units:
+                unit_size = size if len(units) == 1 else length(unit)
+                if window and total + separator_cost[separator] + unit_size > chunk_size:
+                    if fresh:
+                        yield render()
+                    tail: list[tuple[str, str, int]] = []
+                    for item in reversed(window):
+                        if measure([item, *tail]) > overlap:
+                            break
+                        tail.insert(0, item)
+                    window = tail
+                    total = measure(window)
+                    fresh = False
+                    if window and total + separator_cost[separator] + unit_size > chunk_size:
+                        window, total = [], 0
+                total += unit_size + (separator_cost[separator] if window else 0)
+                window.append((separator, unit, unit_size))
+                fresh = True
+                separator = " "
+    if fresh:
+        yield render()
@@ -0,0 +1,62 @@
+import json
+import sqlite3
+import threading
+from pathlib import Path
+
+from pydantic import BaseModel, Field
+
+
+class ManifestEntry(BaseModel):
+    document_id: str
+    fingerprint: str
+    chunk_digests: list[str] = Field(default_factory=list)
+
+    @property
+    def chunk_count(self) -> int:
+        return len(self.chunk_digests)
+
+
+class IngestManifest:
+    """Per-collection record of what was last written for each document."""
+
+    def __init__(self, path: str, collection_name: str) -> None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.collection_name = collection_name
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS documents ("
+                " collection TEXT NOT NULL, document_id TEXT NOT NULL,"
+                " fingerprint TEXT NOT NULL, chunk_digests TEXT NOT NULL,"
+                " PRIMARY KEY (collection, document_id)) WITHOUT ROWID"
+            )
+
+    def get(self, document_id: str) -> ManifestEntry | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fingerprint, chunk_digests FROM documents WHERE collection = ? AND document_id = ?",
+                (self.collection_name, document_id),
+            ).fetchone()
+        if row is None:
+            return None
+        return ManifestEntry(document_id=document_id, fingerprint=row[0], chunk_digests=json.loads(row[1]))
+
+    def put_many(self, entries: list[ManifestEntry]) -> None:
+        if not entries:
+            return
+        rows = [
+            (self.collection_name, entry.document_id, entry.fingerprint, json.dumps(entry.chunk_digests))
+            for entry in entries
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO documents (collection, document_id, fingerprint, chunk_digests)"
+                " VALUES (?, ?, ?, ?)",
+                rows,
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
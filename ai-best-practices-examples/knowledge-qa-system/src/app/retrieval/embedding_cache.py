@@ -0,0 +1,69 @@
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+
+def content_digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """Content-addressed vector store keyed by (model name, sha256 of the chunk text)."""
+
+    def __init__(self, path: str) -> None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                " model TEXT NOT NULL, digest TEXT NOT NULL, vector BLOB NOT NULL,"
+                " PRIMARY KEY (model, digest)) WITHOUT ROWID"
+            )
+
+    def get_many(self, model: str, digests: list[str]) -> dict[str, list[float]]:
+        found: dict[str, list[float]] = {}
+        unique = list(dict.fromkeys(digests))
+        with self._lock:
+            # Stay below SQLite's default bound-parameter limit.
+            for start in range(0, len(unique), 500):
+                batch = unique[start : start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT digest, vector FROM embeddings WHERE model = ? AND digest IN ({placeholders})",
+                    [model, *batch],
+                ).fetchall()
+                for digest, blob in rows:
+                    found[digest] = np.frombuffer(blob, dtype=np.float32).tolist()
+        return found
+
+    def put_many(self, model: str, vectors: dict[str, list[float]]) -> None:
+        if not vectors:
+            return
+        rows = [(model, digest, np.asarray(vector, dtype=np.float32).tobytes()) for digest, vector in vectors.items()]
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO embeddings (model, digest, vector) VALUES (?, ?, ?)", rows)
+
+    def embed_documents(self, embeddings: Embeddings, model: str, texts: list[str]) -> tuple[list[list[float]], int, int]:
+        """Return vectors for ``texts`` plus (hits, misses); only uncached texts reach ``embeddings``."""
+        digests = [content_digest(text) for text in texts]
+        cached = self.get_many(model, digests)
+        missing: dict[str, str] = {}
+        for digest, text in zip(digests, texts, strict=True):
+            if digest not in cached:
+                missing.setdefault(digest, text)
+        if missing:
+            fresh = dict(zip(missing, embeddings.embed_documents(list(missing.values())), strict=True))
+            self.put_many(model, fresh)
+            cached.update(fresh)
+        misses = sum(1 for digest in digests if digest in missing)
+        return [cached[digest] for digest in digests], len(texts) - misses, misses
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -1,36 +1,99 @@
-import hashlib
+import atexit
+import threading
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 
+import numpy as np
 from langchain_core.embeddings import Embeddings
 from langchain_huggingface import HuggingFaceEmbeddings
 
 from app.core.config import settings
 
+# Token -> bucket lookups, shared by every HashEmbeddings in this process. Bounded, since query
+# tokens would otherwise accumulate for the life of a server.
+BUCKET_CACHE_SIZE = 200_000
+
+# Worker pools for large batches, one per worker count, shared by every HashEmbeddings instance.
+_POOLS: dict[int, ProcessPoolExecutor] = {}
+_POOL_LOCK = threading.Lock()
+
+
+@lru_cache(maxsize=BUCKET_CACHE_SIZE)
+def _bucket(token: str, size: int) -> int:
+    return zlib.crc32(token.encode("utf-8")) % size
+
+
+def _embed_batch(texts: list[str], size: int) -> np.ndarray:
+    rows: list[int] = []
+    buckets: list[int] = []
+    for row, text in enumerate(texts):
+        for token in text.lower().split():
+            rows.append(row)
+            buckets.append(_bucket(token, size))
+
+    matrix = np.zeros((len(texts), size), dtype=np.float32)
+    if rows:
+        np.add.at(matrix, (np.asarray(rows, dtype=np.intp), np.asarray(buckets, dtype=np.intp)), 1.0)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
 
 class HashEmbeddings(Embeddings):
-    def __init__(self, size: int) -> None:
+    def __init__(self, size: int, workers: int = 0, parallel_threshold: int = 2048) -> None:
         self.size = size
+        self.workers = workers
+        self.parallel_threshold = parallel_threshold
 
-    def _embed(self, text: str) -> list[float]:
-        vector = [0.0] * self.size
-        for token in text.lower().split():
-            digest = hashlib.sha256(token.encode("utf-8")).digest()
-            index = int.from_bytes(digest[:4], byteorder="big") % self.size
-            vector[index] += 1.0
-        norm = sum(value * value for value in vector) ** 0.5
-        if norm > 0:
-            vector = [value / norm for value in vector]
-        return vector
+    def embed_batch(self, texts: list[str]) -> np.ndarray:
+        if self.workers > 1 and len(texts) >= self.parallel_threshold:
+            step = -(-len(texts) // self.workers)
+            parts = [texts[start : start + step] for start in range(0, len(texts), step)]
+            matrices = list(_pool(self.workers).map(_embed_batch, parts, [self.size] * len(parts)))
+            return np.vstack(matrices)
+        return _embed_batch(texts, self.size)
 
     def embed_documents(self, texts: list[str]) -> list[list[float]]:
-        return [self._embed(text) for text in texts]
+        if not texts:
+            return []
+        return self.embed_batch(texts).tolist()
 
     def embed_query(self, text: str) -> list[float]:
-        return self._embed(text)
+        return _embed_batch([text], self.size)[0].tolist()
+
+
+def _pool(workers: int) -> ProcessPoolExecutor:
+    with _POOL_LOCK:
+        pool = _POOLS.get(workers)
+        if pool is None:
+            pool = _POOLS[workers] = ProcessPoolExecutor(max_workers=workers)
+        return pool
+
+
+@atexit.register
+def _shutdown_pools() -> None:
+    with _POOL_LOCK:
+        pools = list(_POOLS.values())
+        _POOLS.clear()
+    for pool in pools:
+        pool.shutdown(cancel_futures=True)
+
+
+def embedding_model_key() -> str:
+    """Identify the active embedding function, for keying cached vectors."""
+    if settings.embedding_backend == "hash":
+        return f"hash-crc32:{settings.embedding_hash_size}"
+    return f"{settings.embedding_backend}:{settings.embedding_model_name}"
 
 
 def build_embedding_provider() -> Embeddings:
     if settings.embedding_backend == "hash":
-        return HashEmbeddings(size=settings.embedding_hash_size)
+        return HashEmbeddings(
+            size=settings.embedding_hash_size,
+            workers=settings.embedding_hash_workers,
+            parallel_threshold=settings.embedding_hash_parallel_threshold,
+        )
     return HuggingFaceEmbeddings(
         model_name=settings.embedding_model_name,
         model_kwargs={"device": settings.embedding_device},
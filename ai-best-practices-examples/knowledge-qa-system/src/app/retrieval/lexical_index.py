@@ -0,0 +1,155 @@
+import math
+import re
+import threading
+from array import array
+from collections import Counter
+
+import numpy as np
+
+TOKEN_RE = re.compile(r"\w[\w\-.]*\w|\w")
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase word tokens that keep identifiers such as ``ERR_TIMEOUT``, ``E-1042`` or ``v2.3`` whole."""
+    return TOKEN_RE.findall(text.lower())
+
+
+class _Postings:
+    __slots__ = ("docs", "tfs")
+
+    def __init__(self) -> None:
+        self.docs = array("I")
+        self.tfs = array("H")
+
+
+class BM25Index:
+    """Incrementally maintained BM25 inverted index over chunk texts.
+
+    Posting lists are packed ``array`` buffers (4-byte doc ordinal + 2-byte term frequency) that are
+    scored with NumPy without copying. Replaced or deleted chunks are tombstoned and the index is
+    rebuilt once tombstones outnumber live chunks.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75) -> None:
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._postings: dict[str, _Postings] = {}
+        self._chunk_ids: list[str] = []
+        self._ordinal: dict[str, int] = {}
+        self._doc_len = array("I")
+        self._alive = bytearray()
+        self._total_len = 0
+
+    def __len__(self) -> int:
+        return len(self._ordinal)
+
+    def add_many(self, items: list[tuple[str, str]]) -> None:
+        """Index ``(chunk_id, text)`` pairs, replacing earlier text for the same chunk ids."""
+        with self._lock:
+            for chunk_id, text in items:
+                self._remove(chunk_id)
+                counts = Counter(tokenize(text))
+                ordinal = len(self._chunk_ids)
+                self._chunk_ids.append(chunk_id)
+                self._ordinal[chunk_id] = ordinal
+                length = sum(counts.values())
+                self._doc_len.append(length)
+                self._alive.append(1)
+                self._total_len += length
+                for term, tf in counts.items():
+                    postings = self._postings.get(term)
+                    if postings is None:
+                        postings = self._postings[term] = _Postings()
+                    postings.docs.append(ordinal)
+                    postings.tfs.append(min(tf, 0xFFFF))
+            self._maybe_compact()
+
+    def remove_many(self, chunk_ids: list[str]) -> None:
+        with self._lock:
+            for chunk_id in chunk_ids:
+                self._remove(chunk_id)
+            self._maybe_compact()
+
+    def _remove(self, chunk_id: str) -> None:
+        ordinal = self._ordinal.pop(chunk_id, None)
+        if ordinal is None:
+            return
+        self._alive[ordinal] = 0
+        self._total_len -= self._doc_len[ordinal]
+
+    def _maybe_compact(self) -> None:
+        dead = len(self._chunk_ids) - len(self._ordinal)
+        if dead <= max(1024, len(self._ordinal)):
+            return
+        alive = np.frombuffer(self._alive, dtype=np.uint8).astype(bool)
+        remap = (np.cumsum(alive) - 1).astype(np.uint32)
+        for term in list(self._postings):
+            postings = self._postings[term]
+            docs = np.frombuffer(postings.docs, dtype=np.uint32)
+            keep = alive[docs]
+            if not keep.any():
+                del self._postings[term]
+                continue
+            compacted = _Postings()
+            compacted.docs.frombytes(remap[docs[keep]].tobytes())
+            compacted.tfs.frombytes(np.frombuffer(postings.tfs, dtype=np.uint16)[keep].tobytes())
+            self._postings[term] = compacted
+        self._chunk_ids = [chunk_id for chunk_id, keep in zip(self._chunk_ids, alive, strict=True) if keep]
+        self._ordinal = {chunk_id: ordinal for ordinal, chunk_id in enumerate(self._chunk_ids)}
+        self._doc_len = array("I", np.frombuffer(self._doc_len, dtype=np.uint32)[alive].tobytes())
+        self._alive = bytearray(b"\x01" * len(self._chunk_ids))
+
+    def search(self, query: str, top_k: int) -> list[tuple[str, float, float]]:
+        """Return up to ``top_k`` ``(chunk_id, bm25 score, coverage)`` tuples, best first.
+
+        ``coverage`` is the idf-weighted share of query terms found in the chunk, in [0, 1].
+        """
+        terms = set(tokenize(query))
+        with self._lock:
+            live = len(self._ordinal)
+            if not terms or not live or top_k <= 0:
+                return []
+            avg_len = self._total_len / live if self._total_len else 1.0
+            doc_len = np.frombuffer(self._doc_len, dtype=np.uint32)
+            scores = np.zeros(len(self._chunk_ids), dtype=np.float32)
+            matched = np.zeros(len(self._chunk_ids), dtype=np.float32)
+            alive = np.frombuffer(self._alive, dtype=np.uint8)
+            total_idf = 0.0
+            for term in terms:
+                postings = self._postings.get(term)
+                docs = np.frombuffer(postings.docs, dtype=np.uint32) if postings is not None else None
+                # Tombstoned postings stay until compaction; only live chunks count towards df.
+                df = int(np.count_nonzero(alive[docs])) if docs is not None else 0
+                idf = math.log(1.0 + (live - df + 0.5) / (df + 0.5))
+                total_idf += idf
+                if not df:
+                    continue
+                tfs = np.frombuffer(postings.tfs, dtype=np.uint16).astype(np.float32)
+                norm = self.k1 * (1.0 - self.b + self.b * doc_len[docs] / avg_len)
+                scores[docs] += idf * tfs * (self.k1 + 1.0) / (tfs + norm)
+                matched[docs] += idf
+            scores *= alive
+            candidates = np.flatnonzero(scores)
+            if not candidates.size:
+                return []
+            if candidates.size > top_k:
+                candidates = candidates[np.argpartition(-scores[candidates], top_k - 1)[:top_k]]
+            ranked = candidates[np.argsort(-scores[candidates], kind="stable")]
+            return [
+                # ``matched`` is summed in float32; clamp its rounding error so coverage stays a share.
+                (self._chunk_ids[ordinal], float(scores[ordinal]), min(1.0, float(matched[ordinal]) / total_idf))
+                for ordinal in ranked
+            ]
+
+
+def reciprocal_rank_fusion(rankings: list[tuple[list[str], float]], k: int = 60) -> list[tuple[str, float]]:
+    """Fuse ``(ranked ids, weight)`` lists into one ranking by weighted reciprocal rank."""
+    fused: dict[str, float] = {}
+    for ranked_ids, weight in rankings:
+        for rank, chunk_id in enumerate(ranked_ids, start=1):
+            fused[chunk_id] = fused.get(chunk_id, 0.0) + weight / (k + rank)
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)
@@ -1,56 +1,235 @@
+import math
+import os
+import threading
+from collections.abc import Callable
+from pathlib import Path
+
+import chromadb
 from langchain_chroma import Chroma
-from langchain_core.documents import Document
 
 from app.core.config import settings
-from app.domain.models import ChunkRecord, Citation
-from app.retrieval.embeddings import build_embedding_provider
+from app.domain.models import ChunkRecord, Citation, UpsertStats
+from app.retrieval.embedding_cache import EmbeddingCache
+from app.retrieval.embeddings import build_embedding_provider, embedding_model_key
+from app.retrieval.lexical_index import BM25Index, reciprocal_rank_fusion
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+# A collection is identified by its persist directory and name; several stores may share a name.
+CollectionKey = tuple[str, str]
+
+# In-memory BM25 index per collection with the collection version it reflects. Built from Chroma
+# on first use, kept in step by this process's writes, and rebuilt when another process (another
+# API worker, an ingest job) has written since.
+_LEXICAL_INDEXES: dict[CollectionKey, tuple[int, BM25Index]] = {}
+_LEXICAL_LOCK = threading.Lock()
+LEXICAL_BOOTSTRAP_PAGE = 1000
 
 
 class ChromaVectorStore:
     def __init__(self) -> None:
+        self._embeddings = build_embedding_provider()
+        # One client for both layers: langchain for queries, the chromadb collection for writes of
+        # precomputed vectors and for its distance configuration.
+        self._client = chromadb.PersistentClient(path=settings.chroma_path)
+        self._collection = self._client.get_or_create_collection(settings.collection_name)
         self._store = Chroma(
+            client=self._client,
             collection_name=settings.collection_name,
-            persist_directory=settings.chroma_path,
-            embedding_function=build_embedding_provider(),
+            embedding_function=self._embeddings,
         )
+        self._relevance = relevance_score_fn(_distance_space(self._collection))
+        self._key: CollectionKey = (str(Path(settings.chroma_path).resolve()), settings.collection_name)
+        self._version_path = Path(settings.chroma_path) / f"{settings.collection_name}.version"
+        self._model_key = embedding_model_key()
+        self._cache: EmbeddingCache | None = None
+        if settings.embedding_cache_enabled:
+            cache_path = settings.embedding_cache_path or str(Path(settings.chroma_path) / "embedding_cache.sqlite3")
+            self._cache = EmbeddingCache(cache_path)
+
+    @property
+    def version(self) -> int:
+        """Write counter for the collection, shared by every process using the same persist directory."""
+        return read_collection_version(self._version_path)
+
+    def _lexical_index(self) -> BM25Index:
+        version = self.version
+        with _LEXICAL_LOCK:
+            entry = _LEXICAL_INDEXES.get(self._key)
+            if entry is not None and entry[0] == version:
+                return entry[1]
+            # A write landing during the build is tagged with the older version and so is
+            # picked up by the next rebuild.
+            index = BM25Index()
+            offset = 0
+            while True:
+                page = self._store.get(include=["documents"], limit=LEXICAL_BOOTSTRAP_PAGE, offset=offset)
+                if not page["ids"]:
+                    break
+                index.add_many(list(zip(page["ids"], page["documents"], strict=True)))
+                offset += len(page["ids"])
+            _LEXICAL_INDEXES[self._key] = (version, index)
+            return index
+
+    def _record_write(self, update: Callable[[BM25Index], None]) -> None:
+        """Bump the collection version after a write and apply it to this process's BM25 index.
+
+        The index is only updated in place when it had seen every earlier write; otherwise it is
+        dropped and rebuilt on next use.
+        """
+        with _LEXICAL_LOCK:
+            before, after = bump_collection_version(self._version_path)
+            entry = _LEXICAL_INDEXES.pop(self._key, None)
+            if entry is not None and entry[0] == before and settings.hybrid_retrieval_enabled:
+                update(entry[1])
+                _LEXICAL_INDEXES[self._key] = (after, entry[1])
 
-    def upsert_chunks(self, chunks: list[ChunkRecord]) -> None:
+    def upsert_chunks(self, chunks: list[ChunkRecord]) -> UpsertStats:
         if not chunks:
+            return UpsertStats()
+        texts = [item.text for item in chunks]
+        if self._cache is not None:
+            vectors, hits, misses = self._cache.embed_documents(self._embeddings, self._model_key, texts)
+        else:
+            vectors, hits, misses = self._embeddings.embed_documents(texts), 0, len(texts)
+        # Vectors are already computed, so write straight to the collection instead of add_documents,
+        # which would embed every chunk again.
+        self._collection.upsert(
+            ids=[item.chunk_id for item in chunks],
+            embeddings=vectors,
+            documents=texts,
+            metadatas=[
+                {
+                    "document_id": item.document_id,
+                    "chunk_index": item.chunk_index,
+                    "source_type": item.source_type,
+                    "source_uri": item.source_uri,
+                    "title": item.title,
+                }
+                for item in chunks
+            ],
+        )
+        self._record_write(lambda index: index.add_many([(item.chunk_id, item.text) for item in chunks]))
+        return UpsertStats(embedding_cache_hits=hits, embedding_cache_misses=misses)
+
+    def delete_chunks(self, chunk_ids: list[str]) -> None:
+        if not chunk_ids:
             return
-        documents: list[Document] = []
-        ids: list[str] = []
-        for item in chunks:
-            documents.append(
-                Document(
-                    page_content=item.text,
-                    metadata={
-                        "document_id": item.document_id,
-                        "chunk_index": item.chunk_index,
-                        "source_type": item.source_type,
-                        "source_uri": item.source_uri,
-                        "title": item.title,
-                    },
-                )
-            )
-            ids.append(item.chunk_id)
-        self._store.add_documents(documents=documents, ids=ids)
+        self._store.delete(ids=chunk_ids)
+        self._record_write(lambda index: index.remove_many(chunk_ids))
+
+    def chunk_ids_for_document(self, document_id: str) -> list[str]:
+        result = self._store.get(where={"document_id": document_id}, include=[])
+        return list(result.get("ids", []))
+
+    def embed_query(self, query: str) -> list[float]:
+        return self._embeddings.embed_query(query)
 
     def retrieve(self, query: str, top_k: int) -> tuple[list[Citation], list[str]]:
-        # Returns relevance scores in [0, 1].
-        result = self._store.similarity_search_with_relevance_scores(query=query, k=top_k)
+        return self.search(query, self.embed_query(query), top_k)
+
+    def search(self, query: str, embedding: list[float], top_k: int) -> tuple[list[Citation], list[str]]:
+        """Dense search, fused with BM25 by reciprocal rank when hybrid retrieval is enabled.
+
+        Fused citations keep the dense relevance score, or the lexical query-term coverage when
+        that is higher (e.g. an exact error code the embedding model does not separate).
+        """
+        if not settings.hybrid_retrieval_enabled:
+            return self.retrieve_by_vector(embedding, top_k)
+        candidates = top_k * max(1, settings.hybrid_candidate_multiplier)
+        dense_citations, dense_snippets = self.retrieve_by_vector(embedding, candidates)
+        lexical = self._lexical_index().search(query, candidates)
+        weight = settings.hybrid_lexical_weight
+        fused = reciprocal_rank_fusion(
+            [
+                ([item.chunk_id for item in dense_citations], 1.0 - weight),
+                ([chunk_id for chunk_id, _, _ in lexical], weight),
+            ],
+            k=settings.hybrid_rrf_k,
+        )[:top_k]
+
+        hits = {item.chunk_id: (item, snippet) for item, snippet in zip(dense_citations, dense_snippets, strict=True)}
+        coverage = {chunk_id: share for chunk_id, _, share in lexical}
+        missing = [chunk_id for chunk_id, _ in fused if chunk_id not in hits]
+        if missing:
+            fetched = self._store.get(ids=missing, include=["documents", "metadatas"])
+            for text, metadata in zip(fetched["documents"], fetched["metadatas"], strict=True):
+                citation = self._to_citation(metadata, text, 0.0)
+                hits[citation.chunk_id] = (citation, text)
+
+        citations: list[Citation] = []
+        snippets: list[str] = []
+        for chunk_id, _ in fused:
+            if chunk_id not in hits:
+                continue
+            citation, snippet = hits[chunk_id]
+            score = max(citation.score, coverage.get(chunk_id, 0.0))
+            citations.append(citation.model_copy(update={"score": score}))
+            snippets.append(snippet)
+        return citations, snippets
+
+    def retrieve_by_vector(self, embedding: list[float], top_k: int) -> tuple[list[Citation], list[str]]:
+        # Chroma returns distances; convert them to relevance scores in [0, 1].
+        relevance = self._relevance
         citations: list[Citation] = []
         snippets: list[str] = []
-        for doc, score in result:
-            metadata = doc.metadata or {}
-            chunk_id = f"{metadata.get('document_id', 'unknown')}::{metadata.get('chunk_index', 0)}"
-            citations.append(
-                Citation(
-                    chunk_id=chunk_id,
-                    title=str(metadata.get("title", "Untitled")),
-                    source_uri=str(metadata.get("source_uri", "")),
-                    snippet=doc.page_content[:220],
-                    score=max(0.0, min(1.0, float(score))),
-                )
-            )
+        for doc, distance in self._store.similarity_search_by_vector_with_relevance_scores(embedding, k=top_k):
+            citations.append(self._to_citation(doc.metadata or {}, doc.page_content, relevance(distance)))
             snippets.append(doc.page_content)
         return citations, snippets
+
+    @staticmethod
+    def _to_citation(metadata: dict, text: str, score: float) -> Citation:
+        return Citation(
+            chunk_id=f"{metadata.get('document_id', 'unknown')}::{metadata.get('chunk_index', 0)}",
+            title=str(metadata.get("title", "Untitled")),
+            source_uri=str(metadata.get("source_uri", "")),
+            snippet=text[:220],
+            score=max(0.0, min(1.0, float(score))),
+        )
+
+
+def read_collection_version(path: Path) -> int:
+    try:
+        return int(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return 0
+
+
+def bump_collection_version(path: Path) -> tuple[int, int]:
+    """Increment the version stored at ``path`` under an exclusive file lock; return (before, after)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path.with_suffix(".lock"), "a") as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        before = read_collection_version(path)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(str(before + 1), encoding="utf-8")
+        # Replaced atomically, so readers never see a partial number.
+        os.replace(tmp_path, path)
+    return before, before + 1
+
+
+def relevance_score_fn(space: str) -> Callable[[float], float]:
+    """Map a Chroma distance in ``space`` to a relevance score, as langchain's vector stores do."""
+    if space == "cosine":
+        return lambda distance: 1.0 - distance
+    if space == "ip":
+        return lambda distance: 1.0 - distance if distance > 0 else -distance
+    if space == "l2":
+        # Same scale as langchain's Euclidean relevance function, which the scores were tuned on.
+        return lambda distance: 1.0 - distance / math.sqrt(2)
+    raise ValueError(f"Unsupported Chroma distance space: {space}")
+
+
+def _distance_space(collection: chromadb.Collection) -> str:
+    configuration = collection.configuration or {}
+    for index in ("hnsw", "spann"):
+        space = (configuration.get(index) or {}).get("space")
+        if space:
+            return space
+    # Collections created with the older metadata-based configuration.
+    return (collection.metadata or {}).get("hnsw:space", "l2")
@@ -9,11 +9,20 @@ class SourceInput(BaseModel):
 
 class IngestRequest(BaseModel):
     sources: list[SourceInput] = Field(default_factory=list)
+    # "full" rewrites every chunk; "incremental" skips unchanged documents and unchanged chunks.
     mode: str = "full"
 
 
 class IngestResponse(BaseModel):
     job_id: str
-    documents_ingested: int
-    chunks_written: int
+    # queued -> loading -> writing -> completed | failed; not_found for unknown job ids.
+    status: str = "completed"
+    sources_total: int = 0
+    sources_processed: int = 0
+    documents_ingested: int = 0
+    chunks_written: int = 0
+    documents_skipped: int = 0
+    chunks_deleted: int = 0
+    embedding_cache_hits: int = 0
+    embedding_cache_misses: int = 0
     failures: list[str] = Field(default_factory=list)
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from pathlib import Path
 
 
@@ -6,3 +7,5 @@ os.environ.setdefault("KQ_EMBEDDING_BACKEND", "hash")
 os.environ.setdefault("KQ_EMBEDDING_HASH_SIZE", "384")
 os.environ.setdefault("KQ_COLLECTION_NAME", "knowledge_chunks_test_v2")
 os.environ.setdefault("KQ_CHROMA_PATH", str(Path(__file__).parent / ".chroma_test"))
+os.environ.setdefault("KQ_EMBEDDING_CACHE_PATH", str(Path(tempfile.mkdtemp()) / "embedding_cache.sqlite3"))
+os.environ.setdefault("KQ_MANIFEST_PATH", str(Path(tempfile.mkdtemp()) / "ingest_manifest.sqlite3"))
@@ -0,0 +1,62 @@
+import asyncio
+import time
+from pathlib import Path
+
+import httpx
+
+from app.domain.models import DocumentRecord
+from app.ingestion.async_loader import AsyncSourceLoader
+from app.schemas.ingest import SourceInput
+
+
+def _slow_site(delay: float, seen: list[tuple[str, float]]) -> httpx.MockTransport:
+    async def handler(request: httpx.Request) -> httpx.Response:
+        seen.append((request.url.host, time.perf_counter()))
+        await asyncio.sleep(delay)
+        if request.url.path == "/missing":
+            return httpx.Response(404)
+        return httpx.Response(200, html=f"<title>{request.url.path}</title><p>body of {request.url}</p>")
+
+    return httpx.MockTransport(handler)
+
+
+def test_async_loader_fetches_concurrently_and_keeps_order() -> None:
+    seen: list[tuple[str, float]] = []
+    loader = AsyncSourceLoader(concurrency=20, per_host_rate=0, pdf_workers=0, transport=_slow_site(0.2, seen))
+    sources = [SourceInput(source_type="web", source_uri=f"https://host{index}.test/page") for index in range(20)]
+    sources.append(SourceInput(source_type="web", source_uri="https://host0.test/missing"))
+    sources.append(SourceInput(source_type="unknown", source_uri="x"))
+
+    started = time.perf_counter()
+    results = asyncio.run(loader.load_all(sources))
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 1.0
+    assert [result.source_uri for result in results[:20]] == [source.source_uri for source in sources[:20]]
+    assert isinstance(results[20], httpx.HTTPStatusError)
+    assert isinstance(results[21], ValueError)
+
+
+def test_async_loader_rate_limits_per_host() -> None:
+    seen: list[tuple[str, float]] = []
+    loader = AsyncSourceLoader(concurrency=10, per_host_rate=20, pdf_workers=0, transport=_slow_site(0, seen))
+    sources = [SourceInput(source_type="web", source_uri=f"https://same.test/{index}") for index in range(5)]
+    sources += [SourceInput(source_type="web", source_uri=f"https://other{index}.test/") for index in range(5)]
+
+    asyncio.run(loader.load_all(sources))
+
+    same = sorted(stamp for host, stamp in seen if host == "same.test")
+    other = sorted(stamp for host, stamp in seen if host != "same.test")
+    assert same[-1] - same[0] >= 0.19
+    assert other[-1] - other[0] < 0.1
+
+
+def test_async_loader_extracts_pdf_in_process_pool() -> None:
+    loader = AsyncSourceLoader(concurrency=4, per_host_rate=0, pdf_workers=2)
+    fixture = Path(__file__).parent / "fixtures" / "sample_doc.txt"
+    try:
+        results = asyncio.run(loader.load_all([SourceInput(source_type="pdf", source_uri=str(fixture))]))
+    finally:
+        loader.close()
+    assert isinstance(results[0], DocumentRecord)
+    assert "Chroma" in results[0].text
@@ -0,0 +1,42 @@
+import asyncio
+import threading
+import time
+
+from app.domain.models import Citation
+from app.domain.services.chat_service import ChatService
+
+
+class SlowRetrieval:
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+        self.finished = threading.Event()
+
+    def retrieve(self, query: str, top_k: int | None = None) -> tuple[list[Citation], list[str], bool]:
+        time.sleep(self.delay)
+        self.finished.set()
+        citation = Citation(chunk_id="doc::0", title="Doc", source_uri="doc", snippet="Chroma", score=0.9)
+        return [citation], ["Chroma is a vector database used for retrieval."], False
+
+
+def test_astream_emits_before_retrieval_finishes_and_matches_answer() -> None:
+    retrieval = SlowRetrieval(delay=0.2)
+    service = ChatService(retrieval_service=retrieval)
+
+    async def collect() -> list[tuple[str, dict]]:
+        events = []
+        async for event, payload in service.astream("What is Chroma?"):
+            if not events:
+                assert not retrieval.finished.is_set()
+            events.append((event, payload))
+        return events
+
+    events = asyncio.run(collect())
+    names = [event for event, _ in events]
+    assert names[0] == "retrieval_started"
+    assert names[1] == "citation"
+    assert names[-1] == "final"
+    assert names.count("token") > 1
+
+    streamed = "".join(payload["token"] for event, payload in events if event == "token")
+    retrieval.delay = 0
+    assert streamed == events[-1][1]["answer"] == service.answer("What is Chroma?").answer
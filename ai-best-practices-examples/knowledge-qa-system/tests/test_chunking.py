@@ -1,4 +1,6 @@
-from app.ingestion.chunking import chunk_text
+import itertools
+
+from app.ingestion.chunking import chunk_text, iter_chunks, iter_paragraphs
 
 
 def test_chunk_text_overlap() -> None:
@@ -7,3 +9,29 @@ def test_chunk_text_overlap() -> None:
     assert chunks[0] == "abcdefghij"
     assert chunks[1].startswith("ijkl")
     assert len(chunks) >= 3
+
+
+def test_iter_chunks_breaks_on_sentences_with_overlap() -> None:
+    text = "One two three. Four five six. Seven eight nine. Ten eleven twelve."
+    chunks = list(iter_chunks([text], chunk_size=32, overlap=16))
+    assert chunks == [
+        "One two three. Four five six.",
+        "Four five six. Seven eight nine.",
+        "Ten eleven twelve.",
+    ]
+    assert all(len(chunk) <= 32 for chunk in chunks)
+
+
+def test_iter_chunks_splits_oversized_sentences_and_keeps_paragraphs() -> None:
+    chunks = list(iter_chunks(["a" * 25, "short line.", "next paragraph."], chunk_size=10, overlap=0))
+    assert chunks[:3] == ["a" * 10, "a" * 10, "a" * 5]
+    assert all(len(chunk) <= 10 for chunk in chunks)
+
+    joined = list(iter_chunks(iter_paragraphs("first.\nsecond."), chunk_size=50, overlap=0))
+    assert joined == ["first.\nsecond."]
+
+
+def test_iter_chunks_is_lazy_and_measures_tokens() -> None:
+    endless = (f"Sentence number {index}." for index in itertools.count())
+    first = next(iter_chunks(endless, chunk_size=6, overlap=0, length=lambda text: len(text.split())))
+    assert first == "Sentence number 0.\nSentence number 1."
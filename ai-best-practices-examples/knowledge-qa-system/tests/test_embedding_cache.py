@@ -0,0 +1,39 @@
+from pathlib import Path
+
+from app.retrieval.embedding_cache import EmbeddingCache
+from app.retrieval.embeddings import HashEmbeddings
+
+
+class CountingEmbeddings(HashEmbeddings):
+    def __init__(self) -> None:
+        super().__init__(size=32)
+        self.embedded: list[str] = []
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        self.embedded.extend(texts)
+        return super().embed_documents(texts)
+
+
+def test_embedding_cache_only_embeds_new_text(tmp_path: Path) -> None:
+    cache = EmbeddingCache(str(tmp_path / "cache.sqlite3"))
+    embeddings = CountingEmbeddings()
+
+    first, hits, misses = cache.embed_documents(embeddings, "hash:32", ["alpha beta", "gamma", "alpha beta"])
+    assert (hits, misses) == (0, 3)
+    assert embeddings.embedded == ["alpha beta", "gamma"]
+
+    second, hits, misses = cache.embed_documents(embeddings, "hash:32", ["gamma", "delta", "alpha beta"])
+    assert (hits, misses) == (2, 1)
+    assert embeddings.embedded[2:] == ["delta"]
+    assert second[0] == first[1]
+    assert second[2] == first[0]
+
+
+def test_embedding_cache_is_keyed_by_model(tmp_path: Path) -> None:
+    path = str(tmp_path / "cache.sqlite3")
+    EmbeddingCache(path).embed_documents(CountingEmbeddings(), "model-a", ["same text"])
+
+    embeddings = CountingEmbeddings()
+    _, hits, misses = EmbeddingCache(path).embed_documents(embeddings, "model-b", ["same text"])
+    assert (hits, misses) == (0, 1)
+    assert embeddings.embedded == ["same text"]
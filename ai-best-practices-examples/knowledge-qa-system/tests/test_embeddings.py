@@ -0,0 +1,44 @@
+import numpy as np
+
+from app.retrieval import embeddings as embeddings_module
+from app.retrieval.embeddings import HashEmbeddings
+
+
+def test_hash_embeddings_rows_are_unit_length() -> None:
+    embeddings = HashEmbeddings(size=64)
+    vectors = embeddings.embed_batch(["Chroma stores vectors", "", "chroma CHROMA chroma"])
+    assert vectors.shape == (3, 64)
+    assert vectors.dtype == np.float32
+    assert np.isclose(np.linalg.norm(vectors[0]), 1.0)
+    assert not vectors[1].any()
+    assert np.isclose(vectors[2].max(), 1.0)
+
+
+def test_hash_embeddings_query_matches_document_vector() -> None:
+    embeddings = HashEmbeddings(size=128)
+    text = "What is Chroma used for?"
+    assert embeddings.embed_query(text) == embeddings.embed_documents([text])[0]
+
+
+def test_hash_embeddings_process_pool_matches_serial() -> None:
+    texts = [f"document {index} mentions token{index % 7} and chroma" for index in range(40)]
+    serial = HashEmbeddings(size=96).embed_batch(texts)
+    parallel = HashEmbeddings(size=96, workers=2, parallel_threshold=10).embed_batch(texts)
+    assert np.array_equal(serial, parallel)
+
+
+def test_hash_embeddings_reuse_one_worker_pool() -> None:
+    texts = [f"document {index}" for index in range(20)]
+    embeddings = HashEmbeddings(size=32, workers=2, parallel_threshold=10)
+    embeddings.embed_batch(texts)
+    pool = embeddings_module._POOLS[2]
+    HashEmbeddings(size=32, workers=2, parallel_threshold=10).embed_batch(texts)
+    assert embeddings_module._POOLS[2] is pool
+
+
+def test_bucket_cache_is_bounded() -> None:
+    embeddings_module._bucket.cache_clear()
+    HashEmbeddings(size=16).embed_batch([" ".join(f"t{index}" for index in range(100))])
+    info = embeddings_module._bucket.cache_info()
+    assert info.maxsize == embeddings_module.BUCKET_CACHE_SIZE
+    assert info.currsize == 100
@@ -0,0 +1,89 @@
+from pathlib import Path
+
+from app.core.config import settings
+from app.domain.models import ChunkRecord, UpsertStats
+from app.domain.services.ingestion_service import IngestionService
+from app.ingestion.manifest import IngestManifest
+from app.schemas.ingest import IngestRequest
+
+
+class InMemoryVectorStore:
+    def __init__(self) -> None:
+        self.chunks: dict[str, ChunkRecord] = {}
+        self.upserted: list[str] = []
+
+    def upsert_chunks(self, chunks: list[ChunkRecord]) -> UpsertStats:
+        for chunk in chunks:
+            self.chunks[chunk.chunk_id] = chunk
+            self.upserted.append(chunk.chunk_id)
+        return UpsertStats(embedding_cache_misses=len(chunks))
+
+    def delete_chunks(self, chunk_ids: list[str]) -> None:
+        for chunk_id in chunk_ids:
+            self.chunks.pop(chunk_id, None)
+
+    def chunk_ids_for_document(self, document_id: str) -> list[str]:
+        return [chunk_id for chunk_id, chunk in self.chunks.items() if chunk.document_id == document_id]
+
+
+def _request(path: Path, mode: str) -> IngestRequest:
+    return IngestRequest(sources=[{"source_type": "pdf", "source_uri": str(path), "title": "Doc"}], mode=mode)
+
+
+def _paragraphs(count: int, marker: str = "") -> str:
+    return "\n".join(f"Paragraph {index}{marker} " + "lorem ipsum " * 60 for index in range(count))
+
+
+def test_incremental_ingest_skips_diffs_and_deletes(tmp_path: Path) -> None:
+    store = InMemoryVectorStore()
+    service = IngestionService(vector_store=store, manifest=IngestManifest(str(tmp_path / "m.sqlite3"), "test"))
+    source = tmp_path / "doc.txt"
+    source.write_text(_paragraphs(6), encoding="utf-8")
+
+    first = service.ingest(_request(source, "incremental"))
+    assert first.documents_ingested == 1
+    total = first.chunks_written
+    assert total > 3
+
+    unchanged = service.ingest(_request(source, "incremental"))
+    assert unchanged.documents_skipped == 1
+    assert unchanged.chunks_written == 0
+
+    source.write_text(_paragraphs(6).replace("Paragraph 5", "Paragraph five"), encoding="utf-8")
+    store.upserted.clear()
+    edited = service.ingest(_request(source, "incremental"))
+    assert 0 < edited.chunks_written < total
+    assert all(not chunk_id.endswith("::0") for chunk_id in store.upserted)
+
+    source.write_text(_paragraphs(2), encoding="utf-8")
+    shrunk = service.ingest(_request(source, "incremental"))
+    remaining = store.chunk_ids_for_document("pdf::doc.txt")
+    assert shrunk.chunks_deleted == total - len(remaining)
+    assert sorted(remaining) == sorted(f"pdf::doc.txt::{index}" for index in range(len(remaining)))
+
+
+def test_full_ingest_cleans_chunks_written_before_manifest(tmp_path: Path) -> None:
+    store = InMemoryVectorStore()
+    store.upsert_chunks(
+        [
+            ChunkRecord(
+                chunk_id=f"pdf::doc.txt::{index}",
+                document_id="pdf::doc.txt",
+                chunk_index=index,
+                text="old",
+                source_type="pdf",
+                source_uri="doc.txt",
+                title="Doc",
+            )
+            for index in range(40)
+        ]
+    )
+    service = IngestionService(vector_store=store, manifest=IngestManifest(str(tmp_path / "m.sqlite3"), "test"))
+    source = tmp_path / "doc.txt"
+    source.write_text("short document " * 10, encoding="utf-8")
+
+    result = service.ingest(_request(source, "full"))
+    assert result.chunks_written == 1
+    assert result.chunks_deleted == 39
+    assert list(store.chunks) == ["pdf::doc.txt::0"]
+    assert settings.chunk_size > len(source.read_text(encoding="utf-8"))
@@ -1,3 +1,4 @@
+import time
 from pathlib import Path
 
 from fastapi.testclient import TestClient
@@ -6,6 +7,19 @@ from pypdf import PdfWriter
 from app.main import app
 
 
+def _run_ingest(client: TestClient, payload: dict) -> dict:
+    response = client.post("/ingest", json=payload)
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        status = client.get(f"/ingest/{job_id}").json()
+        if status["status"] in ("completed", "failed"):
+            return status
+        time.sleep(0.02)
+    raise AssertionError(f"ingest job {job_id} did not finish")
+
+
 def test_ingest_then_chat_flow() -> None:
     client = TestClient(app)
     pdf_path = Path(__file__).parent / "fixtures" / "sample_doc.pdf"
@@ -15,9 +29,9 @@ def test_ingest_then_chat_flow() -> None:
         with pdf_path.open("wb") as handle:
             writer.write(handle)
 
-    ingest_response = client.post(
-        "/ingest",
-        json={
+    ingest_json = _run_ingest(
+        client,
+        {
             "sources": [
                 {
                     "source_type": "pdf",
@@ -28,8 +42,6 @@ def test_ingest_then_chat_flow() -> None:
             "mode": "full",
         },
     )
-    assert ingest_response.status_code == 200
-    ingest_json = ingest_response.json()
     assert ingest_json["documents_ingested"] in (0, 1)
     assert "failures" in ingest_json
 
@@ -58,11 +70,34 @@ def test_chat_stream_includes_events() -> None:
 
 def test_ingest_unsupported_source_returns_failure() -> None:
     client = TestClient(app)
-    response = client.post(
-        "/ingest",
-        json={"sources": [{"source_type": "unknown", "source_uri": "x"}]},
-    )
-    assert response.status_code == 200
-    payload = response.json()
+    payload = _run_ingest(client, {"sources": [{"source_type": "unknown", "source_uri": "x"}]})
+    assert payload["status"] == "completed"
     assert payload["documents_ingested"] == 0
     assert len(payload["failures"]) == 1
+
+
+def test_reingest_hits_embedding_cache() -> None:
+    client = TestClient(app)
+    fixture = Path(__file__).parent / "fixtures" / "sample_doc.txt"
+    payload = {"sources": [{"source_type": "pdf", "source_uri": str(fixture), "title": "Text Fixture"}]}
+
+    _run_ingest(client, payload)
+    body = _run_ingest(client, payload)
+    assert body["chunks_written"] >= 1
+    assert body["embedding_cache_hits"] == body["chunks_written"]
+    assert body["embedding_cache_misses"] == 0
+
+
+def test_ingest_progress_streams_until_final() -> None:
+    client = TestClient(app)
+    fixture = Path(__file__).parent / "fixtures" / "sample_doc.txt"
+    response = client.post("/ingest", json={"sources": [{"source_type": "pdf", "source_uri": str(fixture)}]})
+    job_id = response.json()["job_id"]
+    assert response.json()["status"] == "queued"
+
+    body = client.get(f"/ingest/{job_id}/events").text
+    assert body.rstrip().split("\n\n")[-1].startswith("event: final")
+    assert '"sources_processed": 1' in body
+
+    unknown = client.get("/ingest/does-not-exist").json()
+    assert unknown["status"] == "not_found"
@@ -0,0 +1,65 @@
+import threading
+import time
+
+import pytest
+
+from app.domain.services.ingest_jobs import IngestJobQueue, IngestQueueFullError
+from app.schemas.ingest import IngestRequest, IngestResponse, SourceInput
+
+
+class BlockingService:
+    def __init__(self) -> None:
+        self.release = threading.Event()
+
+    async def aingest(self, request: IngestRequest, job_id: str | None = None, on_loaded=None) -> IngestResponse:
+        for index, _ in enumerate(request.sources):
+            on_loaded(index, ValueError("boom") if index == 0 else None)
+        while not self.release.is_set():
+            time.sleep(0.01)
+        return IngestResponse(job_id=job_id, sources_total=len(request.sources), sources_processed=len(request.sources))
+
+
+def _request(count: int) -> IngestRequest:
+    return IngestRequest(sources=[SourceInput(source_type="web", source_uri=f"https://x/{i}") for i in range(count)])
+
+
+def _wait_for(queue: IngestJobQueue, job_id: str, status: str) -> IngestResponse:
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        record = queue.get(job_id)
+        if record is not None and record.status == status:
+            return record
+        time.sleep(0.01)
+    raise AssertionError(f"{job_id} never reached {status}")
+
+
+def test_job_queue_reports_live_progress_and_bounds_pending() -> None:
+    service = BlockingService()
+    jobs = IngestJobQueue(service, workers=1, max_pending=1, history=10, ttl_seconds=60)
+
+    running = jobs.submit(_request(3))
+    live = _wait_for(jobs, running.job_id, "writing")
+    assert live.sources_processed == 3
+    assert live.failures == ["web:https://x/0: boom"]
+
+    queued = jobs.submit(_request(1))
+    assert jobs.get(queued.job_id).status == "queued"
+    with pytest.raises(IngestQueueFullError):
+        jobs.submit(_request(1))
+
+    service.release.set()
+    assert _wait_for(jobs, running.job_id, "completed").sources_processed == 3
+    _wait_for(jobs, queued.job_id, "completed")
+
+
+def test_job_queue_evicts_finished_records() -> None:
+    service = BlockingService()
+    service.release.set()
+    jobs = IngestJobQueue(service, workers=1, max_pending=10, history=2, ttl_seconds=60)
+    job_ids = [jobs.submit(_request(1)).job_id for _ in range(3)]
+    jobs._pending.join()
+    assert jobs.get(job_ids[0]) is None
+    assert jobs.get(job_ids[2]) is not None
+
+    jobs.ttl_seconds = 0
+    assert jobs.get(job_ids[2]) is None
@@ -0,0 +1,130 @@
+import chromadb
+import pytest
+
+from app.core.config import settings
+from app.domain.models import ChunkRecord
+from app.retrieval.lexical_index import BM25Index, reciprocal_rank_fusion, tokenize
+from app.retrieval.vector_store import ChromaVectorStore, bump_collection_version
+
+
+def test_tokenize_keeps_identifiers_whole() -> None:
+    assert tokenize("Retry on ERR_TIMEOUT (E-1042) in v2.3.") == ["retry", "on", "err_timeout", "e-1042", "in", "v2.3"]
+
+
+def test_bm25_ranks_rare_terms_and_tracks_updates() -> None:
+    index = BM25Index()
+    index.add_many(
+        [
+            ("a", "the deploy failed with E-1042 during rollout"),
+            ("b", "the deploy succeeded"),
+            ("c", "the cache was cold"),
+        ]
+    )
+    assert [chunk_id for chunk_id, _, _ in index.search("E-1042 deploy", 3)] == ["a", "b"]
+    assert index.search("E-1042 deploy", 1)[0][2] == pytest.approx(1.0)
+
+    index.add_many([("a", "nothing to see")])
+    index.remove_many(["b"])
+    assert index.search("deploy", 3) == []
+    assert len(index) == 2
+
+
+def test_bm25_compacts_tombstones() -> None:
+    index = BM25Index()
+    index.add_many([(f"c{i}", f"common token{i % 10} extra{i}") for i in range(3000)])
+    index.remove_many([f"c{i}" for i in range(2500)])
+    assert len(index._chunk_ids) == 500
+    results = index.search("extra2999 token9", 5)
+    assert results[0][0] == "c2999"
+    assert all(int(chunk_id[1:]) >= 2500 for chunk_id, _, _ in results)
+
+
+def test_bm25_ignores_tombstones_in_document_frequency() -> None:
+    index = BM25Index()
+    index.add_many([("a::0", "alpha beta"), ("b::0", "beta gamma"), ("c::0", "gamma delta")])
+    # A full re-ingest re-upserts unchanged chunks; their old postings stay until compaction.
+    for _ in range(20):
+        index.add_many([("a::0", "alpha beta")])
+
+    for query in ("alpha", "alpha gamma", "beta"):
+        results = index.search(query, 3)
+        assert results
+        assert all(score >= 0 and 0.0 <= coverage <= 1.0 for _, score, coverage in results)
+    assert index.search("alpha", 1)[0][2] == pytest.approx(1.0)
+
+
+def test_reciprocal_rank_fusion_weights_lists() -> None:
+    fused = reciprocal_rank_fusion([(["x", "y"], 0.2), (["y", "z"], 0.8)], k=1)
+    assert [chunk_id for chunk_id, _ in fused] == ["y", "z", "x"]
+
+
+def test_hybrid_search_surfaces_exact_identifier(monkeypatch: pytest.MonkeyPatch, tmp_path) -> None:
+    monkeypatch.setattr(settings, "collection_name", "hybrid_test")
+    monkeypatch.setattr(settings, "chroma_path", str(tmp_path / "chroma"))
+    store = ChromaVectorStore()
+    chunks = [
+        ChunkRecord(
+            chunk_id=f"doc::{index}",
+            document_id="doc",
+            chunk_index=index,
+            text=f"general troubleshooting guidance about error handling and retries part {index}",
+            source_type="web",
+            source_uri="https://wiki.example/errors",
+            title="Errors",
+        )
+        for index in range(30)
+    ]
+    chunks[17] = chunks[17].model_copy(update={"text": "KQ-7781 means the upstream quota is exhausted"})
+    store.upsert_chunks(chunks)
+
+    citations, snippets = store.retrieve("what does error KQ-7781 mean", top_k=3)
+    assert citations[0].chunk_id == "doc::17"
+    assert snippets[0].startswith("KQ-7781")
+
+
+def _chunk(index: int, text: str) -> ChunkRecord:
+    return ChunkRecord(
+        chunk_id=f"doc::{index}",
+        document_id="doc",
+        chunk_index=index,
+        text=text,
+        source_type="web",
+        source_uri="https://wiki.example/errors",
+        title="Errors",
+    )
+
+
+def test_lexical_index_is_rebuilt_after_another_process_writes(monkeypatch: pytest.MonkeyPatch, tmp_path) -> None:
+    monkeypatch.setattr(settings, "collection_name", "hybrid_shared")
+    monkeypatch.setattr(settings, "chroma_path", str(tmp_path / "chroma"))
+    store = ChromaVectorStore()
+    store.upsert_chunks([_chunk(index, f"general guidance part {index}") for index in range(5)])
+    assert store._lexical_index().search("KQ-9001", 1) == []
+
+    # Another worker writes through its own client and bumps the shared version; this process's
+    # index never saw the chunk.
+    other = chromadb.PersistentClient(path=settings.chroma_path).get_collection("hybrid_shared")
+    other.upsert(
+        ids=["doc::9"],
+        embeddings=[store.embed_query("KQ-9001 quota exhausted")],
+        documents=["KQ-9001 quota exhausted"],
+        metadatas=[{"document_id": "doc", "chunk_index": 9, "title": "Errors", "source_uri": "x", "source_type": "web"}],
+    )
+    bump_collection_version(tmp_path / "chroma" / "hybrid_shared.version")
+
+    assert [chunk_id for chunk_id, _, _ in store._lexical_index().search("KQ-9001", 1)] == ["doc::9"]
+
+
+def test_lexical_indexes_are_keyed_by_persist_directory(monkeypatch: pytest.MonkeyPatch, tmp_path) -> None:
+    monkeypatch.setattr(settings, "collection_name", "hybrid_same_name")
+    monkeypatch.setattr(settings, "chroma_path", str(tmp_path / "first"))
+    first = ChromaVectorStore()
+    first.upsert_chunks([_chunk(0, "ZX-1 only in the first store"), _chunk(1, "filler text")])
+    first.retrieve("ZX-1", top_k=1)
+
+    monkeypatch.setattr(settings, "chroma_path", str(tmp_path / "second"))
+    second = ChromaVectorStore()
+    second.upsert_chunks([_chunk(0, "filler text"), _chunk(1, "YW-2 only in the second store")])
+
+    assert second.retrieve("YW-2", top_k=1)[0][0].chunk_id == "doc::1"
+    assert first.retrieve("ZX-1", top_k=1)[0][0].chunk_id == "doc::0"
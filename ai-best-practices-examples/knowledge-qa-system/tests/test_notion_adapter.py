@@ -0,0 +1,142 @@
+import asyncio
+import threading
+import time
+from collections import Counter
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.ingestion.adapters import notion_adapter
+from app.ingestion.adapters.notion_adapter import aload_notion_document
+
+PAGE_ID = "0123456789abcdef0123456789abcdef"
+
+
+def _paragraph(block_id: str, text: str, has_children: bool = False, block_type: str = "paragraph") -> dict:
+    return {
+        "id": block_id,
+        "type": block_type,
+        "has_children": has_children,
+        block_type: {"rich_text": [{"plain_text": text}]},
+    }
+
+
+class MockNotion:
+    """In-process stand-in for the Notion API that records calls per path."""
+
+    def __init__(self, delay: float = 0.0, throttle_first: int = 0) -> None:
+        self.delay = delay
+        self.throttle_first = throttle_first
+        self.calls: Counter[str] = Counter()
+        self.last_edited_time = "2026-01-01T00:00:00.000Z"
+        self.children = {
+            PAGE_ID: [
+                [_paragraph("a", "First"), _paragraph("b", "Parent", has_children=True)],
+                [_paragraph("c", "Last"), _paragraph("sub", "Sub page", has_children=True, block_type="child_page")],
+            ],
+            "b": [[_paragraph("b1", "Nested one"), _paragraph("b2", "Nested two")]],
+        }
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        self.calls[path] += 1
+        if self.throttle_first:
+            self.throttle_first -= 1
+            return httpx.Response(429, headers={"Retry-After": "0"})
+        await asyncio.sleep(self.delay)
+        if path.endswith(f"/pages/{PAGE_ID}"):
+            return httpx.Response(
+                200,
+                json={
+                    "last_edited_time": self.last_edited_time,
+                    "properties": {"title": {"title": [{"plain_text": "Runbook"}]}},
+                },
+            )
+        block_id = path.split("/")[-2]
+        pages = self.children.get(block_id, [[]])
+        index = int(request.url.params.get("start_cursor", "0"))
+        has_more = index + 1 < len(pages)
+        return httpx.Response(
+            200,
+            json={"results": pages[index], "has_more": has_more, "next_cursor": str(index + 1) if has_more else None},
+        )
+
+
+@pytest.fixture(autouse=True)
+def _notion_settings(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "notion_token", "secret")
+    monkeypatch.setattr(settings, "notion_backoff_seconds", 0.0)
+    notion_adapter._PAGE_BODY_CACHE.clear()
+
+
+def _load(server: MockNotion):
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(server.handler)) as client:
+            return await aload_notion_document(PAGE_ID, None, client)
+
+    return asyncio.run(run())
+
+
+def test_notion_paginates_and_recurses_in_document_order() -> None:
+    server = MockNotion(throttle_first=1)
+    document = _load(server)
+
+    assert document.title == "Runbook"
+    assert document.text.split("\n") == ["First", "Parent", "Nested one", "Nested two", "Last", "Sub page"]
+    assert server.calls[f"/v1/blocks/{PAGE_ID}/children"] == 2
+    assert server.calls["/v1/blocks/b/children"] == 1
+    assert server.calls["/v1/blocks/sub/children"] == 0
+    assert server.calls[f"/v1/pages/{PAGE_ID}"] == 2  # one 429, one retry
+
+
+def test_notion_skips_block_download_when_page_unchanged() -> None:
+    server = MockNotion()
+    first = _load(server)
+    block_calls = sum(count for path, count in server.calls.items() if "/blocks/" in path)
+
+    second = _load(server)
+    assert second.text == first.text
+    assert sum(count for path, count in server.calls.items() if "/blocks/" in path) == block_calls
+
+    server.last_edited_time = "2026-02-01T00:00:00.000Z"
+    _load(server)
+    assert sum(count for path, count in server.calls.items() if "/blocks/" in path) == 2 * block_calls
+
+
+def test_notion_fetches_sibling_children_concurrently() -> None:
+    server = MockNotion(delay=0.1)
+    server.children = {
+        PAGE_ID: [[_paragraph(f"p{index}", f"Parent {index}", has_children=True) for index in range(4)]],
+        **{f"p{index}": [[_paragraph(f"p{index}c", f"Child {index}")]] for index in range(4)},
+    }
+    started = time.perf_counter()
+    document = _load(server)
+    elapsed = time.perf_counter() - started
+
+    assert document.text.count("Child") == 4
+    # page + top-level children + one parallel round of nested children
+    assert elapsed < 0.45
+
+
+def test_page_body_cache_is_safe_across_threads(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(notion_adapter, "NOTION_PAGE_CACHE_SIZE", 2)
+    errors: list[BaseException] = []
+
+    def churn(worker: int) -> None:
+        try:
+            for index in range(2000):
+                page_id = f"page-{(worker + index) % 5}"
+                notion_adapter._store_page_body(page_id, "t", "body")
+                notion_adapter._cached_page_body(page_id, "t")
+        except BaseException as exc:  # noqa: BLE001
+            errors.append(exc)
+
+    threads = [threading.Thread(target=churn, args=(worker,)) for worker in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(notion_adapter._PAGE_BODY_CACHE) <= 2
@@ -0,0 +1,68 @@
+from app.domain.models import Citation
+from app.domain.services.retrieval_service import RetrievalService
+from app.retrieval.embeddings import HashEmbeddings
+
+
+class CountingVectorStore:
+    def __init__(self) -> None:
+        self.version = 0
+        self.embedded: list[str] = []
+        self.searches = 0
+        self._embeddings = HashEmbeddings(size=32)
+
+    def embed_query(self, query: str) -> list[float]:
+        self.embedded.append(query)
+        return self._embeddings.embed_query(query)
+
+    def search(self, query: str, embedding: list[float], top_k: int) -> tuple[list[Citation], list[str]]:
+        self.searches += 1
+        citation = Citation(chunk_id="doc::0", title="Doc", source_uri="doc", snippet="text", score=0.9)
+        return [citation] * top_k, ["text"] * top_k
+
+
+def test_retrieval_cache_reuses_embeddings_and_results() -> None:
+    store = CountingVectorStore()
+    service = RetrievalService(vector_store=store)
+
+    service.retrieve("What is Chroma?", top_k=2)
+    service.retrieve("What is Chroma?", top_k=2)
+    assert store.embedded == ["What is Chroma?"]
+    assert store.searches == 1
+
+    # Embedded as typed, but the hash embedding ignores case, so the results are shared.
+    service.retrieve("  what is   CHROMA? ", top_k=2)
+    assert store.embedded == ["What is Chroma?", "  what is   CHROMA? "]
+    assert store.searches == 1
+
+    service.retrieve("What is Chroma?", top_k=3)
+    assert store.searches == 2
+
+    metrics = service.cache_metrics()
+    assert metrics["query_embeddings"]["hits"] == 2
+    assert metrics["results"]["hits"] == 2
+
+
+def test_retrieval_cache_embeds_the_raw_query_for_cased_models() -> None:
+    class CasedVectorStore(CountingVectorStore):
+        def embed_query(self, query: str) -> list[float]:
+            self.embedded.append(query)
+            return [float(sum(char.isupper() for char in query)), 1.0]
+
+    store = CasedVectorStore()
+    service = RetrievalService(vector_store=store)
+
+    service.retrieve("Apple earnings", top_k=1)
+    service.retrieve("apple earnings", top_k=1)
+
+    assert store.embedded == ["Apple earnings", "apple earnings"]
+    assert store.searches == 2
+
+
+def test_retrieval_cache_invalidates_on_collection_version() -> None:
+    store = CountingVectorStore()
+    service = RetrievalService(vector_store=store)
+    service.retrieve("pricing", top_k=1)
+    store.version += 1
+    service.retrieve("pricing", top_k=1)
+    assert store.searches == 2
+    assert len(store.embedded) == 1
@@ -0,0 +1,141 @@
+"""Book lookup latency with the CSV rescan versus the in-memory catalog.
+
+Run from the online-bookstore directory:
+
+    python3 benchmarks/bench_catalog.py --books 100000
+
+A synthetic books CSV is written to a temp directory. The rescan baseline is the previous
+``read_book_by_id``: open and parse the CSV on every call, stopping at the matching row. It
+is slow enough that only ``--scan-samples`` random ids are timed. The catalog path is timed
+cold (first load) and warm, both as model lookups and through the ASGI test client, where
+revalidating with the ETag from a previous response (a polling client) gets a 304.
+"""
+
+import argparse
+import csv
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+from unittest.mock import patch
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from catalog import Catalog  # noqa: E402
+from models import BookWithID  # noqa: E402
+from operations import book_column_fields  # noqa: E402
+
+
+def write_books(path: Path, count: int):
+    with open(path, mode="w", newline="", encoding="utf-8") as file:
+        writer = csv.DictWriter(file, fieldnames=book_column_fields)
+        writer.writeheader()
+        for book_id in range(1, count + 1):
+            writer.writerow({
+                "id": book_id,
+                "title": f"Book {book_id}",
+                "authors": f"Author {book_id % 5000}",
+                "published_year": 1950 + book_id % 75,
+                "isbn": f"{9780000000000 + book_id}",
+                "price": round(5 + book_id % 50 + 0.99, 2),
+                "categories": ("Fiction", "History", "Science", "Poetry")[book_id % 4],
+                "description": f"A synthetic description for book number {book_id}.",
+                "cover_image_url": f"https://example.com/covers/{book_id}.jpg",
+                "rating": "" if book_id % 10 == 0 else round(1 + book_id % 40 / 10, 1),
+            })
+
+
+def scan_by_id(path: Path, book_id: int) -> Optional[BookWithID]:
+    with open(path, mode="r", newline="", encoding="utf-8") as file:
+        for row in csv.DictReader(file):
+            if int(row["id"]) == book_id:
+                return BookWithID(
+                    id=int(row["id"]),
+                    title=row["title"],
+                    authors=[row["authors"]],
+                    published_year=int(row["published_year"]),
+                    isbn=row["isbn"],
+                    price=float(row["price"]),
+                    categories=[row["categories"]],
+                    description=row["description"],
+                    cover_image_url=row["cover_image_url"],
+                    rating=float(row["rating"]) if row["rating"] else None,
+                )
+    return None
+
+
+def time_calls(call, ids) -> list[float]:
+    samples = []
+    for book_id in ids:
+        start = time.perf_counter()
+        call(book_id)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def report(label: str, samples: list[float]):
+    samples = sorted(samples)
+    p50 = statistics.median(samples)
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    print(f"{label:<28}{len(samples):>9}{p50 * 1e6:>12.1f}{p99 * 1e6:>12.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--books", type=int, default=100_000)
+    parser.add_argument("--lookups", type=int, default=20_000)
+    parser.add_argument("--requests", type=int, default=2_000)
+    parser.add_argument("--scan-samples", type=int, default=50)
+    parser.add_argument("--list-polls", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "books.csv"
+        write_books(path, args.books)
+        print(f"{args.books} books, {path.stat().st_size / 1e6:.1f} MB CSV\n")
+        print(f"{'path':<28}{'calls':>9}{'p50 us':>12}{'p99 us':>12}")
+
+        report("csv rescan", time_calls(lambda i: scan_by_id(path, i),
+                                        [rng.randint(1, args.books) for _ in range(args.scan_samples)]))
+
+        catalog = Catalog(str(path))
+        start = time.perf_counter()
+        catalog.snapshot()
+        load_seconds = time.perf_counter() - start
+
+        ids = [rng.randint(1, args.books) for _ in range(args.lookups)]
+        report("catalog get (first touch)", time_calls(catalog.get, ids))
+        report("catalog get (warm)", time_calls(catalog.get, ids))
+        report("catalog get_json (first)", time_calls(catalog.get_json, ids))
+        report("catalog get_json (warm)", time_calls(catalog.get_json, ids))
+
+        with patch("operations.BOOK_DATABASE_FILENAME", str(path)):
+            from main import app
+
+            client = TestClient(app)
+            ids = [rng.randint(1, args.books) for _ in range(args.requests)]
+            for book_id in ids:
+                client.get(f"/v1/books/{book_id}")
+            report("GET /v1/books/{id}", time_calls(lambda i: client.get(f"/v1/books/{i}"), ids))
+            etags = {i: client.get(f"/v1/books/{i}").headers["etag"] for i in ids}
+            report("  ... If-None-Match (304)", time_calls(
+                lambda i: client.get(f"/v1/books/{i}", headers={"If-None-Match": etags[i]}), ids))
+
+            polls = range(args.list_polls)
+            report("GET /v1/books", time_calls(lambda _: client.get("/v1/books"), polls))
+            etag = client.get("/v1/books").headers["etag"]
+            report("  ... If-None-Match (304)", time_calls(
+                lambda _: client.get("/v1/books", headers={"If-None-Match": etag}), polls))
+
+        print(f"\ncatalog cold load: {load_seconds * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""/v1/search latency: linear substring scan versus the inverted index.
+
+Run from the online-bookstore directory:
+
+    python3 benchmarks/bench_search.py --books 100000
+
+The scan baseline is the previous ``search_books`` body: lowercase the query, then test it
+against every cached book's title and authors (with ``authors`` joined, since calling
+``.lower()`` on the list raised). The index is built once from the catalog snapshot, timed
+separately, and queried for the first page of 20 results.
+"""
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+from bench_catalog import write_books  # noqa: E402
+from catalog import Catalog, CatalogSnapshot  # noqa: E402
+from search import SearchIndex  # noqa: E402
+
+QUERIES = [
+    "book 4242",
+    "author 17",
+    "poetry",
+    "synthetic description",
+    "hist",
+    "number 99999",
+    "no such title",
+]
+
+
+def scan(books, query: str):
+    query = query.lower()
+    return [
+        book for book in books
+        if query in book.title.lower() or query in " ".join(book.authors).lower()
+    ]
+
+
+def time_queries(search, repeat: int) -> list[float]:
+    samples = []
+    for _ in range(repeat):
+        for query in QUERIES:
+            start = time.perf_counter()
+            search(query)
+            samples.append(time.perf_counter() - start)
+    return samples
+
+
+def report(label: str, samples: list[float]):
+    samples = sorted(samples)
+    p50 = statistics.median(samples)
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    print(f"{label:<16}{len(samples):>9}{p50 * 1e3:>12.2f}{p99 * 1e3:>12.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--books", type=int, default=100_000)
+    parser.add_argument("--scan-repeat", type=int, default=5)
+    parser.add_argument("--index-repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "books.csv"
+        write_books(path, args.books)
+        catalog = Catalog(str(path))
+        books = catalog.all()
+
+        index = SearchIndex()
+        start = time.perf_counter()
+        index.sync(catalog.snapshot())
+        build_seconds = time.perf_counter() - start
+
+        print(f"{args.books} books, {len(QUERIES)} queries\n")
+        print(f"{'path':<16}{'queries':>9}{'p50 ms':>12}{'p99 ms':>12}")
+        report("linear scan", time_queries(lambda query: scan(books, query), args.scan_repeat))
+        report("search index", time_queries(lambda query: index.search(query, limit=20), args.index_repeat))
+
+        # A reload of an unchanged file: every book is compared, none is re-tokenized.
+        reloaded = CatalogSnapshot.load(str(path), catalog.snapshot().version)
+        start = time.perf_counter()
+        index.sync(reloaded)
+        resync_seconds = time.perf_counter() - start
+        print(f"\nindex build: {build_seconds:.2f} s, re-sync after an unchanged reload: {resync_seconds:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
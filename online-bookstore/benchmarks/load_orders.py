@@ -0,0 +1,86 @@
+"""Concurrent order creation: the old read-last-id-then-append path versus the order log.
+
+Run from the online-bookstore directory:
+
+    python3 benchmarks/load_orders.py --threads 1 8 32 --orders 200
+
+Every thread creates ``--orders`` orders against a fresh file in a temp directory. The old
+path is the previous ``create_order``: read the whole CSV to find the last id, then append in
+a separate open, with no fsync. The order log fsyncs every group commit. Both report
+orders/sec and how many ids were handed out more than once.
+"""
+
+import argparse
+import csv
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+from models import Order  # noqa: E402
+from order_store import ORDER_FIELDS, OrderStore  # noqa: E402
+
+ORDER = Order(customer_name="John Doe", customer_email="john.doe@example.com", book_id=1, quantity=2)
+
+
+def legacy_create(path: Path) -> int:
+    with open(path, mode="r", newline="", encoding="utf-8") as file:
+        rows = list(csv.DictReader(file))
+        next_id = int(rows[-1]["id"]) + 1 if rows else 1
+    with open(path, mode="a", newline="", encoding="utf-8") as file:
+        csv.DictWriter(file, fieldnames=ORDER_FIELDS).writerow({"id": next_id, **ORDER.model_dump()})
+    return next_id
+
+
+def run(create, threads: int, orders: int) -> tuple[float, list[int]]:
+    ids: list[int] = []
+    lock = threading.Lock()
+
+    def worker():
+        created = [create() for _ in range(orders)]
+        with lock:
+            ids.extend(created)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return time.perf_counter() - start, ids
+
+
+def duplicates(ids: list[int]) -> int:
+    return sum(count - 1 for count in Counter(ids).values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--orders", type=int, default=200, help="orders per thread")
+    args = parser.parse_args()
+
+    print(f"{'path':<12}{'threads':>8}{'orders':>8}{'orders/s':>12}{'dup ids':>9}{'fsyncs':>8}")
+    for threads in args.threads:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "orders.csv"
+            path.write_text(",".join(ORDER_FIELDS) + "\n")
+            seconds, ids = run(lambda: legacy_create(path), threads, args.orders)
+            print(f"{'csv rescan':<12}{threads:>8}{len(ids):>8}{len(ids) / seconds:>12.0f}{duplicates(ids):>9}{'-':>8}")
+
+            store = OrderStore(str(Path(tmp) / "log.csv"))
+            seconds, ids = run(lambda: store.create(ORDER).id, threads, args.orders)
+            print(
+                f"{'order log':<12}{threads:>8}{len(ids):>8}{len(ids) / seconds:>12.0f}"
+                f"{duplicates(ids):>9}{store.commits:>8}"
+            )
+            store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+import csv
+import math
+import os
+import threading
+from array import array
+from typing import Callable, Optional
+
+from models import BookWithID
+
+
+class CatalogSnapshot:
+    """One load of the books CSV, stored column by column with an id -> row index.
+
+    ``BookWithID`` models and their JSON are built the first time a row is asked for.
+    """
+
+    def __init__(self, version: Optional[tuple[int, int]] = None):
+        self.version = version
+        self.ids = array('q')
+        self.titles: list[str] = []
+        self.authors: list[str] = []
+        self.published_years = array('i')
+        self.isbns: list[str] = []
+        self.prices = array('d')
+        self.categories: list[str] = []
+        self.descriptions: list[str] = []
+        self.cover_image_urls: list[str] = []
+        # NaN marks a missing rating.
+        self.ratings = array('d')
+        self.row_by_id: dict[int, int] = {}
+        self._models: list[Optional[BookWithID]] = []
+        self._json: list[Optional[bytes]] = []
+        self._all_json: Optional[bytes] = None
+
+    @classmethod
+    def load(cls, path: str, version: tuple[int, int]) -> 'CatalogSnapshot':
+        snapshot = cls(version)
+        with open(path, mode='r', newline='', encoding='utf-8') as file:
+            for row in csv.DictReader(file):
+                book_id = int(row['id'])
+                snapshot.row_by_id[book_id] = len(snapshot.ids)
+                snapshot.ids.append(book_id)
+                snapshot.titles.append(row['title'])
+                snapshot.authors.append(row['authors'])
+                snapshot.published_years.append(int(row['published_year']))
+                snapshot.isbns.append(row['isbn'])
+                snapshot.prices.append(float(row['price']))
+                snapshot.categories.append(row['categories'])
+                snapshot.descriptions.append(row['description'])
+                snapshot.cover_image_urls.append(row['cover_image_url'])
+                snapshot.ratings.append(float(row['rating']) if row['rating'] else math.nan)
+        snapshot._models = [None] * len(snapshot.ids)
+        snapshot._json = [None] * len(snapshot.ids)
+        return snapshot
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def book_at(self, row: int) -> BookWithID:
+        book = self._models[row]
+        if book is None:
+            rating = self.ratings[row]
+            book = BookWithID(
+                id=self.ids[row],
+                title=self.titles[row],
+                authors=[self.authors[row]],
+                published_year=self.published_years[row],
+                isbn=self.isbns[row],
+                price=self.prices[row],
+                categories=[self.categories[row]],
+                description=self.descriptions[row],
+                cover_image_url=self.cover_image_urls[row],
+                rating=None if math.isnan(rating) else rating,
+            )
+            self._models[row] = book
+        return book
+
+    def json_at(self, row: int) -> bytes:
+        data = self._json[row]
+        if data is None:
+            data = self._json[row] = self.book_at(row).model_dump_json().encode()
+        return data
+
+    def all_json(self) -> bytes:
+        data = self._all_json
+        if data is None:
+            data = b'[' + b','.join(self.json_at(row) for row in range(len(self.ids))) + b']'
+            self._all_json = data
+        return data
+
+
+class Catalog:
+    """Shared view of a books CSV that reloads only when the file's mtime or size changes.
+
+    Every access stats the file; a reload builds a new ``CatalogSnapshot`` and swaps it in, so
+    concurrent readers never see a half-loaded catalog. Listeners registered with
+    ``add_listener`` are called with each new snapshot, so derived indexes can update in place.
+    They run after the catalog lock is released, one reload at a time and always with the
+    latest snapshot, so a slow listener holds up only the request that triggered the reload.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._snapshot = CatalogSnapshot()
+        self._lock = threading.Lock()
+        self._listeners: list[Callable[[CatalogSnapshot], None]] = []
+        self._notify_lock = threading.Lock()
+        self._notified: Optional[CatalogSnapshot] = None
+
+    def add_listener(self, listener: Callable[[CatalogSnapshot], None]):
+        """Call ``listener`` with the current snapshot now and with every reloaded one after."""
+        self.snapshot()
+        with self._notify_lock:
+            self._listeners.append(listener)
+            listener(self._notified)
+
+    def snapshot(self) -> CatalogSnapshot:
+        try:
+            stat = os.stat(self.path)
+            version = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            version = None
+        snapshot = self._snapshot
+        if version == snapshot.version:
+            return snapshot
+        with self._lock:
+            if version != self._snapshot.version:
+                if version is None:
+                    print(f"Database file {self.path} not found.")
+                    self._snapshot = CatalogSnapshot()
+                else:
+                    self._snapshot = CatalogSnapshot.load(self.path, version)
+            snapshot = self._snapshot
+        self._notify()
+        return snapshot
+
+    def _notify(self):
+        with self._notify_lock:
+            # A later reload may already have notified; listeners only ever move forward.
+            snapshot = self._snapshot
+            if snapshot is self._notified:
+                return
+            for listener in self._listeners:
+                listener(snapshot)
+            self._notified = snapshot
+
+    @property
+    def version(self) -> Optional[tuple[int, int]]:
+        return self.snapshot().version
+
+    def __len__(self) -> int:
+        return len(self.snapshot())
+
+    def get(self, book_id: int) -> Optional[BookWithID]:
+        snapshot = self.snapshot()
+        row = snapshot.row_by_id.get(book_id)
+        return None if row is None else snapshot.book_at(row)
+
+    def get_json(self, book_id: int) -> Optional[bytes]:
+        snapshot = self.snapshot()
+        row = snapshot.row_by_id.get(book_id)
+        return None if row is None else snapshot.json_at(row)
+
+    def all(self) -> list[BookWithID]:
+        snapshot = self.snapshot()
+        return [snapshot.book_at(row) for row in range(len(snapshot))]
+
+    def all_json(self) -> bytes:
+        """The whole catalog as one JSON array, serialized once per file version."""
+        return self.snapshot().all_json()
+
+
+_catalogs: dict[str, Catalog] = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_catalog(path: str) -> Catalog:
+    """Return the shared catalog for ``path``, creating it on first use."""
+    catalog = _catalogs.get(path)
+    if catalog is None:
+        with _catalogs_lock:
+            catalog = _catalogs.setdefault(path, Catalog(path))
+    return catalog
@@ -0,0 +1,86 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Hashable, NamedTuple, Optional
+
+from fastapi.responses import Response
+
+# Clients may keep responses but must revalidate, which costs them a 304 when nothing changed.
+CACHE_CONTROL = 'no-cache'
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    etag: str
+    headers: tuple[tuple[str, str], ...] = ()
+
+
+def strong_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison, as ``If-None-Match`` requires."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def json_response(cached: CachedResponse, if_none_match: Optional[str]) -> Response:
+    """Send the cached body, or an empty 304 if the client already has it."""
+    headers = {'ETag': cached.etag, 'Cache-Control': CACHE_CONTROL, **dict(cached.headers)}
+    if etag_matches(if_none_match, cached.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=cached.body, media_type='application/json', headers=headers)
+
+
+class ResponseCache:
+    """Bounded LRU of serialized responses for one data version at a time.
+
+    Entries are keyed by whatever identifies the request. ``version`` is whatever identifies
+    the data they were built from, compared with ``==``; a ``put`` under a new version drops
+    everything cached for the old one.
+    """
+
+    def __init__(self, max_entries: int = 10_000):
+        self.max_entries = max_entries
+        self._version: object = None
+        self._entries: OrderedDict[Hashable, Optional[CachedResponse]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, version: object, key: Hashable) -> tuple[bool, Optional[CachedResponse]]:
+        """Return ``(hit, response)``; a hit may hold None, a cached "nothing found"."""
+        with self._lock:
+            if version != self._version or key not in self._entries:
+                return False, None
+            self._entries.move_to_end(key)
+            return True, self._entries[key]
+
+    def put(
+        self,
+        version: object,
+        key: Hashable,
+        body: Optional[bytes],
+        headers: tuple[tuple[str, str], ...] = (),
+    ) -> Optional[CachedResponse]:
+        cached = None if body is None else CachedResponse(body, strong_etag(body), headers)
+        with self._lock:
+            if version != self._version:
+                self._version = version
+                self._entries.clear()
+            self._entries[key] = cached
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return cached
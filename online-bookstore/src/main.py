@@ -1,4 +1,6 @@
-from fastapi import Depends, FastAPI, HTTPException, WebSocket
+from typing import Optional
+
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, WebSocket
 from fastapi.responses import JSONResponse
 from fastapi.security import OAuth2PasswordRequestForm
 from models import (
@@ -6,7 +8,9 @@ from models import (
     Order,
     OrderWithID,
 )
-from operations import read_all_books, read_order, create_order
+from operations import book_catalog, read_order, create_order
+from search import get_search_index, tokenize
+from http_cache import ResponseCache, json_response
 
 from security import (
     User,
@@ -18,6 +22,11 @@ from security import (
 )
 app = FastAPI()
 
+# Serialized catalog responses with their ETags, dropped whenever the catalog reloads or,
+# for search, the index changes.
+book_cache = ResponseCache()
+search_cache = ResponseCache(max_entries=1_000)
+
 # Root endpoint
 @app.get("/")
 def read_root():
@@ -25,27 +34,37 @@ def read_root():
 
 
 @app.get("/v1/books", response_model=list[BookWithID])
-def get_books():
+def get_books(if_none_match: Optional[str] = Header(default=None)):
     """Get all books."""
-    books = read_all_books()
-    if not books:
+    snapshot = book_catalog().snapshot()
+    if not len(snapshot):
         raise HTTPException(status_code=404, detail="No books found")
-    return books
+    hit, cached = book_cache.get(snapshot, "books")
+    if not hit:
+        cached = book_cache.put(snapshot, "books", snapshot.all_json())
+    return json_response(cached, if_none_match)
 
 @app.get("/v1/books/{book_id}", response_model=BookWithID)
-def get_book(book_id: int):
+def get_book(book_id: int, if_none_match: Optional[str] = Header(default=None)):
     """Get a book by ID."""
-    from operations import read_book_by_id
-    book = read_book_by_id(book_id)
-    if not book:
+    snapshot = book_catalog().snapshot()
+    key = ("book", book_id)
+    hit, cached = book_cache.get(snapshot, key)
+    if not hit:
+        row = snapshot.row_by_id.get(book_id)
+        cached = book_cache.put(snapshot, key, None if row is None else snapshot.json_at(row))
+    if cached is None:
         raise HTTPException(status_code=404, detail="Book not found")
-    return book
+    return json_response(cached, if_none_match)
 
 
 @app.post("/v1/orders", response_model=OrderWithID)
 def create_order_endpoint(order: Order):
     """Create a new order."""
-    return create_order(order)
+    try:
+        return create_order(order)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
 
 @app.get("/v1/orders/{order_id}", response_model=OrderWithID)
 def get_order(order_id: int):
@@ -56,13 +75,35 @@ def get_order(order_id: int):
     return order
 
 @app.get("/v1/search", response_model=list[BookWithID])
-def search_books(query: str):
-    """Search for books by title or author."""
-    books = read_all_books()
-    results = [book for book in books if query.lower() in book.title.lower() or query.lower() in book.authors.lower()]
-    if not results:
+def search_books(
+    query: str,
+    limit: int = Query(default=20, ge=1, le=100),
+    offset: int = Query(default=0, ge=0),
+    if_none_match: Optional[str] = Header(default=None),
+):
+    """Search books by title, author, category and description, best matches first.
+
+    The total number of matches is returned in the ``X-Total-Count`` header.
+    """
+    catalog = book_catalog()
+    catalog.snapshot()
+    key = ("search", tuple(dict.fromkeys(tokenize(query))), limit, offset)
+    index = get_search_index(catalog)
+    hit, cached = search_cache.get(index.version, key)
+    if not hit:
+        # Pages come from the snapshot the index was synced to, which may trail a reload in progress.
+        version, book_ids, total = index.search_versioned(query, limit=limit, offset=offset)
+        snapshot = version[0]
+        rows = [snapshot.row_by_id[book_id] for book_id in book_ids]
+        cached = search_cache.put(
+            version,
+            key,
+            b'[' + b','.join(snapshot.json_at(row) for row in rows) + b']' if total else None,
+            headers=(("X-Total-Count", str(total)),),
+        )
+    if cached is None:
         raise HTTPException(status_code=404, detail="No books found")
-    return results
+    return json_response(cached, if_none_match)
 
 
 ## custom error handler for 404 Not Found
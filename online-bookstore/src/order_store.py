@@ -0,0 +1,334 @@
+import csv
+import io
+import os
+import threading
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows has no flock; keeping to one writer is then up to the deployment.
+    fcntl = None
+
+from models import Order, OrderWithID
+
+ORDER_FIELDS = ['id', 'customer_name', 'customer_email', 'book_id', 'quantity']
+HEADER = (','.join(ORDER_FIELDS) + '\n').encode()
+
+
+class _Batch:
+    """Log lines waiting for the next group commit."""
+
+    __slots__ = ('entries', 'done', 'error')
+
+    def __init__(self):
+        # (order id, encoded line, is tombstone)
+        self.entries: list[tuple[int, bytes, bool]] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+
+
+class OrderStore:
+    """Append-only order log with an in-memory id -> (offset, length) index.
+
+    The log stays a CSV file with the usual header, one order per line. A delete appends a
+    tombstone (``<id>,,,,``) instead of rewriting the file; once dead lines outnumber
+    ``compact_ratio`` times the live ones (and ``compact_min_dead``), a background thread
+    rewrites the log with live orders only.
+
+    Ids come from a counter seeded with the highest id in the log, so they are never reused.
+    That counter lives in this process, so a log has a single writer: the store holds an
+    exclusive ``flock`` on the file from open to ``close``, and opening a second store on the
+    same path (in this process or another) raises ``RuntimeError``.
+    Writers hand their line to the current batch; the first one to find no write in progress
+    writes the whole batch and fsyncs once for everybody in it (group commit). An order is
+    readable, and ``create`` returns, only after its line is on disk.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        fsync: bool = True,
+        compact_ratio: float = 1.0,
+        compact_min_dead: int = 1000,
+    ):
+        self.path = path
+        self.fsync = fsync
+        self.compact_ratio = compact_ratio
+        self.compact_min_dead = compact_min_dead
+        # Group commits written so far, i.e. fsyncs when ``fsync`` is on.
+        self.commits = 0
+        self._index: dict[int, tuple[int, int]] = {}
+        # Ids with a tombstone queued but not yet on disk; they stay readable until it lands.
+        self._removing: set[int] = set()
+        self._dead = 0
+        self._next_id = 1
+        self._cond = threading.Condition()
+        self._pending = _Batch()
+        self._writing = False
+        self._compacting = False
+        self._lock_fd = self._lock(path)
+        try:
+            self._load()
+            self._open()
+        except BaseException:
+            os.close(self._lock_fd)
+            raise
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def create(self, order: Order) -> OrderWithID:
+        with self._cond:
+            # Allocated and queued under one lock, so the log stays in id order.
+            order_with_id = OrderWithID(id=self._next_id, **order.model_dump())
+            batch = self._enqueue(order_with_id.id, self._encode(order_with_id), tombstone=False)
+            self._next_id += 1
+        self._commit(batch)
+        return order_with_id
+
+    def get(self, order_id: int) -> Optional[OrderWithID]:
+        with self._cond:
+            location = self._index.get(order_id)
+            if location is None:
+                return None
+            line = os.pread(self._read_fd, location[1], location[0])
+        return self._decode(line)
+
+    def all(self) -> list[OrderWithID]:
+        with self._cond:
+            locations = list(self._index.values())
+            lines = [os.pread(self._read_fd, length, offset) for offset, length in locations]
+        return [self._decode(line) for line in lines]
+
+    def remove(self, order_id: int) -> bool:
+        with self._cond:
+            if order_id not in self._index or order_id in self._removing:
+                return False
+            self._removing.add(order_id)
+            batch = self._enqueue(order_id, f'{order_id},,,,\n'.encode(), tombstone=True)
+        self._commit(batch)
+        self._maybe_compact()
+        return True
+
+    def compact(self):
+        """Rewrite the log with only the live orders, atomically."""
+        with self._cond:
+            while self._writing:
+                self._cond.wait()
+            self._writing = True
+            live = list(self._index.items())
+            last_id = self._next_id - 1
+        tmp_path = self.path + '.tmp'
+        tmp_lock_fd = None
+        try:
+            # Locked before it replaces the log, so no other store can slip in between.
+            tmp_lock_fd = self._lock(tmp_path)
+            offsets: dict[int, tuple[int, int]] = {}
+            with open(tmp_path, 'wb') as file:
+                file.write(HEADER)
+                position = len(HEADER)
+                for order_id, (offset, length) in live:
+                    file.write(os.pread(self._read_fd, length, offset))
+                    offsets[order_id] = (position, length)
+                    position += length
+                keep_last_id = last_id > 0 and last_id not in offsets
+                if keep_last_id:
+                    # Keep the highest id on record so a reopened store does not hand it out again.
+                    file.write(f'{last_id},,,,\n'.encode())
+                file.flush()
+                os.fsync(file.fileno())
+            with self._cond:
+                os.replace(tmp_path, self.path)
+                self._close()
+                os.close(self._lock_fd)
+                self._lock_fd, tmp_lock_fd = tmp_lock_fd, None
+                self._open()
+                # Orders deleted while the copy ran are dead again in the new file.
+                self._index = {order_id: offsets[order_id] for order_id in self._index}
+                self._dead = 2 * (len(offsets) - len(self._index)) + keep_last_id
+        finally:
+            if tmp_lock_fd is not None:
+                os.close(tmp_lock_fd)
+            with self._cond:
+                self._writing = False
+                self._compacting = False
+                self._cond.notify_all()
+
+    def close(self):
+        with self._cond:
+            while self._writing:
+                self._cond.wait()
+            self._close()
+            os.close(self._lock_fd)
+
+    def _enqueue(self, order_id: int, line: bytes, tombstone: bool) -> _Batch:
+        batch = self._pending
+        batch.entries.append((order_id, line, tombstone))
+        return batch
+
+    def _commit(self, batch: _Batch):
+        with self._cond:
+            while not batch.done:
+                if self._writing:
+                    self._cond.wait()
+                    continue
+                # Lead the next group commit: everything queued so far goes in one write and fsync.
+                self._writing = True
+                leading = self._pending
+                self._pending = _Batch()
+                start = self._end
+                self._cond.release()
+                try:
+                    self._write(b''.join(line for _, line, _ in leading.entries))
+                except BaseException as exc:
+                    leading.error = exc
+                    end = self._rewind(start)
+                finally:
+                    self._cond.acquire()
+                if leading.error is None:
+                    position = start
+                    for entry_id, entry_line, entry_tombstone in leading.entries:
+                        if entry_tombstone:
+                            del self._index[entry_id]
+                            self._removing.discard(entry_id)
+                            # The order's line and its tombstone.
+                            self._dead += 2
+                        else:
+                            self._index[entry_id] = (position, len(entry_line))
+                        position += len(entry_line)
+                    self._end = position
+                    self.commits += 1
+                else:
+                    self._end = end
+                    self._removing.difference_update(
+                        entry_id for entry_id, _, entry_tombstone in leading.entries if entry_tombstone
+                    )
+                leading.done = True
+                self._writing = False
+                self._cond.notify_all()
+            if batch.error is not None:
+                raise batch.error
+
+    def _write(self, data: bytes):
+        view = memoryview(data)
+        while view:
+            view = view[os.write(self._append_fd, view):]
+        if self.fsync:
+            os.fsync(self._append_fd)
+
+    def _rewind(self, start: int) -> int:
+        """Cut a failed batch back off the log and return where the log now ends.
+
+        None of its lines were acknowledged, so none may turn up on the next load. If the file
+        cannot be truncated, the end is re-read so later offsets still point at their lines.
+        """
+        try:
+            os.ftruncate(self._append_fd, start)
+        except OSError:
+            pass
+        try:
+            return os.fstat(self._append_fd).st_size
+        except OSError:
+            return start
+
+    def _maybe_compact(self):
+        with self._cond:
+            live = len(self._index)
+            if (
+                self._compacting
+                or self._dead < self.compact_min_dead
+                or self._dead < self.compact_ratio * live
+            ):
+                return
+            self._compacting = True
+        threading.Thread(target=self.compact, name='order-store-compaction', daemon=True).start()
+
+    def _load(self):
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            with open(self.path, 'wb') as file:
+                file.write(HEADER)
+            return
+        end = 0
+        removed: set[int] = set()
+        with open(self.path, 'rb') as file:
+            for line in file:
+                offset = end
+                if not line.endswith(b'\n'):
+                    # A write torn by a crash; it was never acknowledged, so drop it.
+                    break
+                end += len(line)
+                if offset == 0 and line.startswith(b'id,'):
+                    continue
+                row = next(csv.reader([line.decode('utf-8')]), [])
+                try:
+                    order_id = int(row[0])
+                except (IndexError, ValueError):
+                    self._dead += 1
+                    continue
+                self._next_id = max(self._next_id, order_id + 1)
+                if len(row) > 3 and row[3] == '':
+                    if self._index.pop(order_id, None) is not None:
+                        self._dead += 1
+                    self._dead += 1
+                    removed.add(order_id)
+                elif order_id in self._index or order_id in removed:
+                    # Ids are never reused, so a second order under one id means the log was
+                    # edited or corrupted; picking either one would silently lose the other.
+                    raise ValueError(f'Duplicate order id {order_id} at byte {offset} of {self.path}')
+                else:
+                    self._index[order_id] = (offset, len(line))
+        if end != os.path.getsize(self.path):
+            os.truncate(self.path, end)
+
+    @staticmethod
+    def _lock(path: str) -> int:
+        fd = os.open(path, os.O_RDONLY | os.O_CREAT, 0o644)
+        if fcntl is not None:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                raise RuntimeError(f'{path} is already open in another order store') from None
+        return fd
+
+    def _open(self):
+        self._append_fd = os.open(self.path, os.O_WRONLY | os.O_APPEND)
+        self._read_fd = os.open(self.path, os.O_RDONLY)
+        self._end = os.fstat(self._append_fd).st_size
+
+    def _close(self):
+        os.close(self._append_fd)
+        os.close(self._read_fd)
+
+    def _encode(self, order: OrderWithID) -> bytes:
+        values = order.model_dump()
+        if any('\n' in str(value) or '\r' in str(value) for value in values.values()):
+            raise ValueError('Order fields cannot contain line breaks')
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator='\n').writerow(values[field] for field in ORDER_FIELDS)
+        return buffer.getvalue().encode('utf-8')
+
+    def _decode(self, line: bytes) -> OrderWithID:
+        row = next(csv.reader([line.decode('utf-8')]))
+        return OrderWithID(
+            id=int(row[0]),
+            customer_name=row[1],
+            customer_email=row[2],
+            book_id=int(row[3]),
+            quantity=int(row[4]),
+        )
+
+
+_stores: dict[str, OrderStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_order_store(path: str) -> OrderStore:
+    """Return the shared order store for ``path``, opening it on first use."""
+    store = _stores.get(path)
+    if store is None:
+        with _stores_lock:
+            store = _stores.get(path)
+            if store is None:
+                store = _stores[path] = OrderStore(path)
+    return store
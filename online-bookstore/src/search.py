@@ -0,0 +1,300 @@
+import bisect
+import heapq
+import math
+import re
+import threading
+from typing import Optional
+
+from catalog import Catalog, CatalogSnapshot
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+# How much a term counts by where it appears in a book.
+FIELD_WEIGHTS = {
+    'title': 3.0,
+    'authors': 2.0,
+    'categories': 1.5,
+    'description': 1.0,
+}
+
+# How much a query token counts by how it matched an indexed term.
+EXACT_MATCH = 1.0
+PREFIX_MATCH = 0.6
+INFIX_MATCH = 0.3
+
+# Shorter query tokens only match whole terms; expanding them would match most of the vocabulary.
+MIN_PREFIX_LENGTH = 2
+MIN_INFIX_LENGTH = 3
+
+
+def tokenize(text: str) -> list[str]:
+    return TOKEN_RE.findall(text.lower())
+
+
+def trigrams(term: str) -> set[str]:
+    return {term[i:i + 3] for i in range(len(term) - 2)}
+
+
+class SearchIndex:
+    """Inverted index over book title, authors, categories and description.
+
+    Each term maps to ``{book id: field weight}``. A query token matches indexed terms
+    exactly, from two characters on as a prefix (binary search over the sorted vocabulary)
+    and from three characters on anywhere inside a term (through a trigram index of the vocabulary).
+    Every query token has to match; books are ranked by the summed match weights scaled
+    up by their rating.
+
+    ``sync`` brings the index in line with a catalog snapshot, re-tokenizing only the books
+    whose indexed fields changed, and is registered as a catalog listener by ``get_search_index``.
+    It applies the changes to a copy and swaps that in, so searches keep running against the
+    previous state meanwhile and never see a half-synced index.
+    """
+
+    def __init__(self):
+        self._postings: dict[str, dict[int, float]] = {}
+        self._terms_by_book: dict[int, tuple[str, ...]] = {}
+        self._documents: dict[int, tuple] = {}
+        self._ratings: dict[int, float] = {}
+        self._terms_by_trigram: dict[str, set[str]] = {}
+        self._vocabulary: list[str] = []
+        self._vocabulary_dirty = False
+        self._synced: Optional[CatalogSnapshot] = None
+        # Bumped on every change, so cached results can tell they are stale.
+        self.generation = 0
+        # Readers and the swap hold ``_lock``; writers also hold ``_write_lock`` for their whole run.
+        self._lock = threading.RLock()
+        self._write_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    @property
+    def version(self) -> tuple[Optional[CatalogSnapshot], int]:
+        """``(snapshot last synced, generation)``, read together."""
+        with self._lock:
+            return self._synced, self.generation
+
+    def upsert(
+        self,
+        book_id: int,
+        title: str,
+        authors: str,
+        categories: str,
+        description: str,
+        rating: Optional[float] = None,
+    ):
+        """Index a book, replacing whatever was indexed under ``book_id``."""
+        document = _document(title, authors, categories, description, rating)
+        with self._write_lock, self._lock:
+            if self._upsert(book_id, document):
+                self.generation += 1
+
+    def remove(self, book_id: int):
+        with self._write_lock, self._lock:
+            if self._remove(book_id):
+                self.generation += 1
+
+    def sync(self, snapshot: CatalogSnapshot):
+        """Apply the difference between what is indexed and ``snapshot``."""
+        with self._write_lock:
+            if snapshot is self._synced:
+                return
+            documents = self._documents
+            changed = []
+            for row, book_id in enumerate(snapshot.ids):
+                document = _document(
+                    snapshot.titles[row],
+                    snapshot.authors[row],
+                    snapshot.categories[row],
+                    snapshot.descriptions[row],
+                    snapshot.ratings[row],
+                )
+                if documents.get(book_id) != document:
+                    changed.append((book_id, document))
+            removed = [book_id for book_id in documents if book_id not in snapshot.row_by_id]
+            staged = None
+            if changed or removed:
+                staged = self._copy()
+                for book_id, document in changed:
+                    staged._upsert(book_id, document)
+                for book_id in removed:
+                    staged._remove(book_id)
+                staged._sorted_vocabulary()
+            with self._lock:
+                if staged is not None:
+                    self._install(staged)
+                    self.generation += 1
+                self._synced = snapshot
+
+    def search(self, query: str, limit: int = 20, offset: int = 0) -> tuple[list[int], int]:
+        """Return ``(book ids for the requested page, total number of matches)``."""
+        with self._lock:
+            return self._search(query, limit, offset)
+
+    def search_versioned(
+        self, query: str, limit: int = 20, offset: int = 0
+    ) -> tuple[tuple[Optional[CatalogSnapshot], int], list[int], int]:
+        """Like ``search``, prefixed with the ``version`` the results were computed against."""
+        with self._lock:
+            return ((self._synced, self.generation), *self._search(query, limit, offset))
+
+    def _search(self, query: str, limit: int, offset: int) -> tuple[list[int], int]:
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return [], 0
+        postings = self._postings
+        expansions = sorted(
+            (self._expand(token) for token in tokens),
+            key=lambda terms: sum(len(postings[term]) for term in terms),
+        )
+        # Score the rarest token in full, then only look up the remaining candidates.
+        scores = self._match(expansions[0])
+        for terms in expansions[1:]:
+            if not scores:
+                break
+            matched = [(postings[term], quality) for term, quality in terms.items()]
+            next_scores: dict[int, float] = {}
+            for book_id, score in scores.items():
+                best = 0.0
+                for term_postings, quality in matched:
+                    weight = term_postings.get(book_id)
+                    if weight is not None and quality * weight > best:
+                        best = quality * weight
+                if best:
+                    next_scores[book_id] = score + best
+            scores = next_scores
+        ratings = self._ratings
+        ranked = heapq.nsmallest(
+            offset + limit,
+            scores,
+            key=lambda book_id: (-scores[book_id] * (1 + ratings[book_id] / 10), book_id),
+        )
+        return ranked[offset:], len(scores)
+
+    def _upsert(self, book_id: int, document: tuple) -> bool:
+        if self._documents.get(book_id) == document:
+            return False
+        self._remove(book_id)
+        weights: dict[str, float] = {}
+        for field, text in zip(FIELD_WEIGHTS, document):
+            for term in set(tokenize(text)):
+                weights[term] = weights.get(term, 0.0) + FIELD_WEIGHTS[field]
+        for term, weight in weights.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                self._add_term(term)
+            postings[book_id] = weight
+        self._terms_by_book[book_id] = tuple(weights)
+        self._documents[book_id] = document
+        self._ratings[book_id] = document[-1] or 0.0
+        return True
+
+    def _remove(self, book_id: int) -> bool:
+        if self._documents.pop(book_id, None) is None:
+            return False
+        del self._ratings[book_id]
+        for term in self._terms_by_book.pop(book_id):
+            postings = self._postings[term]
+            del postings[book_id]
+            if not postings:
+                del self._postings[term]
+                self._remove_term(term)
+        return True
+
+    def _copy(self) -> 'SearchIndex':
+        # Only writers mutate, and the caller holds the write lock, so no read lock is needed.
+        copy = SearchIndex()
+        copy._postings = {term: dict(postings) for term, postings in self._postings.items()}
+        copy._terms_by_book = dict(self._terms_by_book)
+        copy._documents = dict(self._documents)
+        copy._ratings = dict(self._ratings)
+        copy._terms_by_trigram = {gram: set(terms) for gram, terms in self._terms_by_trigram.items()}
+        copy._vocabulary = self._vocabulary
+        copy._vocabulary_dirty = self._vocabulary_dirty
+        return copy
+
+    def _install(self, staged: 'SearchIndex'):
+        self._postings = staged._postings
+        self._terms_by_book = staged._terms_by_book
+        self._documents = staged._documents
+        self._ratings = staged._ratings
+        self._terms_by_trigram = staged._terms_by_trigram
+        self._vocabulary = staged._vocabulary
+        self._vocabulary_dirty = staged._vocabulary_dirty
+
+    def _match(self, terms: dict[str, float]) -> dict[int, float]:
+        """Score every book containing one of ``terms``, keeping its best match."""
+        if len(terms) == 1:
+            term, quality = next(iter(terms.items()))
+            if quality == EXACT_MATCH:
+                return self._postings[term]
+            return {book_id: quality * weight for book_id, weight in self._postings[term].items()}
+        scores: dict[int, float] = {}
+        for term, quality in terms.items():
+            for book_id, weight in self._postings[term].items():
+                score = quality * weight
+                if score > scores.get(book_id, 0.0):
+                    scores[book_id] = score
+        return scores
+
+    def _expand(self, token: str) -> dict[str, float]:
+        matches: dict[str, float] = {}
+        if len(token) >= MIN_INFIX_LENGTH:
+            grams = sorted(trigrams(token), key=lambda gram: len(self._terms_by_trigram.get(gram, ())))
+            candidates = set(self._terms_by_trigram.get(grams[0], ()))
+            for gram in grams[1:]:
+                candidates &= self._terms_by_trigram.get(gram, set())
+            for term in candidates:
+                if token in term:
+                    matches[term] = INFIX_MATCH
+        if len(token) >= MIN_PREFIX_LENGTH:
+            vocabulary = self._sorted_vocabulary()
+            start = bisect.bisect_left(vocabulary, token)
+            for term in vocabulary[start:bisect.bisect_left(vocabulary, token + '\uffff', start)]:
+                matches[term] = PREFIX_MATCH
+        if token in self._postings:
+            matches[token] = EXACT_MATCH
+        return matches
+
+    def _sorted_vocabulary(self) -> list[str]:
+        if self._vocabulary_dirty:
+            self._vocabulary = sorted(self._postings)
+            self._vocabulary_dirty = False
+        return self._vocabulary
+
+    def _add_term(self, term: str):
+        self._vocabulary_dirty = True
+        for gram in trigrams(term):
+            self._terms_by_trigram.setdefault(gram, set()).add(term)
+
+    def _remove_term(self, term: str):
+        self._vocabulary_dirty = True
+        for gram in trigrams(term):
+            terms = self._terms_by_trigram[gram]
+            terms.discard(term)
+            if not terms:
+                del self._terms_by_trigram[gram]
+
+
+def _document(title: str, authors: str, categories: str, description: str, rating: Optional[float]) -> tuple:
+    if rating is not None and math.isnan(rating):
+        rating = None
+    return (title, authors, categories, description, rating)
+
+
+_indexes: dict[str, SearchIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_search_index(catalog: Catalog) -> SearchIndex:
+    """Return the search index kept in sync with ``catalog``, building it on first use."""
+    index = _indexes.get(catalog.path)
+    if index is None:
+        with _indexes_lock:
+            index = _indexes.get(catalog.path)
+            if index is None:
+                index = SearchIndex()
+                catalog.add_listener(index.sync)
+                _indexes[catalog.path] = index
+    return index
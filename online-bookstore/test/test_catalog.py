@@ -0,0 +1,61 @@
+import csv
+import json
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from catalog import Catalog
+from operations import book_column_fields
+from test.conftest import TEST_BOOKS, TEST_BOOKS_CSV
+
+
+def write_books(path, rows):
+    with open(path, mode='w', newline='', encoding='utf-8') as file:
+        writer = csv.DictWriter(file, fieldnames=book_column_fields)
+        writer.writeheader()
+        writer.writerows(rows)
+
+def test_get_uses_id_index(tmp_path):
+    path = tmp_path / 'books.csv'
+    write_books(path, TEST_BOOKS_CSV)
+    catalog = Catalog(str(path))
+    book = catalog.get(2)
+    assert book.title == "Test Book 2"
+    assert book.authors == ["Author B"]
+    assert catalog.get(9999) is None
+    assert len(catalog) == 2
+
+def test_books_are_built_once(tmp_path):
+    path = tmp_path / 'books.csv'
+    write_books(path, TEST_BOOKS_CSV)
+    catalog = Catalog(str(path))
+    assert catalog.get(1) is catalog.get(1)
+    assert catalog.get_json(1) is catalog.get_json(1)
+    assert catalog.all_json() is catalog.all_json()
+
+def test_cached_json_matches_models(tmp_path):
+    path = tmp_path / 'books.csv'
+    write_books(path, TEST_BOOKS_CSV)
+    catalog = Catalog(str(path))
+    assert json.loads(catalog.get_json(1)) == catalog.get(1).model_dump()
+    assert [book["id"] for book in json.loads(catalog.all_json())] == [book["id"] for book in TEST_BOOKS]
+
+def test_missing_rating_round_trips_as_none(tmp_path):
+    path = tmp_path / 'books.csv'
+    write_books(path, [{**TEST_BOOKS_CSV[0], "rating": ""}])
+    assert Catalog(str(path)).get(1).rating is None
+
+def test_reloads_only_when_file_changes(tmp_path):
+    path = tmp_path / 'books.csv'
+    write_books(path, TEST_BOOKS_CSV)
+    catalog = Catalog(str(path))
+    snapshot = catalog.snapshot()
+    assert catalog.snapshot() is snapshot
+
+    write_books(path, TEST_BOOKS_CSV + [{**TEST_BOOKS_CSV[0], "id": 3, "title": "Test Book 3"}])
+    assert catalog.snapshot() is not snapshot
+    assert catalog.get(3).title == "Test Book 3"
+
+def test_missing_file_is_an_empty_catalog(tmp_path):
+    catalog = Catalog(str(tmp_path / 'missing.csv'))
+    assert len(catalog) == 0
+    assert catalog.all_json() == b'[]'
@@ -0,0 +1,43 @@
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from http_cache import ResponseCache, etag_matches, strong_etag
+
+
+def test_etag_matching():
+    etag = strong_etag(b'[]')
+    assert etag.startswith('"') and etag.endswith('"')
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches('*', etag)
+    assert not etag_matches('"other"', etag)
+    assert not etag_matches(None, etag)
+
+def test_cache_hits_within_a_version():
+    cache = ResponseCache()
+    version = object()
+    assert cache.get(version, "books") == (False, None)
+    cached = cache.put(version, "books", b'[]')
+    assert cache.get(version, "books") == (True, cached)
+
+def test_cache_remembers_misses():
+    cache = ResponseCache()
+    cache.put(1, ("book", 9), None)
+    assert cache.get(1, ("book", 9)) == (True, None)
+
+def test_new_version_drops_old_entries():
+    cache = ResponseCache()
+    cache.put(1, "a", b'1')
+    cache.put(2, "b", b'2')
+    assert cache.get(1, "a") == (False, None)
+    assert cache.get(2, "a") == (False, None)
+    assert len(cache) == 1
+
+def test_least_recently_used_entries_are_evicted():
+    cache = ResponseCache(max_entries=2)
+    cache.put(1, "a", b'1')
+    cache.put(1, "b", b'2')
+    cache.get(1, "a")
+    cache.put(1, "c", b'3')
+    assert cache.get(1, "b") == (False, None)
+    assert cache.get(1, "a")[0]
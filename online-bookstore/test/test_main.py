@@ -73,4 +73,54 @@ def test_get_order():
     assert "customer_name" in order
     assert "customer_email" in order
     assert "book_id" in order
-    assert "quantity" in order
\ No newline at end of file
+    assert "quantity" in order
+
+def test_search_books_by_title():
+    response = client.get("/v1/search", params={"query": "test book 2"})
+    assert response.status_code == 200
+    books = response.json()
+    assert books[0]["title"] == "Test Book 2"
+
+def test_search_books_by_author():
+    response = client.get("/v1/search", params={"query": "author b"})
+    assert response.status_code == 200
+    assert response.json()[0]["authors"] == ["Author B"]
+
+def test_search_books_paginates():
+    response = client.get("/v1/search", params={"query": "test", "limit": 1, "offset": 1})
+    assert response.status_code == 200
+    assert len(response.json()) == 1
+    assert response.headers["x-total-count"] == "2"
+
+def test_search_books_no_match():
+    response = client.get("/v1/search", params={"query": "nonexistent"})
+    assert response.status_code == 404
+    assert response.json()["detail"] == "No books found"
+
+def test_get_book_sends_etag_and_honours_if_none_match():
+    response = client.get("/v1/books/1")
+    etag = response.headers["etag"]
+    assert response.headers["cache-control"] == "no-cache"
+    cached = client.get("/v1/books/1", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["etag"] == etag
+
+def test_get_books_and_search_honour_if_none_match():
+    for path, params in (("/v1/books", None), ("/v1/search", {"query": "test"})):
+        response = client.get(path, params=params)
+        assert response.status_code == 200
+        cached = client.get(path, params=params, headers={"If-None-Match": response.headers["etag"]})
+        assert cached.status_code == 304
+    assert cached.headers["x-total-count"] == "2"
+
+def test_etag_changes_with_the_catalog():
+    from test.conftest import TEST_BOOKS_CSV
+    from test.test_catalog import write_books
+    from operations import BOOK_DATABASE_FILENAME
+    etag = client.get("/v1/books/1").headers["etag"]
+    write_books(BOOK_DATABASE_FILENAME, [{**TEST_BOOKS_CSV[0], "price": 9.99}, TEST_BOOKS_CSV[1]])
+    response = client.get("/v1/books/1", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["price"] == 9.99
+    assert response.headers["etag"] != etag
@@ -0,0 +1,176 @@
+import sys
+import os
+import threading
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+import pytest
+from models import Order
+from order_store import OrderStore
+
+
+def make_order(name="John Doe", book_id=1):
+    return Order(customer_name=name, customer_email="john.doe@example.com", book_id=book_id, quantity=2)
+
+def test_create_and_get(tmp_path):
+    store = OrderStore(str(tmp_path / 'orders.csv'))
+    first = store.create(make_order())
+    second = store.create(make_order("Jane Smith", 3))
+    assert (first.id, second.id) == (1, 2)
+    assert store.get(2) == second
+    assert store.get(3) is None
+    assert store.all() == [first, second]
+
+def test_log_survives_reopen(tmp_path):
+    path = str(tmp_path / 'orders.csv')
+    store = OrderStore(path)
+    created = store.create(make_order())
+    store.close()
+    reopened = OrderStore(path)
+    assert reopened.get(created.id) == created
+    assert reopened.create(make_order()).id == 2
+
+def test_reads_existing_csv(tmp_path):
+    path = tmp_path / 'orders.csv'
+    path.write_text(
+        "id,customer_name,customer_email,book_id,quantity\n"
+        "1,John Doe,john.doe@example.com,1,2\n"
+        "7,\"Doe, Jane\",jane@example.com,3,1\n"
+    )
+    store = OrderStore(str(path))
+    assert store.get(7).customer_name == "Doe, Jane"
+    assert store.create(make_order()).id == 8
+
+def test_remove_writes_tombstone_and_never_reuses_ids(tmp_path):
+    path = str(tmp_path / 'orders.csv')
+    store = OrderStore(path)
+    store.create(make_order())
+    second = store.create(make_order())
+    assert store.remove(second.id)
+    assert not store.remove(second.id)
+    assert store.get(second.id) is None
+    store.close()
+    reopened = OrderStore(path)
+    assert reopened.get(second.id) is None
+    assert len(reopened) == 1
+    assert reopened.create(make_order()).id == 3
+
+def test_torn_tail_is_dropped(tmp_path):
+    path = tmp_path / 'orders.csv'
+    store = OrderStore(str(path))
+    store.create(make_order())
+    store.close()
+    with open(path, 'ab') as file:
+        file.write(b'2,Half Writ')
+    reopened = OrderStore(str(path))
+    assert len(reopened) == 1
+    assert reopened.create(make_order()).id == 2
+    assert reopened.get(2) is not None
+
+def test_compaction_drops_dead_lines(tmp_path):
+    path = tmp_path / 'orders.csv'
+    store = OrderStore(str(path), compact_min_dead=0)
+    orders = [store.create(make_order()) for _ in range(10)]
+    for order in orders[:8]:
+        store.remove(order.id)
+    store.compact()
+    assert store.all() == orders[8:]
+    assert len(path.read_text().splitlines()) == 3
+    assert store.create(make_order()).id == 11
+
+def test_line_breaks_are_rejected(tmp_path):
+    store = OrderStore(str(tmp_path / 'orders.csv'))
+    with pytest.raises(ValueError):
+        store.create(make_order("John\nDoe"))
+
+def test_concurrent_creates_get_unique_ids_and_share_commits(tmp_path):
+    store = OrderStore(str(tmp_path / 'orders.csv'))
+    created = []
+
+    def worker():
+        for _ in range(50):
+            created.append(store.create(make_order()).id)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(created) == list(range(1, 401))
+    assert len(store) == 400
+    # Writers that queue up behind a commit in progress share the next one.
+    assert store.commits < 400
+
+def test_failed_write_is_cut_back_off_the_log(tmp_path, monkeypatch):
+    path = str(tmp_path / 'orders.csv')
+    store = OrderStore(path)
+    first = store.create(make_order())
+    write = os.write
+
+    def short_write_then_fail(fd, data):
+        write(fd, bytes(data[:10]))
+        raise OSError(28, "No space left on device")
+
+    monkeypatch.setattr("order_store.os.write", short_write_then_fail)
+    with pytest.raises(OSError):
+        store.create(make_order("Lost"))
+    monkeypatch.undo()
+
+    third = store.create(make_order("Jane Smith", 3))
+    assert store.all() == [first, third]
+    store.close()
+    assert OrderStore(path).all() == [first, third]
+
+def test_failed_remove_keeps_the_order(tmp_path, monkeypatch):
+    path = str(tmp_path / 'orders.csv')
+    store = OrderStore(path)
+    order = store.create(make_order())
+
+    def fail(fd, data):
+        raise OSError(28, "No space left on device")
+
+    monkeypatch.setattr("order_store.os.write", fail)
+    with pytest.raises(OSError):
+        store.remove(order.id)
+    monkeypatch.undo()
+
+    assert store.get(order.id) == order
+    assert store.remove(order.id)
+    assert store.get(order.id) is None
+    store.close()
+    assert OrderStore(path).all() == []
+
+def test_log_has_a_single_writer(tmp_path):
+    path = str(tmp_path / 'orders.csv')
+    store = OrderStore(path, compact_min_dead=0)
+    with pytest.raises(RuntimeError, match="already open"):
+        OrderStore(path)
+    # The lock moves to the compacted file along with the log.
+    store.remove(store.create(make_order()).id)
+    store.compact()
+    with pytest.raises(RuntimeError, match="already open"):
+        OrderStore(path)
+    store.close()
+    assert OrderStore(path).create(make_order()).id == 2
+
+def test_duplicate_ids_in_the_log_fail_loudly(tmp_path):
+    path = tmp_path / 'orders.csv'
+    path.write_text(
+        "id,customer_name,customer_email,book_id,quantity\n"
+        "1,John Doe,john.doe@example.com,1,2\n"
+        "1,Jane Doe,jane@example.com,3,1\n"
+    )
+    with pytest.raises(ValueError, match="Duplicate order id 1"):
+        OrderStore(str(path))
+
+def test_compaction_runs_in_background_once_enough_is_dead(tmp_path):
+    path = tmp_path / 'orders.csv'
+    store = OrderStore(str(path), compact_min_dead=4)
+    orders = [store.create(make_order()) for _ in range(4)]
+    store.remove(orders[0].id)
+    store.remove(orders[1].id)
+    for _ in range(100):
+        if len(path.read_text().splitlines()) == 3:
+            break
+        time.sleep(0.01)
+    assert len(path.read_text().splitlines()) == 3
+    assert store.all() == orders[2:]
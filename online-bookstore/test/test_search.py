@@ -0,0 +1,95 @@
+import sys
+import os
+import threading
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from catalog import Catalog
+from search import SearchIndex, get_search_index
+from test.conftest import TEST_BOOKS_CSV
+from test.test_catalog import write_books
+
+
+def build_index():
+    index = SearchIndex()
+    index.upsert(1, "The Hobbit", "J. R. R. Tolkien", "Fantasy", "A hobbit goes on an adventure.", 4.7)
+    index.upsert(2, "Dune", "Frank Herbert", "Science Fiction", "Spice, sand and a desert planet.", 4.5)
+    index.upsert(3, "Fantasy Writing Handbook", "Jane Doe", "Reference", "How to write fantasy novels.", 3.0)
+    return index
+
+def test_every_query_token_must_match():
+    index = build_index()
+    assert index.search("desert planet") == ([2], 1)
+    assert index.search("desert hobbit") == ([], 0)
+
+def test_title_matches_outrank_description_matches():
+    ids, total = build_index().search("fantasy")
+    assert total == 2
+    assert ids[0] == 3
+
+def test_prefix_and_infix_matches():
+    index = build_index()
+    assert index.search("tolk")[0] == [1]
+    assert index.search("erber")[0] == [2]
+
+def test_exact_match_outranks_prefix_match():
+    index = SearchIndex()
+    index.upsert(1, "Sandman", "", "", "")
+    index.upsert(2, "Sand", "", "", "")
+    assert index.search("sand")[0] == [2, 1]
+
+def test_rating_breaks_ties():
+    index = SearchIndex()
+    index.upsert(1, "Poems", "", "", "", 2.0)
+    index.upsert(2, "Poems", "", "", "", 4.0)
+    index.upsert(3, "Poems", "", "", "", None)
+    assert index.search("poems")[0] == [2, 1, 3]
+
+def test_limit_and_offset():
+    index = build_index()
+    assert index.search("fantasy", limit=1, offset=1) == ([1], 2)
+    assert index.search("fantasy", limit=1, offset=2) == ([], 2)
+
+def test_upsert_and_remove_update_the_index():
+    index = build_index()
+    index.upsert(2, "Dune Messiah", "Frank Herbert", "Science Fiction", "Paul's rule.", 4.0)
+    assert index.search("desert")[0] == []
+    assert index.search("messiah")[0] == [2]
+    index.remove(2)
+    assert index.search("herbert") == ([], 0)
+    assert len(index) == 2
+
+def test_index_follows_catalog_reloads(tmp_path):
+    path = tmp_path / 'books.csv'
+    write_books(path, TEST_BOOKS_CSV)
+    catalog = Catalog(str(path))
+    index = get_search_index(catalog)
+    assert index.search("unit testing")[1] == 2
+
+    write_books(path, [TEST_BOOKS_CSV[0], {**TEST_BOOKS_CSV[1], "id": 3, "title": "Renamed"}])
+    catalog.snapshot()
+    assert index.search("renamed")[0] == [3]
+    assert index.search("book 2")[0] == []
+    assert len(index) == 2
+
+def test_searches_use_the_previous_index_while_a_sync_runs(tmp_path, monkeypatch):
+    path = tmp_path / 'books.csv'
+    write_books(path, TEST_BOOKS_CSV)
+    catalog = Catalog(str(path))
+    index = get_search_index(catalog)
+    seen = []
+    copy = SearchIndex._copy
+
+    def copy_then_search(self):
+        staged = copy(self)
+        # Another request arrives mid-sync: neither the catalog nor the index is locked against it.
+        searcher = threading.Thread(
+            target=lambda: seen.append((catalog._lock.locked(), index.search("renamed"), index.search("unit testing")[1]))
+        )
+        searcher.start()
+        searcher.join(timeout=5)
+        return staged
+
+    monkeypatch.setattr(SearchIndex, "_copy", copy_then_search)
+    write_books(path, [TEST_BOOKS_CSV[0], {**TEST_BOOKS_CSV[1], "id": 3, "title": "Renamed"}])
+    catalog.snapshot()
+    assert seen == [(False, ([], 0), 2)]
+    assert index.search("renamed")[0] == [3]
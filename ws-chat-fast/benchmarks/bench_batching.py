@@ -0,0 +1,156 @@
+"""Frames/sec and bytes on the wire with and without batching and permessage-deflate.
+
+Run from the ws-chat-fast directory:
+
+    python3 benchmarks/bench_batching.py --receivers 50 --messages 2000
+
+For each combination a uvicorn server is started with ``WS_CHAT_BATCH_WINDOW_MS`` set or
+unset, and clients connect through a TCP proxy that counts server-to-client bytes. One
+sender posts ``--messages`` chat lines at ``--rate`` per second, then an end marker; every
+receiver counts frames and chat messages until the marker arrives. Messages shed by the
+slow-consumer policy show up as ``delivered`` below 100%. uvicorn negotiates
+permessage-deflate whenever the client offers it, so "deflate" here is the client's offer.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import websockets
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class CountingProxy:
+    def __init__(self, upstream_port: int):
+        self.upstream_port = upstream_port
+        self.downstream_bytes = 0
+
+    async def start(self) -> int:
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def _pipe(self, reader, writer, count: bool):
+        try:
+            while data := await reader.read(65536):
+                if count:
+                    self.downstream_bytes += len(data)
+                writer.write(data)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _handle(self, client_reader, client_writer):
+        upstream_reader, upstream_writer = await asyncio.open_connection("127.0.0.1", self.upstream_port)
+        await asyncio.gather(
+            self._pipe(client_reader, upstream_writer, count=False),
+            self._pipe(upstream_reader, client_writer, count=True),
+        )
+
+
+END_MARKER = "__end__"
+
+
+async def _receiver(url: str, compression, ready: asyncio.Event, counts: list[tuple[int, int]]):
+    frames = messages = 0
+    async with websockets.connect(url, compression=compression, max_queue=None) as ws:
+        ready.set()
+        done = False
+        while not done:
+            payload = json.loads(await ws.recv())
+            items = payload if isinstance(payload, list) else [payload]
+            bench = [item["message"] for item in items if isinstance(item, dict) and item.get("sender") == "sender"]
+            if bench:
+                frames += 1
+                done = END_MARKER in bench
+                messages += len(bench) - done
+    counts.append((frames, messages))
+
+
+async def _scenario(port: int, args, compression) -> tuple[float, int, int, int]:
+    proxy = CountingProxy(port)
+    proxy_port = await proxy.start()
+    base = f"ws://127.0.0.1:{proxy_port}/chatroom"
+    counts: list[tuple[int, int]] = []
+    ready_events = [asyncio.Event() for _ in range(args.receivers)]
+    receivers = [
+        asyncio.create_task(_receiver(f"{base}/r{index}?room=bench", compression, ready, counts))
+        for index, ready in enumerate(ready_events)
+    ]
+    await asyncio.gather(*(event.wait() for event in ready_events))
+    await asyncio.sleep(0.5)
+    proxy.downstream_bytes = 0
+
+    async with websockets.connect(f"{base}/sender?room=bench", compression=compression) as sender:
+        start = time.perf_counter()
+        for index in range(args.messages):
+            await sender.send(f"message number {index} with some typical chat text in it")
+            await asyncio.sleep(max(0.0, start + (index + 1) / args.rate - time.perf_counter()))
+        await sender.send(END_MARKER)
+        await asyncio.wait_for(asyncio.gather(*receivers), timeout=120)
+        elapsed = time.perf_counter() - start
+    proxy.server.close()
+    frames = sum(frame_count for frame_count, _ in counts)
+    messages = sum(message_count for _, message_count in counts)
+    return elapsed, frames, messages, proxy.downstream_bytes
+
+
+def _run(args, batch_ms: int, compression) -> None:
+    port = _free_port()
+    env = dict(os.environ, WS_CHAT_BATCH_WINDOW_MS=str(batch_ms), PYTHONPATH=str(ROOT))
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "ws_chat.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        for _ in range(100):
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+                break
+            except OSError:
+                time.sleep(0.1)
+        elapsed, frames, messages, wire_bytes = asyncio.run(_scenario(port, args, compression))
+    finally:
+        server.terminate()
+        server.wait()
+    expected = args.messages * args.receivers
+    label = f"batch={'%dms' % batch_ms if batch_ms else 'off':<5} compression={compression or 'off':<7}"
+    print(
+        f"{label}  {elapsed:6.2f}s  delivered={messages / expected:6.1%}  "
+        f"frames={frames:>8,} ({frames / elapsed:>8,.0f}/s)  wire={wire_bytes / 2**20:7.2f}MiB "
+        f"({wire_bytes / max(1, messages):6.1f}B/msg)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--receivers", type=int, default=50)
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--rate", type=float, default=500.0, help="messages per second from the sender")
+    parser.add_argument("--batch-ms", type=int, default=15)
+    args = parser.parse_args()
+
+    for batch_ms in (0, args.batch_ms):
+        for compression in (None, "deflate"):
+            _run(args, batch_ms, compression)
+
+
+if __name__ == "__main__":
+    main()
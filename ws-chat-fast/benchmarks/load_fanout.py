@@ -0,0 +1,115 @@
+"""Fan-out latency with thousands of simulated clients, some of them slow.
+
+Run from the ws-chat-fast directory:
+
+    python3 benchmarks/load_fanout.py --clients 5000 --messages 50 --slow-fraction 0.01
+
+Each simulated socket records when a frame reaches it. Healthy sockets take one event-loop
+turn per send; slow ones sleep ``--slow-delay`` seconds per frame. Latency is measured from
+the ``broadcast`` call to arrival at each healthy client. ``inline`` awaits every send
+before the broadcast returns, as the manager did before per-connection outboxes; it is
+shown for comparison.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+
+from ws_chat.ws_manager import ConnectionManager, OverflowPolicy
+
+
+# Payload text -> broadcast start, so sockets need not parse what they receive.
+SENT_AT: dict[str, float] = {}
+
+
+class SimulatedSocket:
+    def __init__(self, slow_delay: float | None, latencies: list[float]):
+        self.slow_delay = slow_delay
+        self.latencies = latencies
+
+    async def accept(self):
+        return None
+
+    async def send(self, message: dict):
+        if self.slow_delay is None:
+            await asyncio.sleep(0)
+            self.latencies.append(time.perf_counter() - SENT_AT[message["text"]])
+        else:
+            await asyncio.sleep(self.slow_delay)
+
+    async def close(self, code: int = 1000):
+        return None
+
+
+def _report(label: str, latencies: list[float], broadcast_times: list[float]):
+    ordered = sorted(latencies)
+
+    def pct(p: float) -> float:
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p))] * 1e3
+
+    print(
+        f"{label:<12} deliveries={len(ordered):>8,}  p50={pct(0.50):8.2f}ms  p90={pct(0.90):8.2f}ms  "
+        f"p99={pct(0.99):8.2f}ms  max={ordered[-1] * 1e3:8.2f}ms  "
+        f"broadcast call p50={statistics.median(broadcast_times) * 1e3:7.2f}ms"
+    )
+
+
+async def _run_queued(args, policy: OverflowPolicy):
+    latencies: list[float] = []
+    manager = ConnectionManager(max_queue=args.max_queue, overflow=policy)
+    rng = random.Random(args.seed)
+    for _ in range(args.clients):
+        slow = rng.random() < args.slow_fraction
+        await manager.connect(SimulatedSocket(args.slow_delay if slow else None, latencies))
+
+    broadcast_times = []
+    for index in range(args.messages):
+        message = {"sender": "load", "message": index}
+        start = SENT_AT[manager._encode(message)] = time.perf_counter()
+        await manager.broadcast(message)
+        broadcast_times.append(time.perf_counter() - start)
+        await asyncio.sleep(args.interval)
+    await asyncio.sleep(0.2)
+    await manager.close()
+    _report(policy.value, latencies, broadcast_times)
+
+
+async def _run_inline(args):
+    latencies: list[float] = []
+    rng = random.Random(args.seed)
+    sockets = [
+        SimulatedSocket(args.slow_delay if rng.random() < args.slow_fraction else None, latencies)
+        for _ in range(args.clients)
+    ]
+    broadcast_times = []
+    for index in range(args.messages):
+        text = json.dumps({"sender": "load", "message": index})
+        start = SENT_AT[text] = time.perf_counter()
+        await asyncio.gather(*(socket.send({"type": "websocket.send", "text": text}) for socket in sockets))
+        broadcast_times.append(time.perf_counter() - start)
+        await asyncio.sleep(args.interval)
+    _report("inline", latencies, broadcast_times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=5000)
+    parser.add_argument("--messages", type=int, default=50)
+    parser.add_argument("--interval", type=float, default=0.1, help="seconds between broadcasts")
+    parser.add_argument("--slow-fraction", type=float, default=0.01)
+    parser.add_argument("--slow-delay", type=float, default=0.05)
+    parser.add_argument("--max-queue", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"clients={args.clients:,} messages={args.messages} slow={args.slow_fraction:.1%}")
+    asyncio.run(_run_inline(args))
+    for policy in OverflowPolicy:
+        asyncio.run(_run_queued(args, policy))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+import asyncio
+import json
+
+from ws_chat.broker import InMemoryBroker, RedisBroker, _read_reply, create_broker
+from ws_chat.ws_manager import ConnectionManager
+
+
+class FakeSocket:
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.frames: list[dict] = []
+
+    async def accept(self):
+        return None
+
+    async def send_json(self, message):
+        await self.send({"type": "websocket.send", "text": json.dumps(message)})
+
+    async def send(self, message: dict):
+        if self.fail:
+            raise RuntimeError("socket closed")
+        self.frames.append(message)
+
+    def messages(self) -> list:
+        return [json.loads(frame["text"]) for frame in self.frames]
+
+
+class StandInRedis:
+    """Just enough of a Redis server for PUBLISH / SUBSCRIBE / UNSUBSCRIBE."""
+
+    def __init__(self):
+        self.subscribers: dict[bytes, set[asyncio.StreamWriter]] = {}
+        self.published = 0
+        self.clients: set[asyncio.StreamWriter] = set()
+        self.server: asyncio.Server | None = None
+
+    async def start(self, port: int = 0) -> int:
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", port)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+
+    def drop_clients(self):
+        for writer in list(self.clients):
+            writer.close()
+
+    async def _handle(self, reader, writer):
+        self.clients.add(writer)
+        try:
+            while True:
+                command, *args = await _read_reply(reader)
+                if command == b"PUBLISH":
+                    self.published += 1
+                    channel, payload = args
+                    receivers = self.subscribers.get(channel, set())
+                    for subscriber in receivers:
+                        subscriber.write(
+                            b"*3\r\n$7\r\nmessage\r\n$%d\r\n%s\r\n$%d\r\n%s\r\n"
+                            % (len(channel), channel, len(payload), payload)
+                        )
+                    writer.write(b":%d\r\n" % len(receivers))
+                elif command == b"SUBSCRIBE":
+                    self.subscribers.setdefault(args[0], set()).add(writer)
+                    writer.write(b"*3\r\n$9\r\nsubscribe\r\n$%d\r\n%s\r\n:1\r\n" % (len(args[0]), args[0]))
+                elif command == b"UNSUBSCRIBE":
+                    self.subscribers.get(args[0], set()).discard(writer)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            for subscribers in self.subscribers.values():
+                subscribers.discard(writer)
+            self.clients.discard(writer)
+
+
+def test_broadcast_encodes_once_and_skips_excluded_socket() -> None:
+    async def scenario():
+        manager = ConnectionManager(broker=InMemoryBroker())
+        sender, first, second = FakeSocket(), FakeSocket(), FakeSocket()
+        for socket in (sender, first, second):
+            await manager.connect(socket)
+        await manager.broadcast({"sender": "ana", "message": "héllo"}, exclude=sender)
+        await asyncio.sleep(0.01)
+        return sender, first, second
+
+    sender, first, second = asyncio.run(scenario())
+    assert sender.frames == []
+    assert first.messages() == [{"sender": "ana", "message": "héllo"}]
+    # Every receiver gets the very same pre-encoded payload object.
+    assert first.frames[0]["text"] is second.frames[0]["text"]
+
+
+def test_dead_connections_are_pruned_without_failing_broadcast() -> None:
+    async def scenario():
+        manager = ConnectionManager()
+        healthy, dead = FakeSocket(), FakeSocket(fail=True)
+        await manager.connect(dead)
+        await manager.connect(healthy)
+        await manager.broadcast({"sender": "system", "message": "one"})
+        await asyncio.sleep(0.01)
+        await manager.broadcast({"sender": "system", "message": "two"})
+        await asyncio.sleep(0.01)
+        return manager, healthy, dead
+
+    manager, healthy, dead = asyncio.run(scenario())
+    assert [message["message"] for message in healthy.messages()] == ["one", "two"]
+    assert manager.rooms.members("lobby") == [healthy]
+
+
+def test_redis_broker_fans_out_across_managers() -> None:
+    async def scenario():
+        server = StandInRedis()
+        port = await server.start()
+        brokers = [RedisBroker(port=port), RedisBroker(port=port)]
+        node_a = ConnectionManager(broker=brokers[0], channel="room")
+        node_b = ConnectionManager(broker=brokers[1], channel="room")
+        sender, local, remote = FakeSocket(), FakeSocket(), FakeSocket()
+        await node_a.connect(sender)
+        await node_a.connect(local)
+        await node_b.connect(remote)
+        await asyncio.sleep(0.05)
+
+        await node_a.broadcast({"sender": "ana", "message": "hi"}, exclude=sender)
+        for _ in range(100):
+            if local.frames and remote.frames:
+                break
+            await asyncio.sleep(0.01)
+
+        for broker in brokers:
+            await broker.close()
+        await server.stop()
+        return server, sender, local, remote
+
+    server, sender, local, remote = asyncio.run(scenario())
+    assert server.published == 1
+    assert sender.frames == []
+    assert local.messages() == remote.messages() == [{"sender": "ana", "message": "hi"}]
+
+
+def test_redis_broker_reconnects_after_losing_the_server() -> None:
+    async def scenario():
+        server = StandInRedis()
+        port = await server.start()
+        brokers = [RedisBroker(port=port, reconnect_delay=0.01), RedisBroker(port=port, reconnect_delay=0.01)]
+        node_a = ConnectionManager(broker=brokers[0], channel="room")
+        node_b = ConnectionManager(broker=brokers[1], channel="room")
+        local, remote = FakeSocket(), FakeSocket()
+        await node_a.connect(local)
+        await node_b.connect(remote)
+        await node_a.broadcast({"sender": "ana", "message": "before"})
+        await asyncio.sleep(0.05)
+
+        # The server goes away for a while, taking every connection with it.
+        await server.stop()
+        server.drop_clients()
+        await asyncio.sleep(0.1)
+        await server.start(port)
+        for _ in range(200):
+            if len(server.subscribers.get(b"room:lobby", ())) == 2:
+                break
+            await asyncio.sleep(0.01)
+
+        # The cached publish connection is dead: that publish fails, the next one reconnects.
+        stale_publish_failed = False
+        try:
+            await node_a.broadcast({"sender": "ana", "message": "lost"})
+        except ConnectionError:
+            stale_publish_failed = True
+        await node_a.broadcast({"sender": "ana", "message": "after"})
+        for _ in range(100):
+            if len(local.frames) == len(remote.frames) == 2:
+                break
+            await asyncio.sleep(0.01)
+
+        for broker in brokers:
+            await broker.close()
+        await server.stop()
+        return stale_publish_failed, local, remote
+
+    stale_publish_failed, local, remote = asyncio.run(scenario())
+    assert stale_publish_failed
+    expected = [{"sender": "ana", "message": "before"}, {"sender": "ana", "message": "after"}]
+    assert local.messages() == remote.messages() == expected
+
+
+def test_create_broker_from_url() -> None:
+    assert isinstance(create_broker(None), InMemoryBroker)
+    redis = create_broker("redis://cache.internal:6380")
+    assert isinstance(redis, RedisBroker)
+    assert (redis.host, redis.port) == ("cache.internal", 6380)
@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from ws_chat.broker import InMemoryBroker
+from ws_chat.exclusive_chatroom import EXCLUSIVE_ROOM
+from ws_chat.main import app
+from ws_chat.rooms import RoomRegistry
+from ws_chat.ws_manager import ConnectionManager
+
+
+class FakeSocket:
+    def __init__(self):
+        self.texts: list[str] = []
+
+    async def accept(self):
+        return None
+
+    async def send(self, message: dict):
+        self.texts.append(message["text"])
+
+
+def test_registry_tracks_membership_and_presence() -> None:
+    registry = RoomRegistry()
+    ana_tab1, ana_tab2, bob = object(), object(), object()
+
+    assert registry.join(ana_tab1, "rust", "ana") is True
+    assert registry.join(ana_tab2, "rust", "ana") is False
+    assert registry.join(bob, "go", "bob") is True
+    assert registry.online() == ["ana", "bob"]
+    assert registry.online("rust") == ["ana"]
+
+    assert registry.leave(ana_tab1) == ("rust", "ana", False)
+    assert registry.is_online("ana", "rust")
+    assert registry.leave(ana_tab2) == ("rust", "ana", True)
+    assert not registry.is_online("ana")
+    assert registry.rooms() == ["go"]
+    assert registry.leave(ana_tab2) is None
+
+
+def test_rejoining_moves_socket_between_rooms() -> None:
+    registry = RoomRegistry()
+    socket = object()
+    registry.join(socket, "rust", "ana")
+    registry.join(socket, "go", "ana")
+    assert registry.members("rust") == []
+    assert registry.members("go") == [socket]
+    assert registry.online() == ["ana"]
+
+
+def test_broadcast_only_reaches_members_of_the_room() -> None:
+    async def scenario():
+        broker = InMemoryBroker()
+        manager = ConnectionManager(broker=broker)
+        rust, also_rust, go = FakeSocket(), FakeSocket(), FakeSocket()
+        await manager.connect(rust, room="rust", username="ana")
+        await manager.connect(also_rust, room="rust", username="bob")
+        await manager.connect(go, room="go", username="cy")
+        await manager.broadcast({"message": "borrowck"}, room="rust")
+        await asyncio.sleep(0.01)
+
+        manager.disconnect(go)
+        await asyncio.sleep(0.01)
+        return manager, broker, rust, also_rust, go
+
+    manager, broker, rust, also_rust, go = asyncio.run(scenario())
+    assert rust.texts == also_rust.texts == ['{"message":"borrowck"}']
+    assert go.texts == []
+    assert manager.online("rust") == ["ana", "bob"]
+    # Empty rooms release their broker subscription.
+    assert broker._handlers.get("chat:go") == []
+    assert manager.rooms.rooms() == ["rust"]
+
+
+def test_presence_endpoints() -> None:
+    client = TestClient(app)
+    with client.websocket_connect("/chatroom/ana?room=rust"):
+        assert client.get("/rooms/rust/online").json() == {"room": "rust", "online": ["ana"]}
+        assert "ana" in client.get("/online").json()["online"]
+    assert client.get("/rooms/rust/online").json()["online"] == []
+
+
+def test_public_endpoints_cannot_reach_the_exclusive_room() -> None:
+    client = TestClient(app)
+    member = {"Authorization": "Bearer tokenizedjohndoe"}
+    with client.websocket_connect("/ws-eclusive", headers=member):
+        # Anonymous clients can neither join the exclusive room nor see who is in it.
+        with pytest.raises(WebSocketDisconnect):
+            with client.websocket_connect(f"/chatroom/eve?room={EXCLUSIVE_ROOM}"):
+                pass
+        with client.websocket_connect("/chatroom/eve?room=exclusive"):
+            assert client.get("/exclusive-chatroom/online", headers=member).json() == {"online": ["johndoe"]}
+        assert client.get(f"/rooms/{EXCLUSIVE_ROOM}/online").status_code == 404
+        assert client.get("/exclusive-chatroom/online").status_code == 401
+        assert "johndoe" not in client.get("/online").json()["online"]
@@ -1,14 +1,137 @@
-from ws_chat.ws_manager import ConnectionManager
+import asyncio
+import json
+
+from ws_chat.ws_manager import (
+    SLOW_CONSUMER_CLOSE_CODE,
+    ConnectionManager,
+    OverflowPolicy,
+)
 
 
 def test_connection_manager_starts_empty() -> None:
     manager = ConnectionManager()
-    assert manager.active_connections == []
+    assert len(manager.rooms) == 0
+    assert manager.online() == []
 
 
 def test_disconnect_removes_connection() -> None:
     manager = ConnectionManager()
     websocket = object()
-    manager.active_connections.append(websocket)
+    manager.rooms.join(websocket, "lobby", "ana")
+    manager.disconnect(websocket)
+    assert websocket not in manager.rooms
     manager.disconnect(websocket)
-    assert websocket not in manager.active_connections
+
+
+class SlowSocket:
+    """Accepts frames only when the test releases the gate."""
+
+    def __init__(self):
+        self.gate = asyncio.Event()
+        self.texts: list[str] = []
+        self.closed_with: int | None = None
+
+    async def accept(self):
+        return None
+
+    async def send(self, message: dict):
+        await self.gate.wait()
+        self.texts.append(message["text"])
+
+    async def close(self, code: int = 1000):
+        self.closed_with = code
+
+
+async def _flood(manager: ConnectionManager, socket: SlowSocket, count: int):
+    await manager.connect(socket)
+    await asyncio.sleep(0)
+    for index in range(count):
+        await manager.broadcast({"n": index})
+    socket.gate.set()
+    await asyncio.sleep(0.01)
+
+
+def test_broadcast_does_not_wait_for_slow_clients() -> None:
+    async def scenario():
+        manager = ConnectionManager()
+        slow, fast = SlowSocket(), SlowSocket()
+        fast.gate.set()
+        await manager.connect(slow)
+        await manager.connect(fast)
+        await asyncio.wait_for(manager.broadcast({"n": 0}), timeout=0.1)
+        await manager.send_personal_message({"n": "echo"}, fast)
+        await asyncio.sleep(0.01)
+        return slow, fast
+
+    slow, fast = asyncio.run(scenario())
+    assert slow.texts == []
+    assert fast.texts == ['{"n":0}', '{"n":"echo"}']
+
+
+def test_drop_oldest_keeps_newest_frames() -> None:
+    manager = ConnectionManager(max_queue=3, overflow="drop_oldest")
+    socket = SlowSocket()
+    asyncio.run(_flood(manager, socket, 6))
+    assert socket.texts == ['{"n":3}', '{"n":4}', '{"n":5}']
+    assert manager.overflows == 3
+
+
+def test_coalesce_merges_backlog_into_array_frame() -> None:
+    manager = ConnectionManager(max_queue=2, overflow=OverflowPolicy.COALESCE)
+    socket = SlowSocket()
+    asyncio.run(_flood(manager, socket, 6))
+    assert len(socket.texts) == 2
+    merged = [item for text in socket.texts for item in json.loads(f"[{text.strip('[]')}]")]
+    assert merged == [{"n": index} for index in range(6)]
+
+
+def test_coalesce_disconnects_stalled_client_past_the_cap() -> None:
+    async def scenario():
+        manager = ConnectionManager(max_queue=2, overflow=OverflowPolicy.COALESCE, max_coalesced_bytes=200)
+        stalled = SlowSocket()
+        await manager.connect(stalled)
+        await asyncio.sleep(0)
+        sizes = []
+        for index in range(100):
+            await manager.broadcast({"n": index})
+            frames = manager._outboxes[stalled].frames if stalled in manager._outboxes else ()
+            sizes.append(max((len(frame) for frame in frames), default=0))
+        await asyncio.sleep(0.01)
+        return manager, stalled, sizes
+
+    manager, stalled, sizes = asyncio.run(scenario())
+    assert max(sizes) <= 200
+    assert stalled.closed_with == SLOW_CONSUMER_CLOSE_CODE
+    assert len(manager.rooms) == 0
+
+
+def test_disconnect_policy_closes_slow_consumer() -> None:
+    manager = ConnectionManager(max_queue=2, overflow=OverflowPolicy.DISCONNECT)
+    socket = SlowSocket()
+    asyncio.run(_flood(manager, socket, 5))
+    assert socket.closed_with == SLOW_CONSUMER_CLOSE_CODE
+    assert len(manager.rooms) == 0
+
+
+def test_batch_window_sends_one_array_frame_per_client() -> None:
+    async def scenario():
+        manager = ConnectionManager(batch_window=0.02)
+        ana, bob = SlowSocket(), SlowSocket()
+        for socket in (ana, bob):
+            socket.gate.set()
+            await manager.connect(socket)
+        await manager.broadcast({"n": 1}, exclude=ana)
+        await manager.broadcast({"n": 2}, exclude=bob)
+        await manager.broadcast({"n": 3})
+        await asyncio.sleep(0.005)
+        before_window = (list(ana.texts), list(bob.texts))
+        await asyncio.sleep(0.05)
+        await manager.broadcast({"n": 4})
+        await asyncio.sleep(0.05)
+        return before_window, ana, bob
+
+    before_window, ana, bob = asyncio.run(scenario())
+    assert before_window == ([], [])
+    # Senders do not get their own message back; a lone message is not wrapped.
+    assert ana.texts == ['[{"n":2},{"n":3}]', '{"n":4}']
+    assert bob.texts == ['[{"n":1},{"n":3}]', '{"n":4}']
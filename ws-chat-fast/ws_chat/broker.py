@@ -0,0 +1,228 @@
+import asyncio
+import logging
+import os
+from collections.abc import Awaitable, Callable
+from typing import Protocol
+from urllib.parse import urlparse
+
+logger = logging.getLogger("uvicorn")
+
+Handler = Callable[[bytes], Awaitable[None]]
+
+
+class Broker(Protocol):
+    async def publish(self, channel: str, payload: bytes) -> None: ...
+
+    async def subscribe(self, channel: str, handler: Handler) -> None: ...
+
+    async def unsubscribe(self, channel: str, handler: Handler) -> None: ...
+
+    async def close(self) -> None: ...
+
+
+class InMemoryBroker:
+    """Single-process broker: ``publish`` awaits every local subscriber directly."""
+
+    def __init__(self):
+        self._handlers: dict[str, list[Handler]] = {}
+
+    async def publish(self, channel: str, payload: bytes) -> None:
+        for handler in list(self._handlers.get(channel, ())):
+            await handler(payload)
+
+    async def subscribe(self, channel: str, handler: Handler) -> None:
+        self._handlers.setdefault(channel, []).append(handler)
+
+    async def unsubscribe(self, channel: str, handler: Handler) -> None:
+        handlers = self._handlers.get(channel, [])
+        if handler in handlers:
+            handlers.remove(handler)
+
+    async def close(self) -> None:
+        self._handlers.clear()
+
+
+def _encode_command(*parts: bytes) -> bytes:
+    out = [b"*%d\r\n" % len(parts)]
+    for part in parts:
+        out.append(b"$%d\r\n%s\r\n" % (len(part), part))
+    return b"".join(out)
+
+
+async def _read_reply(reader: asyncio.StreamReader):
+    line = await reader.readline()
+    if not line:
+        raise ConnectionError("Redis connection closed")
+    kind, body = line[:1], line[1:-2]
+    if kind == b"+":
+        return body
+    if kind == b"-":
+        raise RuntimeError(body.decode())
+    if kind == b":":
+        return int(body)
+    if kind == b"$":
+        size = int(body)
+        if size < 0:
+            return None
+        data = await reader.readexactly(size + 2)
+        return data[:-2]
+    if kind == b"*":
+        return [await _read_reply(reader) for _ in range(int(body))]
+    raise ConnectionError(f"Unexpected Redis reply: {line!r}")
+
+
+class RedisBroker:
+    """Pub/sub over the Redis wire protocol (RESP), so any compatible server works.
+
+    One connection publishes; a second one holds the subscriptions and dispatches
+    ``message`` pushes to the local handlers from a reader task. When the subscriber
+    connection drops, the reader reconnects with capped exponential backoff and
+    re-subscribes every channel that still has handlers. A publish that fails closes its
+    connection so the next one opens a fresh one; the error still reaches the caller.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 6379,
+        reconnect_delay: float = 0.1,
+        reconnect_delay_max: float = 5.0,
+    ):
+        self.host = host
+        self.port = port
+        self.reconnect_delay = reconnect_delay
+        self.reconnect_delay_max = reconnect_delay_max
+        self._handlers: dict[str, list[Handler]] = {}
+        self._pub: tuple[asyncio.StreamReader, asyncio.StreamWriter] | None = None
+        self._sub: tuple[asyncio.StreamReader, asyncio.StreamWriter] | None = None
+        self._pub_lock = asyncio.Lock()
+        self._sub_lock = asyncio.Lock()
+        self._reader_task: asyncio.Task | None = None
+
+    async def publish(self, channel: str, payload: bytes) -> None:
+        async with self._pub_lock:
+            try:
+                if self._pub is None:
+                    self._pub = await asyncio.open_connection(self.host, self.port)
+                reader, writer = self._pub
+                writer.write(_encode_command(b"PUBLISH", channel.encode(), payload))
+                await writer.drain()
+                await _read_reply(reader)
+            except (OSError, asyncio.IncompleteReadError):
+                # ConnectionError is an OSError. Whether or not the command got through, this
+                # connection is unusable.
+                _close(self._pub)
+                self._pub = None
+                raise
+
+    async def subscribe(self, channel: str, handler: Handler) -> None:
+        async with self._sub_lock:
+            if self._reader_task is None:
+                self._sub = await asyncio.open_connection(self.host, self.port)
+                self._reader_task = asyncio.create_task(self._read_messages())
+            handlers = self._handlers.setdefault(channel, [])
+            handlers.append(handler)
+            if len(handlers) == 1:
+                # While the reader is reconnecting it re-subscribes this channel itself.
+                await self._send_sub(b"SUBSCRIBE", channel)
+
+    async def unsubscribe(self, channel: str, handler: Handler) -> None:
+        async with self._sub_lock:
+            handlers = self._handlers.get(channel, [])
+            if handler in handlers:
+                handlers.remove(handler)
+            if not handlers and self._sub is not None:
+                self._handlers.pop(channel, None)
+                await self._send_sub(b"UNSUBSCRIBE", channel)
+
+    async def close(self) -> None:
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+            self._reader_task = None
+        for connection in (self._pub, self._sub):
+            _close(connection)
+        self._pub = self._sub = None
+        self._handlers.clear()
+
+    async def _send_sub(self, command: bytes, channel: str) -> None:
+        if self._sub is None:
+            return
+        writer = self._sub[1]
+        try:
+            writer.write(_encode_command(command, channel.encode()))
+            await writer.drain()
+        except OSError:
+            # The reader sees the same failure and reconnects with the current channel set.
+            pass
+
+    async def _read_messages(self) -> None:
+        while True:
+            reader = self._sub[0] if self._sub is not None else None
+            try:
+                if reader is None:
+                    raise ConnectionError("Redis subscriber not connected")
+                await self._dispatch(reader)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning(
+                    "Redis subscriber connection to %s:%s lost; reconnecting",
+                    self.host,
+                    self.port,
+                    exc_info=True,
+                )
+            await self._reconnect_subscriber()
+
+    async def _dispatch(self, reader: asyncio.StreamReader) -> None:
+        while True:
+            reply = await _read_reply(reader)
+            if not isinstance(reply, list) or len(reply) != 3 or reply[0] != b"message":
+                continue  # subscribe / unsubscribe confirmations
+            channel = reply[1].decode()
+            for handler in list(self._handlers.get(channel, ())):
+                try:
+                    await handler(reply[2])
+                except Exception:
+                    logger.exception("Broker handler failed for %s", channel)
+
+    async def _reconnect_subscriber(self) -> None:
+        delay = self.reconnect_delay
+        while True:
+            async with self._sub_lock:
+                _close(self._sub)
+                self._sub = connection = None
+                try:
+                    connection = await asyncio.open_connection(self.host, self.port)
+                    writer = connection[1]
+                    for channel in self._handlers:
+                        writer.write(_encode_command(b"SUBSCRIBE", channel.encode()))
+                    await writer.drain()
+                except OSError:
+                    _close(connection)
+                    logger.warning(
+                        "Redis reconnect to %s:%s failed; retrying in %.1fs", self.host, self.port, delay
+                    )
+                else:
+                    self._sub = connection
+                    return
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.reconnect_delay_max)
+
+
+def _close(connection: tuple[asyncio.StreamReader, asyncio.StreamWriter] | None) -> None:
+    if connection is not None:
+        connection[1].close()
+
+
+def create_broker(url: str | None) -> Broker:
+    """Build a broker from a URL: empty or ``memory://`` for in-process, ``redis://host:port`` otherwise."""
+    if not url or url.startswith("memory://"):
+        return InMemoryBroker()
+    parsed = urlparse(url)
+    if parsed.scheme != "redis":
+        raise ValueError(f"Unsupported broker URL: {url}")
+    return RedisBroker(host=parsed.hostname or "127.0.0.1", port=parsed.port or 6379)
+
+
+# Shared by the chat routers; point every worker at the same server with WS_CHAT_BROKER_URL.
+broker = create_broker(os.environ.get("WS_CHAT_BROKER_URL"))
@@ -1,13 +1,20 @@
-from fastapi import APIRouter, Request, WebSocket, WebSocketDisconnect
+from fastapi import (
+    APIRouter,
+    HTTPException,
+    Request,
+    WebSocket,
+    WebSocketDisconnect,
+    WebSocketException,
+    status,
+)
 from fastapi.responses import HTMLResponse
 
 import logging
 
 
 from ws_chat.templating import templates
-from ws_chat.ws_manager import ConnectionManager
-
-conn_manager = ConnectionManager()
+from ws_chat.rooms import DEFAULT_ROOM, is_reserved_room
+from ws_chat.ws_manager import conn_manager
 logger = logging.getLogger("uvicorn")
 
 
@@ -16,15 +23,22 @@ router = APIRouter()
 
 @router.websocket("/chatroom/{username}")
 async def chatroom_endpoint(
-    websocket: WebSocket, username: str
+    websocket: WebSocket, username: str, room: str = DEFAULT_ROOM
 ):
-    await conn_manager.connect(websocket)
+    if is_reserved_room(room):
+        # Reserved rooms are only reachable through their authenticated routers.
+        raise WebSocketException(
+            code=status.WS_1008_POLICY_VIOLATION,
+            reason="Reserved room",
+        )
+    await conn_manager.connect(websocket, room=room, username=username)
     await conn_manager.broadcast(
         {
             "sender": "system",
             "message": f"{username} joined the chat",
         },
         exclude=websocket,
+        room=room,
     )
     
     logger.info(f"{username} joined the chat")
@@ -35,6 +49,7 @@ async def chatroom_endpoint(
             await conn_manager.broadcast(
                 {"sender": username, "message": data},
                 exclude=websocket,
+                room=room,
             )
             await conn_manager.send_personal_message(
                 {"sender": "You", "message": data},
@@ -50,7 +65,8 @@ async def chatroom_endpoint(
                 "sender": "system",
                 "message": f"{username} "
                 "left the chat",
-            }
+            },
+            room=room,
         )
         logger.info(f"{username} left the chat")
 
@@ -64,4 +80,16 @@ async def chatroom_page_endpoint(
         request=request,
         name="chatroom.html",
         context={"username": username},
-    )
\ No newline at end of file
+    )
+
+
+@router.get("/online")
+async def online_endpoint() -> dict:
+    return {"online": conn_manager.online()}
+
+
+@router.get("/rooms/{room}/online")
+async def room_online_endpoint(room: str) -> dict:
+    if is_reserved_room(room):
+        raise HTTPException(status_code=404, detail="Room not found")
+    return {"room": room, "online": conn_manager.online(room)}
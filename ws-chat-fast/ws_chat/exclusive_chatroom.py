@@ -10,11 +10,13 @@ from fastapi import (
 from fastapi.responses import RedirectResponse
 from fastapi.templating import Jinja2Templates
 
+from ws_chat.rooms import RESERVED_ROOM_PREFIX
 from ws_chat.security import (
     fake_token_resolver,
+    get_username_from_bearer,
     get_username_from_token,
 )
-from ws_chat.ws_manager import ConnectionManager
+from ws_chat.ws_manager import conn_manager
 
 router = APIRouter()
 
@@ -38,7 +40,15 @@ async def exclusive_chatroom(
     )
 
 
-connection_manager = ConnectionManager()
+# Reserved, so the public /chatroom endpoint cannot join it.
+EXCLUSIVE_ROOM = RESERVED_ROOM_PREFIX + "exclusive"
+
+
+@router.get("/exclusive-chatroom/online")
+async def exclusive_online(
+    _: Annotated[str, Depends(get_username_from_bearer)],
+) -> dict:
+    return {"online": conn_manager.online(EXCLUSIVE_ROOM)}
 
 
 @router.websocket("/ws-eclusive")
@@ -48,30 +58,35 @@ async def websocket_chatroom(
         get_username_from_token, Depends()
     ],
 ):
-    await connection_manager.connect(websocket)
-    await connection_manager.broadcast(
+    await conn_manager.connect(
+        websocket, room=EXCLUSIVE_ROOM, username=username
+    )
+    await conn_manager.broadcast(
         {
             "sender": "system",
             "message": f"{username} joined the chat",
         },
         exclude=websocket,
+        room=EXCLUSIVE_ROOM,
     )
     try:
         while True:
             data = await websocket.receive_text()
-            await connection_manager.broadcast(
+            await conn_manager.broadcast(
                 {
                     "sender": username,
                     "message": data,
                 },
                 exclude=websocket,
+                room=EXCLUSIVE_ROOM,
             )
-            await connection_manager.send_personal_message(
+            await conn_manager.send_personal_message(
                 {"sender": "You", "message": data},
                 websocket,
             )
     except WebSocketDisconnect:
-        connection_manager.disconnect(websocket)
-        await connection_manager.broadcast(
-            f"Client #{username} left the chat"
+        conn_manager.disconnect(websocket)
+        await conn_manager.broadcast(
+            f"Client #{username} left the chat",
+            room=EXCLUSIVE_ROOM,
         )
\ No newline at end of file
@@ -0,0 +1,90 @@
+from collections import Counter
+
+from fastapi import WebSocket
+
+DEFAULT_ROOM = "lobby"
+# Rooms named with this prefix belong to authenticated routers; public endpoints refuse them.
+RESERVED_ROOM_PREFIX = "~"
+
+
+def is_reserved_room(room: str) -> bool:
+    return room.startswith(RESERVED_ROOM_PREFIX)
+
+
+class RoomRegistry:
+    """Room membership and presence, kept as hash maps so nothing walks the socket list.
+
+    Each socket is in exactly one room. Presence counts connections per username, so a user
+    with two tabs open stays online until the last one leaves. Process-wide presence only
+    covers public rooms, so listing everyone online does not reveal who is in a reserved one.
+    """
+
+    def __init__(self):
+        self._rooms: dict[str, dict[WebSocket, str]] = {}
+        self._sockets: dict[WebSocket, tuple[str, str]] = {}
+        self._presence: dict[str, Counter[str]] = {}
+        self._online: Counter[str] = Counter()
+
+    def __len__(self) -> int:
+        return len(self._sockets)
+
+    def __contains__(self, websocket: WebSocket) -> bool:
+        return websocket in self._sockets
+
+    def join(self, websocket: WebSocket, room: str, username: str) -> bool:
+        """Add ``websocket`` to ``room``; return True if it is the room's first member."""
+        self.leave(websocket)
+        members = self._rooms.get(room)
+        first = members is None
+        if first:
+            members = self._rooms[room] = {}
+            self._presence[room] = Counter()
+        members[websocket] = username
+        self._sockets[websocket] = (room, username)
+        self._presence[room][username] += 1
+        if not is_reserved_room(room):
+            self._online[username] += 1
+        return first
+
+    def leave(self, websocket: WebSocket) -> tuple[str, str, bool] | None:
+        """Remove ``websocket``; return ``(room, username, room is now empty)`` or None if unknown."""
+        entry = self._sockets.pop(websocket, None)
+        if entry is None:
+            return None
+        room, username = entry
+        members = self._rooms[room]
+        del members[websocket]
+        _decrement(self._presence[room], username)
+        if not is_reserved_room(room):
+            _decrement(self._online, username)
+        empty = not members
+        if empty:
+            del self._rooms[room]
+            del self._presence[room]
+        return room, username, empty
+
+    def room_of(self, websocket: WebSocket) -> str | None:
+        entry = self._sockets.get(websocket)
+        return entry[0] if entry else None
+
+    def members(self, room: str) -> list[WebSocket]:
+        return list(self._rooms.get(room, ()))
+
+    def rooms(self) -> list[str]:
+        return list(self._rooms)
+
+    def online(self, room: str | None = None) -> list[str]:
+        """Usernames with at least one connection, in ``room`` or in any public room on this process."""
+        if room is None:
+            return list(self._online)
+        return list(self._presence.get(room, ()))
+
+    def is_online(self, username: str, room: str | None = None) -> bool:
+        counts = self._online if room is None else self._presence.get(room, {})
+        return username in counts
+
+
+def _decrement(counts: Counter[str], key: str):
+    counts[key] -= 1
+    if counts[key] <= 0:
+        del counts[key]
@@ -10,6 +10,7 @@ from fastapi import (
 )
 from fastapi.responses import HTMLResponse
 from fastapi.security import (
+    OAuth2PasswordBearer,
     OAuth2PasswordRequestForm,
 )
 from fastapi.templating import Jinja2Templates
@@ -78,6 +79,22 @@ def get_username_from_token(
     return user.username
 
 
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/token")
+
+
+def get_username_from_bearer(
+    token: str = Depends(oauth2_scheme),
+) -> str:
+    user = fake_token_resolver(token)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return user.username
+
+
 router = APIRouter()
 
 
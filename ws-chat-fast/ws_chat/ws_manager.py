@@ -1,30 +1,256 @@
 import asyncio
+import json
+import os
+import uuid
+from collections import deque
+from collections.abc import Awaitable, Callable
+from enum import Enum
 
 from fastapi import WebSocket
 
+from ws_chat.broker import Broker, InMemoryBroker
+from ws_chat.broker import broker as shared_broker
+from ws_chat.rooms import DEFAULT_ROOM, RoomRegistry
+
+# "Try Again Later": the client fell too far behind and should reconnect.
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
+
+class OverflowPolicy(str, Enum):
+    DROP_OLDEST = "drop_oldest"
+    COALESCE = "coalesce"
+    DISCONNECT = "disconnect"
+
+
+class _Outbox:
+    __slots__ = ("websocket", "frames", "ready", "task")
+
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self.frames: deque[str] = deque()
+        self.ready = asyncio.Event()
+        self.task: asyncio.Task | None = None
+
+
+def _coalesce(frames: deque[str], text: str) -> str:
+    """Merge queued payloads and ``text`` into one JSON-array frame, flattening earlier merges."""
+    parts = [frame[1:-1] if frame.startswith("[") else frame for frame in frames]
+    parts.append(text[1:-1] if text.startswith("[") else text)
+    return "[" + ",".join(parts) + "]"
+
 
 class ConnectionManager:
-    def __init__(self):
-        self.active_connections: list[WebSocket] = []
+    """Tracks this process's sockets by room; broadcasts go through a broker so every worker delivers them.
 
-    async def connect(self, websocket: WebSocket):
+    Each room is its own broker channel (``<channel>:<room>``), subscribed while the room has a
+    local member. A broadcast is JSON-encoded once and published as ``<exclude key>\\n<payload>``.
+    Each subscribed manager hands the payload to its room members' outboxes: bounded queues drained by
+    one writer task per socket, so delivery never waits on a slow client. When an outbox is
+    full, ``overflow`` decides whether the oldest frame is dropped, the backlog is coalesced
+    into one JSON-array frame, or the client is disconnected. A coalesced frame is capped at
+    ``max_coalesced_bytes`` of UTF-8; a client whose backlog outgrows it is disconnected too.
+    Sockets whose send fails are dropped by their writer.
+
+    With ``batch_window`` (seconds) set, messages reaching a room within the window are sent as
+    one JSON-array frame per client. The array is encoded once per room; only senders, whose
+    own messages are left out, get a frame of their own.
+    """
+
+    def __init__(
+        self,
+        broker: Broker | None = None,
+        channel: str = "chat",
+        max_queue: int = 256,
+        overflow: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+        batch_window: float | None = None,
+        max_coalesced_bytes: int = 1 << 20,
+    ):
+        self.rooms = RoomRegistry()
+        self.broker = broker if broker is not None else InMemoryBroker()
+        self.channel = channel
+        self.max_queue = max_queue
+        self.overflow = OverflowPolicy(overflow)
+        self.batch_window = batch_window
+        self.max_coalesced_bytes = max_coalesced_bytes
+        self.node_id = uuid.uuid4().hex
+        # Times a full outbox triggered the overflow policy.
+        self.overflows = 0
+        self._outboxes: dict[WebSocket, _Outbox] = {}
+        self._handlers: dict[str, Callable[[bytes], Awaitable[None]]] = {}
+        self._background: set[asyncio.Task] = set()
+        self._batches: dict[str, list[tuple[str, int | None]]] = {}
+
+    async def connect(
+        self, websocket: WebSocket, room: str = DEFAULT_ROOM, username: str = ""
+    ):
         await websocket.accept()
-        self.active_connections.append(websocket)
+        outbox = _Outbox(websocket)
+        outbox.task = asyncio.create_task(self._write(outbox))
+        self._outboxes[websocket] = outbox
+        self.rooms.join(websocket, room, username)
+        await self._subscribe(room)
 
     def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
+        left = self.rooms.leave(websocket)
+        if left is not None and left[2] and left[0] in self._handlers:
+            self._spawn(self._unsubscribe_if_empty(left[0]))
+        outbox = self._outboxes.pop(websocket, None)
+        if outbox is not None and outbox.task is not asyncio.current_task():
+            outbox.task.cancel()
+
+    def online(self, room: str | None = None) -> list[str]:
+        return self.rooms.online(room)
 
     async def send_personal_message(
         self, message: dict, websocket: WebSocket
     ):
-        await websocket.send_json(message)
+        outbox = self._outboxes.get(websocket)
+        if outbox is None:
+            await websocket.send_json(message)
+            return
+        # Queued behind pending broadcasts so each client sees messages in order.
+        self._enqueue(outbox, self._encode(message))
 
     async def broadcast(
-        self, message: dict, exclude: WebSocket = None
+        self,
+        message: dict,
+        exclude: WebSocket = None,
+        room: str = DEFAULT_ROOM,
     ):
-        tasks = [
-            connection.send_json(message)
-            for connection in self.active_connections
-            if connection != exclude
-        ]
-        await asyncio.gather(*tasks)
\ No newline at end of file
+        exclude_key = self._key(exclude) if exclude is not None else ""
+        payload = self._encode(message).encode()
+        await self.broker.publish(
+            self._channel(room), exclude_key.encode() + b"\n" + payload
+        )
+
+    async def close(self):
+        for websocket in list(self._outboxes):
+            self.rooms.leave(websocket)
+            self.disconnect(websocket)
+        for room, handler in list(self._handlers.items()):
+            await self.broker.unsubscribe(self._channel(room), handler)
+        self._handlers.clear()
+
+    def _channel(self, room: str) -> str:
+        return f"{self.channel}:{room}"
+
+    async def _subscribe(self, room: str):
+        if room in self._handlers:
+            return
+
+        async def handler(envelope: bytes):
+            self._deliver(room, envelope)
+
+        self._handlers[room] = handler
+        await self.broker.subscribe(self._channel(room), handler)
+
+    async def _unsubscribe_if_empty(self, room: str):
+        handler = self._handlers.get(room)
+        # Someone may have joined again before this ran.
+        if handler is None or self.rooms.members(room):
+            return
+        del self._handlers[room]
+        await self.broker.unsubscribe(self._channel(room), handler)
+
+    def _spawn(self, coroutine):
+        task = asyncio.create_task(coroutine)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    def _encode(self, message) -> str:
+        return json.dumps(message, separators=(",", ":"), ensure_ascii=False)
+
+    def _key(self, websocket: WebSocket) -> str:
+        return f"{self.node_id}:{id(websocket)}"
+
+    def _deliver(self, room: str, envelope: bytes):
+        exclude_key, _, payload = envelope.partition(b"\n")
+        text = payload.decode()
+        node_id, _, socket_id = exclude_key.decode().partition(":")
+        exclude_id = int(socket_id) if node_id == self.node_id else None
+        if not self.batch_window:
+            self._fan_out(room, text, exclude_id)
+            return
+        batch = self._batches.get(room)
+        if batch is None:
+            batch = self._batches[room] = []
+            asyncio.get_running_loop().call_later(
+                self.batch_window, self._flush, room
+            )
+        batch.append((text, exclude_id))
+
+    def _fan_out(self, room: str, text: str, exclude_id: int | None):
+        outboxes = self._outboxes
+        for websocket in self.rooms.members(room):
+            outbox = outboxes.get(websocket)
+            if outbox is not None and id(websocket) != exclude_id:
+                self._enqueue(outbox, text)
+
+    def _flush(self, room: str):
+        batch = self._batches.pop(room, [])
+        if len(batch) == 1:
+            self._fan_out(room, *batch[0])
+            return
+        senders = {exclude_id for _, exclude_id in batch if exclude_id is not None}
+        shared = "[" + ",".join(text for text, _ in batch) + "]"
+        outboxes = self._outboxes
+        for websocket in self.rooms.members(room):
+            outbox = outboxes.get(websocket)
+            if outbox is None:
+                continue
+            if id(websocket) not in senders:
+                self._enqueue(outbox, shared)
+                continue
+            others = [text for text, exclude_id in batch if exclude_id != id(websocket)]
+            if others:
+                self._enqueue(outbox, others[0] if len(others) == 1 else "[" + ",".join(others) + "]")
+
+    def _enqueue(self, outbox: _Outbox, text: str):
+        frames = outbox.frames
+        if len(frames) >= self.max_queue:
+            self.overflows += 1
+            if self.overflow is OverflowPolicy.COALESCE:
+                text = _coalesce(frames, text)
+                # A stalled client would otherwise keep re-merging an ever larger frame.
+                if len(text.encode()) > self.max_coalesced_bytes:
+                    self._disconnect_slow(outbox)
+                    return
+                frames.clear()
+            elif self.overflow is OverflowPolicy.DISCONNECT:
+                self._disconnect_slow(outbox)
+                return
+            else:
+                frames.popleft()
+        frames.append(text)
+        outbox.ready.set()
+
+    def _disconnect_slow(self, outbox: _Outbox):
+        self.disconnect(outbox.websocket)
+        self._spawn(self._close_slow(outbox.websocket))
+
+    async def _write(self, outbox: _Outbox):
+        frames = outbox.frames
+        send = outbox.websocket.send
+        try:
+            while True:
+                if not frames:
+                    outbox.ready.clear()
+                    await outbox.ready.wait()
+                    continue
+                await send({"type": "websocket.send", "text": frames.popleft()})
+        except Exception:
+            self.disconnect(outbox.websocket)
+
+    async def _close_slow(self, websocket: WebSocket):
+        try:
+            await websocket.close(code=SLOW_CONSUMER_CLOSE_CODE)
+        except Exception:
+            pass
+
+
+# Shared by every chat router, so all rooms and presence live in one registry.
+conn_manager = ConnectionManager(
+    broker=shared_broker,
+    channel="ws-chat",
+    batch_window=float(os.environ.get("WS_CHAT_BATCH_WINDOW_MS", "0")) / 1000 or None,
+)